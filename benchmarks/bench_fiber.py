@@ -0,0 +1,142 @@
+"""Benchmarks of the basic operations on fibers"""
+
+from fibertree import CoordPayload
+from fibertree import Fiber
+from fibertree import Metrics
+
+from .common import SIZES, DENSITIES, random_fiber, random_coords
+
+
+class Construction:
+    """Create a fiber from lists of coordinates and payloads"""
+
+    params = (SIZES, DENSITIES)
+    param_names = ["size", "density"]
+
+    def setup(self, size, density):
+        fiber = random_fiber(size, density)
+
+        self.coords = fiber.getCoords()
+        self.payloads = fiber.getPayloads()
+        self.uncompressed = [0] * size
+
+        for c, p in zip(self.coords, self.payloads):
+            self.uncompressed[c] = p
+
+    def time_fromLists(self, size, density):
+        Fiber(self.coords, self.payloads)
+
+    def time_fromUncompressed(self, size, density):
+        Fiber.fromUncompressed(self.uncompressed)
+
+    def peakmem_fromLists(self, size, density):
+        Fiber(self.coords, self.payloads)
+
+
+class GetPayload:
+    """Look up 1000 random coordinates in a fiber"""
+
+    params = (SIZES, DENSITIES)
+    param_names = ["size", "density"]
+
+    def setup(self, size, density):
+        self.fiber = random_fiber(size, density)
+        self.lookups = random_coords(size, 1000)
+
+    def time_getPayload(self, size, density):
+        for c in self.lookups:
+            self.fiber.getPayload(c)
+
+
+class Iterate:
+    """Iterate over the elements of a fiber
+
+    `time_zip` is the baseline: a plain generator over the coordinates
+    and payloads, which the (uninstrumented) iterators are compared
+    against. The `*_metrics` benchmarks iterate with metrics being
+    collected.
+
+    """
+
+    params = (SIZES, DENSITIES)
+    param_names = ["size", "density"]
+
+    def setup(self, size, density):
+        self.fiber = random_fiber(size, density)
+        self.fiber.getRankAttrs().setId("K")
+
+    def teardown(self, size, density):
+        Metrics.endCollect()
+
+    def time_zip(self, size, density):
+        def elements(coords, payloads):
+            for c, p in zip(coords, payloads):
+                yield CoordPayload(c, p)
+
+        for _ in elements(self.fiber.coords, self.fiber.payloads):
+            pass
+
+    def time_iter(self, size, density):
+        for _ in self.fiber:
+            pass
+
+    def time_iterShape(self, size, density):
+        for _ in self.fiber.iterShape():
+            pass
+
+    def time_iter_metrics(self, size, density):
+        Metrics.beginCollect()
+
+        for _ in self.fiber:
+            pass
+
+        Metrics.endCollect()
+
+
+class Merge:
+    """Iterate over the intersection and union of two fibers"""
+
+    params = (SIZES, DENSITIES)
+    param_names = ["size", "density"]
+
+    def setup(self, size, density):
+        self.a = random_fiber(size, density, seed=0)
+        self.b = random_fiber(size, density, seed=1)
+
+    def time_and(self, size, density):
+        for _ in self.a & self.b:
+            pass
+
+    def time_or(self, size, density):
+        for _ in self.a | self.b:
+            pass
+
+    def peakmem_and(self, size, density):
+        for _ in self.a & self.b:
+            pass
+
+    def peakmem_or(self, size, density):
+        for _ in self.a | self.b:
+            pass
+
+
+class Populate:
+    """Populate an empty fiber from another fiber"""
+
+    params = (SIZES, DENSITIES)
+    param_names = ["size", "density"]
+
+    def setup(self, size, density):
+        self.a = random_fiber(size, density)
+
+    def time_lshift(self, size, density):
+        z = Fiber()
+
+        for _, (z_ref, a_val) in z << self.a:
+            z_ref += a_val
+
+    def peakmem_lshift(self, size, density):
+        z = Fiber()
+
+        for _, (z_ref, a_val) in z << self.a:
+            z_ref += a_val
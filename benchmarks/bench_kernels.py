@@ -0,0 +1,113 @@
+"""Benchmarks of the example kernels (see examples/scripts)"""
+
+from fibertree import Fiber
+from fibertree import Payload
+from fibertree import Tensor
+
+from .common import SIZES, SIZES_2D, DENSITIES, random_tensor
+
+#
+# Input sizes for the convolution (each output element intersects the
+# weights with the input up to its window, so the time is quadratic)
+#
+CONV_SIZES = [256, 512, 1024]
+
+
+class DotProduct:
+    """Dot product of two vectors"""
+
+    params = (SIZES, DENSITIES)
+    param_names = ["size", "density"]
+
+    def setup(self, size, density):
+        self.a = random_tensor(["K"], size, density, seed=0)
+        self.b = random_tensor(["K"], size, density, seed=1)
+
+    def time_dot_product(self, size, density):
+        z = Tensor(rank_ids=[])
+        z_ref = z.getRoot()
+
+        for _, (a_val, b_val) in self.a.getRoot() & self.b.getRoot():
+            z_ref += a_val * b_val
+
+
+class SpMSpV:
+    """Sparse matrix times sparse vector (C-stationary)"""
+
+    params = (SIZES_2D, DENSITIES)
+    param_names = ["size", "density"]
+
+    def setup(self, size, density):
+        self.a = random_tensor(["M", "K"], size, density, seed=0)
+        self.b = random_tensor(["K"], size, density, seed=1)
+
+    def time_spmspv(self, size, density):
+        z = Tensor(rank_ids=["M"])
+        z_m = z.getRoot()
+        b_k = self.b.getRoot()
+
+        for _, (z_ref, a_k) in z_m << self.a.getRoot():
+            for _, (a_val, b_val) in a_k & b_k:
+                z_ref += a_val * b_val
+
+
+class Conv1D:
+    """Output-stationary one-dimensional convolution with 9 weights"""
+
+    params = (CONV_SIZES, DENSITIES)
+    param_names = ["size", "density"]
+    timeout = 300
+
+    def setup(self, size, density):
+        self.w = random_tensor(["R"], 9, 1.0, seed=0)
+        self.i = random_tensor(["H"], size, density, seed=1)
+
+    def time_conv1d(self, size, density):
+        o = Tensor(rank_ids=["Q"])
+        o_q = o.getRoot()
+        w_r = self.w.getRoot()
+        i_h = self.i.getRoot()
+
+        Q = self.i.getShape()[0] - self.w.getShape()[0] + 1
+        output_shape = Fiber(coords=range(Q), initial=1)
+
+        for q, (o_q_ref, _) in o_q << output_shape:
+            for _, (w_val, i_val) in w_r.project(lambda r: q + r) & i_h:
+                o_q_ref += w_val * i_val
+
+
+class BFS:
+    """Breadth-first search of a random graph"""
+
+    params = (SIZES_2D, DENSITIES)
+    param_names = ["size", "density"]
+    timeout = 300
+
+    def setup(self, size, density):
+        self.a = random_tensor(["S", "D"], size, density)
+
+        root = [0] * size
+        root[0] = 1
+        self.f0 = Tensor.fromUncompressed(["D"], root)
+
+    def time_bfs(self, size, density):
+        a_s = self.a.getRoot()
+        f0_d = self.f0.getRoot()
+
+        d = Tensor(rank_ids=["S"])
+        d_d = d.getRoot()
+
+        level = 1
+
+        while f0_d.countValues() > 0:
+            f1 = Tensor(rank_ids=["D"])
+            f1_d = f1.getRoot()
+
+            for _, (_, a_d) in f0_d & a_s:
+                for _, (f1_ref, (d_ref, _)) in f1_d << (d_d << a_d):
+                    if Payload.isEmpty(d_ref):
+                        f1_ref += 1
+                        d_ref += level
+
+            level += 1
+            f0_d = f1.getRoot()
@@ -0,0 +1,50 @@
+"""Benchmarks of the methods that restructure the ranks of tensors"""
+
+from .common import SIZES, SIZES_2D, DENSITIES, random_fiber, random_tensor
+
+
+class Split:
+    """Split a fiber into fibers of 64 coordinates or elements"""
+
+    params = (SIZES, DENSITIES)
+    param_names = ["size", "density"]
+
+    def setup(self, size, density):
+        self.fiber = random_fiber(size, density)
+
+    def time_splitUniform(self, size, density):
+        self.fiber.splitUniform(64)
+
+    def time_splitEqual(self, size, density):
+        self.fiber.splitEqual(64)
+
+
+class Swizzle:
+    """Swap the ranks of a two-dimensional tensor"""
+
+    params = (SIZES_2D, DENSITIES)
+    param_names = ["size", "density"]
+    timeout = 300
+
+    def setup(self, size, density):
+        self.tensor = random_tensor(["M", "K"], size, density)
+
+    def time_swizzleRanks(self, size, density):
+        self.tensor.swizzleRanks(["K", "M"])
+
+    def peakmem_swizzleRanks(self, size, density):
+        self.tensor.swizzleRanks(["K", "M"])
+
+
+class Flatten:
+    """Flatten the ranks of a two-dimensional tensor"""
+
+    params = (SIZES_2D, DENSITIES)
+    param_names = ["size", "density"]
+    timeout = 300
+
+    def setup(self, size, density):
+        self.tensor = random_tensor(["M", "K"], size, density)
+
+    def time_flattenRanks(self, size, density):
+        self.tensor.flattenRanks()
@@ -0,0 +1,109 @@
+"""Benchmarks of the traffic model (see fibertree.model.traffic)"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from fibertree import Metrics
+from fibertree import Tensor
+from fibertree.model import Format
+from fibertree.model import Traffic
+
+from .common import random_tensor
+
+#
+# Shapes of each rank of the matrices of Gustavson's SpMM
+#
+TRAFFIC_SIZES = [32, 64]
+
+#
+# Number of bits in a line of the cache
+#
+LINE_SZ = 256
+
+#
+# Capacities (in bits) of the cache in a buffer sizing sweep
+#
+CAPACITIES = [LINE_SZ * 2 ** i for i in range(10)]
+
+BINDINGS = [
+    {"tensor": "B", "rank": "K", "type": "payload"},
+    {"tensor": "B", "rank": "N", "type": "coord"},
+    {"tensor": "B", "rank": "N", "type": "payload"},
+]
+
+FORMATS = {
+    "K": {"format": "U", "rhbits": 32, "pbits": 32},
+    "N": {"format": "C", "cbits": 32, "pbits": 64},
+}
+
+
+class TrafficSweep:
+    """Traffic of B in Gustavson's SpMM for a sweep of cache capacities
+
+    `time_cacheTraffic` simulates each capacity separately, and
+    `time_trafficCurves` computes the traffic of all the capacities in
+    a single pass.
+
+    """
+
+    params = (TRAFFIC_SIZES, ["opt", "lru"])
+    param_names = ["size", "policy"]
+    timeout = 600
+
+    def setup(self, size, policy):
+        a = random_tensor(["M", "K"], size, 0.1, seed=0)
+        b = random_tensor(["K", "N"], size, 0.1, seed=1)
+        z = Tensor(rank_ids=["M", "N"], shape=[size, size])
+
+        self.dir = tempfile.mkdtemp()
+        prefix = os.path.join(self.dir, "spmm")
+
+        Metrics.beginCollect(prefix)
+        Metrics.trace("K", type_="intersect_0")
+        Metrics.trace("K", type_="intersect_1")
+        Metrics.trace("N", type_="populate_1")
+        for m, (z_n, a_k) in z.getRoot() << a.getRoot():
+            for k, (a_val, b_n) in a_k & b.getRoot():
+                for n, (z_ref, b_val) in z_n << b_n:
+                    z_ref += a_val * b_val
+        Metrics.endCollect()
+
+        self.formats = {"B": Format(b, FORMATS)}
+        self.traces = {
+            ("B", "K", "payload", "read"): prefix + "-K-intersect_1.csv",
+            ("B", "N", "coord", "read"): prefix + "-N-populate_1.csv",
+            ("B", "N", "payload", "read"): prefix + "-N-populate_1.csv",
+        }
+
+    def teardown(self, size, policy):
+        shutil.rmtree(self.dir)
+
+    def time_cacheTraffic(self, size, policy):
+        for capacity in CAPACITIES:
+            Traffic.cacheTraffic(BINDINGS, self.formats, self.traces,
+                                 capacity, LINE_SZ, policy=policy)
+
+    def time_trafficCurves(self, size, policy):
+        Traffic.trafficCurves(BINDINGS, self.formats, self.traces,
+                              CAPACITIES, LINE_SZ, policy=policy)
+
+
+class StackDistances:
+    """Stack distances of 50000 accesses to random lines
+
+    With many lines, most accesses are deep in the stack.
+
+    """
+
+    params = ([100, 1000, 10000], ["opt", "lru"])
+    param_names = ["lines", "policy"]
+
+    def setup(self, lines, policy):
+        rng = np.random.default_rng(0)
+        self.lines = rng.integers(lines, size=50000)
+
+    def time_stackDistances(self, lines, policy):
+        Traffic._stackDistances(self.lines, policy, 8192)
@@ -0,0 +1,34 @@
+"""Benchmarks of reading and writing tensors in YAML format"""
+
+import os
+import shutil
+import tempfile
+
+from fibertree import Tensor
+
+from .common import SIZES_2D, DENSITIES, random_tensor
+
+
+class YAML:
+    """Dump and load a two-dimensional tensor"""
+
+    params = (SIZES_2D, DENSITIES)
+    param_names = ["size", "density"]
+    timeout = 300
+
+    def setup(self, size, density):
+        self.tensor = random_tensor(["M", "K"], size, density)
+
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, "tensor.yaml")
+
+        self.tensor.dump(self.filename)
+
+    def teardown(self, size, density):
+        shutil.rmtree(self.dir)
+
+    def time_dump(self, size, density):
+        self.tensor.dump(os.path.join(self.dir, "dump.yaml"))
+
+    def time_load(self, size, density):
+        Tensor.fromYAMLfile(self.filename)
@@ -0,0 +1,44 @@
+"""Common parameters and helpers for the benchmarks"""
+
+import random
+
+from fibertree import Fiber
+from fibertree import Tensor
+
+#
+# Shapes of the (one-dimensional) fibers
+#
+SIZES = [1000, 10000, 100000]
+
+#
+# Shapes of each rank of the two-dimensional tensors
+#
+SIZES_2D = [64, 256, 512]
+
+#
+# Probability that an element at the leaf level is not empty
+#
+DENSITIES = [0.01, 0.1, 0.5]
+
+
+def random_fiber(size, density, seed=0):
+    """Create a random one-dimensional fiber"""
+
+    return Fiber.fromRandom([size], [density], seed=seed)
+
+
+def random_tensor(rank_ids, size, density, seed=0):
+    """Create a random tensor with every rank of shape `size`"""
+
+    shape = [size] * len(rank_ids)
+    densities = [1.0] * (len(rank_ids) - 1) + [density]
+
+    return Tensor.fromRandom(rank_ids, shape, densities, seed=seed)
+
+
+def random_coords(size, count, seed=0):
+    """Create a list of random coordinates in the range [0, `size`)"""
+
+    rng = random.Random(seed)
+
+    return [rng.randrange(size) for _ in range(count)]
@@ -1,31 +1,85 @@
-
 from .core.tensor import *
 from .core.rank import *
 from .core.fiber import *
 from .core.coord_payload import *
 from .core.payload import *
+from .core.metrics import *
 
 from .codec.tensor_codec import *
 from .codec.compression_types import *
 
-from .graphics.image_utils import *
-from .graphics.highlights import *
-from .graphics.aahr import *
+from collections import namedtuple
+
+#
+# The graphics and notebook modules pull in heavyweight packages
+# (OpenCV, matplotlib, ipywidgets, PIL, ...), so the names they
+# export (and the `graphics` and `notebook` subpackages themselves)
+# are only imported when they are first accessed (see `__getattr__()`
+# below).
+#
+# Note: `from fibertree import *` still imports all of them
+#
+_lazy_modules = {
+    ".graphics.image_utils": ["ImageUtils", "lru_cache", "webcolors"],
+    ".graphics.highlights": ["HighlightManager"],
+    ".graphics.aahr": ["AAHR"],
+    ".graphics.tensor_image": ["TensorImage"],
+    ".graphics.tree_image": ["TreeImage"],
+    ".graphics.uncompressed_image": ["UncompressedImage"],
+    ".graphics.tensor_canvas": ["CycleManager", "NoneCanvas", "TensorCanvas"],
+    ".graphics.movie_canvas": ["ImageDraw", "ImageFont", "MovieCanvas", "cv2",
+                               "numpy", "tqdm"],
+    ".graphics.spacetime_canvas": ["SpacetimeCanvas"],
+    ".graphics.canvas_layout": ["CanvasLayout"],
+    ".notebook.notebook_utils": ["NotebookUtils", "addActivity", "addFrame",
+                                 "createEnableControl", "data_dir",
+                                 "datafileName", "enable"],
+    ".notebook.tensor_maker": ["TensorMaker"],
+    ".notebook.tensor_display": ["TensorDisplay", "fixed", "have_ipywidgets",
+                                 "have_networkx", "imshow", "interact",
+                                 "interact_manual", "interactive", "nx", "plt",
+                                 "rc"],
+    ".notebook.movie_player": ["HTML", "MoviePlayer", "Path", "Video",
+                               "b64encode", "datetime", "os", "re", "string",
+                               "tempfile"],
+    ".notebook.slideshow_player": ["Button", "HBox", "Image", "Javascript",
+                                   "SlideshowPlayer", "VBox", "asyncio",
+                                   "display", "io", "nest_asyncio", "widgets"],
+}
 
-from .graphics.tensor_image import *
-from .graphics.tree_image import *
-from .graphics.uncompressed_image import *
+_lazy_names = {name: module
+               for module, names in _lazy_modules.items()
+               for name in names}
 
-from .graphics.tensor_canvas import *
-from .graphics.movie_canvas import *
-from .graphics.spacetime_canvas import *
-from .graphics.canvas_layout import *
+_lazy_names["graphics"] = ".graphics"
+_lazy_names["notebook"] = ".notebook"
 
-from .notebook.notebook_utils import *
-from .notebook.tensor_maker import *
-from .notebook.tensor_display import *
-from .notebook.movie_player import *
-from .notebook.slideshow_player import *
+__all__ = [name for name in globals() if not name.startswith("_")] \
+          + list(_lazy_names)
+
+
+def __getattr__(name, _lazy_names=_lazy_names):
+    """Import the graphics/notebook module exporting `name`"""
+
+    module = _lazy_names.get(name)
+
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    value = import_module(module, __name__)
+
+    if module != "." + name:
+        value = getattr(value, name)
+
+    globals()[name] = value
+
+    return value
+
+
+def __dir__(_lazy_names=_lazy_names):
+    return sorted(set(globals()) | set(_lazy_names))
 
-from collections import namedtuple
 
+del _lazy_modules, _lazy_names
@@ -0,0 +1,548 @@
+#cython: language_level=3
+#cython: profile=True
+"""Array Storage
+
+A module holding the classes used to store the coordinates and
+payloads of a **leaf** fiber in typed, contiguous NumPy arrays rather
+than in Python lists of (boxed) values.
+
+An array-backed fiber is created with `Fiber.fromArrays()`. Its
+`Fiber.coords` and `Fiber.payloads` instance variables hold a
+`CoordArray` and a `PayloadArray`, respectively. Both classes support
+the read-only part of the `list` protocol, so the non-mutating
+methods of a `Fiber` work unchanged. Coordinates are returned as
+Python scalars and payloads are returned as newly created `Payload`
+objects (i.e., **views** of the stored value).
+
+Since a `Payload` created from a `PayloadArray` is a copy of the
+stored value, updates to it are not reflected in the fiber. Therefore
+any fiber method that mutates the fiber or hands out references to
+its payloads (e.g., `Fiber.getPayloadRef()`, `Fiber.append()` or being
+the target of the populate (<<) operator) first converts the fiber
+back to list-based storage (see `Fiber._unpackArrays()`).
+
+The copies of a leaf fiber (see `Fiber._copyFibers()`) are also
+array-backed. They share read-only arrays of the coordinates and
+values of the original, and hold their payloads in a
+`SharedPayloadArray`, which keeps the `Payload` it hands out for each
+position, so a copy can be updated in place until it is converted back
+to list-based storage like any other array-backed fiber.
+
+Tensors loaded from a compressed sparse fiber (CSF) file with
+`Tensor.fromFile()` use a `CSFRank` for each rank, whose fibers are
+created from the arrays in the file as they are accessed. The payloads
+of the non-leaf fibers are held in a `FiberArray`.
+
+"""
+
+from itertools import islice
+
+import numpy as np
+
+from .payload import Payload
+
+#
+# Number of elements converted to Python objects at a time when
+# iterating through an array
+#
+_CHUNK = 4096
+
+
+class CoordArray:
+    """A read-only list-like wrapper of an array of coordinates
+
+    Parameters
+    ----------
+
+    array: numpy.ndarray
+        A one-dimensional array of coordinates
+
+    ordered: bool, default=True
+        Whether the coordinates are in increasing order
+
+    """
+
+    __slots__ = ("array", "ordered")
+
+    def __init__(self, array, ordered=True):
+
+        self.array = array
+        self.ordered = ordered
+
+    def __len__(self):
+        """__len__"""
+
+        return self.array.shape[0]
+
+    def __getitem__(self, key):
+        """Get a coordinate (or a list of coordinates for a slice)"""
+
+        if isinstance(key, slice):
+            return self.array[key].tolist()
+
+        return self.array[key].item()
+
+    def __iter__(self):
+        """__iter__"""
+
+        return _iterArray(self.array, 0)
+
+    def __reversed__(self):
+        """__reversed__"""
+
+        return reversed(self.array.tolist())
+
+    def __contains__(self, coord):
+        """__contains__"""
+
+        return self._find(coord) >= 0
+
+    def __eq__(self, other):
+        """__eq__"""
+
+        if isinstance(other, CoordArray):
+            other = other.tolist()
+
+        return self.tolist() == other
+
+    def __add__(self, other):
+        """Concatenate with a list (returns a list)"""
+
+        return self.tolist() + list(other)
+
+    def __radd__(self, other):
+        """Concatenate with a list (returns a list)"""
+
+        return list(other) + self.tolist()
+
+    def __repr__(self):
+        """__repr__"""
+
+        return repr(self.tolist())
+
+    def index(self, coord):
+        """Return the position of the first occurrence of `coord`"""
+
+        pos = self._find(coord)
+        if pos < 0:
+            raise ValueError("%r is not in list" % (coord,))
+
+        return pos
+
+    def copy(self):
+        """Return the coordinates as a list"""
+
+        return self.tolist()
+
+    def tolist(self):
+        """Return the coordinates as a list"""
+
+        return self.array.tolist()
+
+    def iterFrom(self, pos):
+        """Iterate over the coordinates starting at position `pos`"""
+
+        return _iterArray(self.array, pos)
+
+    def bisectLeft(self, coord, lo=0):
+        """Equivalent of `bisect.bisect_left()` on the coordinates"""
+
+        return lo + int(np.searchsorted(self.array[lo:], coord, side="left"))
+
+    def _find(self, coord):
+        """Return the position of the first occurrence of `coord` (or
+        -1 if it is not present) without converting the array"""
+
+        array = self.array
+
+        if np.ndim(coord) != 0:
+            return -1
+
+        try:
+            if self.ordered:
+                pos = int(np.searchsorted(array, coord, side="left"))
+                if pos < array.shape[0] and array[pos] == coord:
+                    return pos
+
+                return -1
+
+            matches = np.flatnonzero(array == coord)
+        except TypeError:
+            return -1
+
+        return int(matches[0]) if matches.shape[0] > 0 else -1
+
+
+class PayloadArray:
+    """A read-only list-like wrapper of an array of (unboxed) payloads
+
+    Parameters
+    ----------
+
+    array: numpy.ndarray
+        A one-dimensional array of leaf values
+
+    """
+
+    __slots__ = ("array",)
+
+    #
+    # Whether the array is shared with copies of the fiber (see
+    # `SharedPayloadArray`)
+    #
+    shared = False
+
+    def __init__(self, array):
+
+        self.array = array
+
+    def __len__(self):
+        """__len__"""
+
+        return self.array.shape[0]
+
+    def __getitem__(self, key):
+        """Get a payload (or a list of payloads for a slice)"""
+
+        if isinstance(key, slice):
+            return [Payload(v) for v in self.array[key].tolist()]
+
+        return Payload(self.array[key].item())
+
+    def __iter__(self):
+        """__iter__"""
+
+        return self.iterFrom(0)
+
+    def __reversed__(self):
+        """__reversed__"""
+
+        return (Payload(v) for v in reversed(self.array.tolist()))
+
+    def __eq__(self, other):
+        """__eq__"""
+
+        return list(self) == list(other)
+
+    def __add__(self, other):
+        """Concatenate with a list (returns a list)"""
+
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        """Concatenate with a list (returns a list)"""
+
+        return list(other) + list(self)
+
+    def __repr__(self):
+        """__repr__"""
+
+        return repr(list(self))
+
+    def copy(self):
+        """Return the payloads as a list of `Payload`s"""
+
+        return list(self)
+
+    def tolist(self):
+        """Return the (unboxed) values as a list"""
+
+        return self.array.tolist()
+
+    def iterFrom(self, pos):
+        """Iterate over the payloads starting at position `pos`"""
+
+        return (Payload(v) for v in _iterArray(self.array, pos))
+
+
+class SharedPayloadArray(PayloadArray):
+    """A list-like wrapper of an array of payloads shared between copies
+
+    Used as the payloads of a copy of a leaf fiber (see
+    `Fiber._copyFibers()`), whose read-only arrays of coordinates and
+    values are shared with the other copies of the same fiber.
+
+    Unlike a `PayloadArray`, the `Payload` of each position is created
+    the first time it is accessed and then kept, so in-place updates
+    to it (e.g., `p += 1`) are seen by later accesses. The array itself
+    is never written.
+
+    Parameters
+    ----------
+
+    array: numpy.ndarray
+        A one-dimensional (read-only) array of leaf values
+
+    """
+
+    __slots__ = ("boxes",)
+
+    shared = True
+
+    def __init__(self, array):
+
+        super().__init__(array)
+
+        #
+        # The `Payload` of each position (or None), created on first access
+        #
+        self.boxes = None
+
+    def __getitem__(self, key):
+        """Get a payload (or a list of payloads for a slice)"""
+
+        if isinstance(key, slice):
+            return [self._box(i) for i in range(*key.indices(len(self)))]
+
+        if key < 0:
+            key += len(self)
+
+        if not 0 <= key < len(self):
+            raise IndexError("SharedPayloadArray index out of range")
+
+        return self._box(key)
+
+    def __reversed__(self):
+        """__reversed__"""
+
+        return reversed(self._boxAll())
+
+    def __eq__(self, other):
+        """__eq__"""
+
+        return [Payload(v) for v in self.tolist()] == list(other)
+
+    def __repr__(self):
+        """__repr__"""
+
+        return repr([Payload(v) for v in self.tolist()])
+
+    def tolist(self):
+        """Return the (unboxed) current values as a list"""
+
+        values = self.array.tolist()
+
+        if self.boxes is not None:
+            for pos, box in enumerate(self.boxes):
+                if box is not None:
+                    values[pos] = box.value
+
+        return values
+
+    def iterFrom(self, pos):
+        """Iterate over the payloads starting at position `pos`"""
+
+        return islice(self._boxAll(), pos, None)
+
+    def _box(self, pos):
+        """Return the `Payload` of position `pos` (creating it if needed)"""
+
+        boxes = self.boxes
+        if boxes is None:
+            boxes = self.boxes = [None] * len(self)
+
+        box = boxes[pos]
+        if box is None:
+            box = boxes[pos] = Payload(self.array[pos].item())
+
+        return box
+
+    def _boxAll(self):
+        """Return the list of the `Payload`s of all the positions"""
+
+        boxes = self.boxes
+        if boxes is None:
+            boxes = self.boxes = [Payload(v) for v in self.array.tolist()]
+        elif any(box is None for box in boxes):
+            for pos, value in enumerate(self.array.tolist()):
+                if boxes[pos] is None:
+                    boxes[pos] = Payload(value)
+
+        return boxes
+
+
+class FiberArray:
+    """A read-only list-like sequence of fibers of a `CSFRank`
+
+    Used as the payloads of a non-leaf fiber (and as the fibers of a
+    rank) of a tensor loaded from a compressed sparse fiber (CSF)
+    file. The fibers are only created as they are accessed.
+
+    Parameters
+    ----------
+
+    csf_rank: CSFRank
+        The rank holding the fibers
+
+    start: integer
+        The index of the first fiber in `csf_rank`
+
+    stop: integer
+        One past the index of the last fiber in `csf_rank`
+
+    """
+
+    __slots__ = ("csf_rank", "start", "stop")
+
+    shared = False
+
+    def __init__(self, csf_rank, start, stop):
+
+        self.csf_rank = csf_rank
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        """__len__"""
+
+        return self.stop - self.start
+
+    def __getitem__(self, key):
+        """Get a fiber (or a list of fibers for a slice)"""
+
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+
+        if key < 0:
+            key += len(self)
+
+        if not 0 <= key < len(self):
+            raise IndexError("FiberArray index out of range")
+
+        return self.csf_rank.getFiber(self.start + key)
+
+    def __iter__(self):
+        """__iter__"""
+
+        return self.iterFrom(0)
+
+    def __reversed__(self):
+        """__reversed__"""
+
+        return (self[i] for i in reversed(range(len(self))))
+
+    def __eq__(self, other):
+        """__eq__"""
+
+        return list(self) == list(other)
+
+    def __add__(self, other):
+        """Concatenate with a list (returns a list)"""
+
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        """Concatenate with a list (returns a list)"""
+
+        return list(other) + list(self)
+
+    def __repr__(self):
+        """__repr__"""
+
+        return repr(list(self))
+
+    def copy(self):
+        """Return the fibers as a list"""
+
+        return list(self)
+
+    def tolist(self):
+        """Return the fibers as a list"""
+
+        return list(self)
+
+    def iterFrom(self, pos):
+        """Iterate over the fibers starting at position `pos`"""
+
+        get_fiber = self.csf_rank.getFiber
+
+        return (get_fiber(i) for i in range(self.start + pos, self.stop))
+
+
+class CSFRank:
+    """The fibers of one rank of a tensor in CSF arrays
+
+    The coordinates of all the fibers of the rank are held in one
+    array, and the coordinates of fiber `i` are those at positions
+    `segments[i]` to `segments[i+1]`. The payloads of the elements
+    are either the values in `payloads` (for the leaf rank) or the
+    fibers of the `next_rank` with the same index as the element.
+
+    Fibers are created (and cached) as they are accessed.
+
+    Parameters
+    ----------
+
+    rank: Rank
+        The rank of the tensor that owns the fibers
+
+    coords: numpy.ndarray
+        The coordinates of all the fibers in the rank
+
+    segments: numpy.ndarray
+        The position in `coords` of the start of each fiber (plus the
+        total number of coordinates)
+
+    payloads: numpy.ndarray or None
+        The values of all the elements of a leaf rank
+
+    next_rank: CSFRank or None
+        The next (lower) rank for a non-leaf rank
+
+    """
+
+    def __init__(self, rank, coords, segments, payloads=None, next_rank=None):
+
+        assert (payloads is None) != (next_rank is None)
+
+        self.rank = rank
+        self.coords = coords
+        self.segments = segments
+        self.payloads = payloads
+        self.next_rank = next_rank
+
+        self._fibers = {}
+
+    def __len__(self):
+        """Return the number of fibers in the rank"""
+
+        return self.segments.shape[0] - 1
+
+    def getFibers(self):
+        """Return a `FiberArray` of all the fibers in the rank"""
+
+        return FiberArray(self, 0, len(self))
+
+    def getFiber(self, index):
+        """Get (and create if necessary) the fiber at `index`"""
+
+        fiber = self._fibers.get(index)
+
+        if fiber is not None:
+            return fiber
+
+        from .fiber import Fiber
+
+        start = int(self.segments[index])
+        stop = int(self.segments[index + 1])
+
+        fiber = Fiber()
+        fiber.coords = CoordArray(self.coords[start:stop])
+
+        if self.next_rank is None:
+            fiber.payloads = PayloadArray(self.payloads[start:stop])
+        else:
+            fiber.payloads = FiberArray(self.next_rank, start, stop)
+
+        fiber.setOwner(self.rank)
+
+        self._fibers[index] = fiber
+
+        return fiber
+
+
+def _iterArray(array, pos):
+    """Iterate over an array converting elements a chunk at a time"""
+
+    for start in range(pos, array.shape[0], _CHUNK):
+        yield from array[start:start + _CHUNK].tolist()
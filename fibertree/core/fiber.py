@@ -26,7 +26,8 @@ from .any import Any
 from .coord_payload import CoordPayload
 from .iterators import coiterShape, coiterShapeRef, coiterActiveShape, \
     coiterActiveShapeRef, coiterRangeShape, coiterRangeShapeRef, intersection, \
-    union
+    union, _get_format
+from .kernels import find_eq, find_ge
 from .metrics import Metrics
 from .payload import Payload
 from .rank_attrs import RankAttrs
@@ -37,6 +38,19 @@ from .rank_attrs import RankAttrs
 module_logger = logging.getLogger('fibertree.core.fiber')
 
 
+#
+# Minimum number of coordinates in a fiber for which the coordinate
+# hash index is used (see `Fiber.setCoordIndex()`)
+#
+_COORD_INDEX_MIN_OCCUPANCY = 32
+
+#
+# Types of payload values that can be copied by just boxing them
+# again (see `Fiber._copyFibers()`)
+#
+_IMMUTABLE_VALUES = (int, float, complex, bool, str, type(None))
+
+
 #
 # Define an error class
 #
@@ -167,6 +181,20 @@ class Fiber:
 
     """
 
+    #
+    # Count of the (possible) mutations of any fiber, i.e., of the
+    # times a fiber was about to be mutated or handed out its lists of
+    # coordinates or payloads. Used to validate information cached
+    # about a fibertree (see `fibertree.model.Format`).
+    #
+    _mutation_count = 0
+
+    #
+    # The arrays of the coordinates and values of a (list-based) leaf
+    # fiber last shared with its copies (see `Fiber._packLeaf()`)
+    #
+    _packed = None
+
 
     def __init__(self,
                  coords=None,
@@ -285,6 +313,12 @@ class Fiber:
         #
         self._saved_pos = 0
 
+        #
+        # The coordinate hash index is built when it is first used
+        #
+        self._use_coord_index = None
+        self._clearCoordIndex()
+
         #
         # Clear all stats
         #
@@ -563,6 +597,69 @@ class Fiber:
 
         return f_out
 
+    @classmethod
+    def fromArrays(cls, coords, payloads, **kwargs):
+        """Construct a leaf Fiber stored in NumPy arrays
+
+        Create a **leaf** fiber whose coordinates and (unboxed)
+        payloads are held in typed, contiguous NumPy arrays instead
+        of in Python lists of `Payload`s. Coordinates and `Payload`s
+        are only created as they are accessed (see
+        `fibertree.core.array_storage`).
+
+        Parameters
+        ----------
+
+        coords: array_like
+            A one-dimensional sequence of scalar coordinates
+
+        payloads: array_like
+            A one-dimensional sequence of scalar values
+
+        kwargs: keyword arguments
+            Keyword arguments accepted by `Fiber.__init__()`
+
+        Notes
+        -----
+
+        Arrays (including `numpy.memmap`s) are used without copying.
+
+        The fiber is converted back to list-based storage the first
+        time it is mutated or a reference to one of its payloads is
+        requested, e.g., by `Fiber.getPayloadRef()` or by being the
+        target of the populate (<<) operator. Payloads obtained by
+        iterating over an array-backed fiber are copies of the stored
+        values.
+
+        """
+
+        import numpy as np
+
+        from .array_storage import CoordArray, PayloadArray
+
+        coords = np.asarray(coords)
+        payloads = np.asarray(payloads)
+
+        assert coords.ndim == 1 and payloads.ndim == 1, \
+            "Array-backed fibers only support scalar coordinates and payloads"
+
+        assert coords.shape == payloads.shape, \
+            "Coordinates and payloads must be same length"
+
+        f = cls(**kwargs)
+
+        if f._ordered:
+            assert bool((coords[1:] > coords[:-1]).all()), \
+                "Illegal non-monotonic coordinate"
+        elif f._unique:
+            assert np.unique(coords).shape == coords.shape, \
+                "Illegal repeated coordinate"
+
+        f.coords = CoordArray(coords, f._ordered)
+        f.payloads = PayloadArray(payloads)
+
+        return f
+
 
 #
 # Stats-related methods
@@ -600,6 +697,14 @@ class Fiber:
         """
         assert not self.isLazy()
 
+        Fiber._mutation_count += 1
+
+        # The coordinates may be changed in place
+        self._clearCoordIndex()
+
+        if type(self.coords) is not list and self.payloads.shared:
+            self._unpackArrays()
+
         return self.coords
 
     #
@@ -707,9 +812,55 @@ class Fiber:
         """
         assert not self.isLazy()
 
+        Fiber._mutation_count += 1
+
+        if type(self.coords) is not list and self.payloads.shared:
+            self._unpackArrays()
+
         return self.payloads
 
 
+    def isArrayBacked(self):
+        """Return whether the fiber is stored in NumPy arrays
+
+        Returns
+        -------
+        is_array_backed: Boolean
+            Set to True if the fiber was created with
+            `Fiber.fromArrays()`, or is a copy sharing the arrays of
+            its original (see `Fiber._copyFibers()`), and has not been
+            mutated since
+
+        """
+
+        return type(self.coords) is not list
+
+
+    def _unpackArrays(self):
+        """Convert an array-backed fiber to list-based storage
+
+        Called before any operation that mutates the fiber or hands
+        out references to its payloads, so it also counts the
+        (possible) mutation.
+
+        """
+
+        Fiber._mutation_count += 1
+
+        if type(self.coords) is list:
+            return
+
+        payloads = self.payloads
+
+        self.coords = self.coords.tolist()
+
+        if payloads.shared:
+            # Keep the payloads that were already handed out
+            self.payloads = payloads.copy()
+        else:
+            self.payloads = [Payload(v) for v in payloads.tolist()]
+
+
     def isOrdered(self):
         """Return the status of the "ordered" attribute
 
@@ -839,7 +990,7 @@ class Fiber:
             payload = Payload.maybe_box(default)
             const_used = True
 
-        if Metrics.isCollecting() and trace is not None:
+        if trace is not None and Metrics.isCollecting():
             Metrics.addUse(self.getRankAttrs().getId(), coords[0], index, type_=trace)
 
         if not const_used and len(coords) > 1:
@@ -901,6 +1052,9 @@ class Fiber:
         assert not self.isLazy()
         assert start_pos is None or len(coords) == 1
 
+        # References require list-based storage
+        self._unpackArrays()
+
         # TBD: Actually optimize the search
 
         start_pos = Payload.get(start_pos)
@@ -945,11 +1099,14 @@ class Fiber:
 
         assert Payload.is_payload(payload)
 
+        self._unpackArrays()
+
         if pos is None:
             pos = self._coord2pos(coord)
 
         self.coords.insert(pos, coord)
         self.payloads.insert(pos, payload)
+        self._indexInsert(pos, coord)
 
         #
         # Get the payload out of the payloads array
@@ -962,7 +1119,18 @@ class Fiber:
         return payload
 
     def _deletePayload(self, coord):
-        """Remove a payload """
+        """Remove the element at `coord` (if it exists) from the fiber"""
+
+        self._unpackArrays()
+
+        pos = self._coord2pos(coord)
+
+        if not self._coordExists(coord, pos):
+            return
+
+        del self.coords[pos]
+        del self.payloads[pos]
+        self._indexDelete(pos, coord)
 
 
     def getRange(self,
@@ -1355,6 +1523,8 @@ class Fiber:
 
         payload = Payload.maybe_box(value)
 
+        self._unpackArrays()
+
         index = 0
         try:
             index = next(x for x, val in enumerate(self.coords) if val >= coord)
@@ -1362,10 +1532,12 @@ class Fiber:
                 return self.payloads[index]
             self.coords.insert(index, coord)
             self.payloads.insert(index, payload)
+            self._indexInsert(index, coord)
             return self.payloads[index]
         except StopIteration:
             self.coords.append(coord)
             self.payloads.append(payload)
+            self._indexInsert(len(self.coords) - 1, coord)
             return self.payloads[-1]
 
 
@@ -1376,13 +1548,17 @@ class Fiber:
 
         payload = Payload.maybe_box(value)
 
+        self._unpackArrays()
+
         try:
             index = next(x for x, val in enumerate(self.coords) if val > coord)
             self.coords.insert(index, coord)
             self.payloads.insert(index, payload)
+            self._indexInsert(index, coord)
         except StopIteration:
             self.coords.append(coord)
             self.payloads.append(payload)
+            self._indexInsert(len(self.coords) - 1, coord)
 
         return None
 
@@ -1810,6 +1986,186 @@ class Fiber:
         self._saved_count = 0
         self._saved_dist = 0
 
+
+    def setCoordIndex(self, enable=True):
+        """Enable or disable the coordinate hash index
+
+        The coordinate hash index maps each coordinate of a fiber to
+        its position, so lookups by coordinate (e.g.,
+        `Fiber.getPayload()` or `Fiber.getPayloadRef()`) take constant
+        time rather than time linear in the size of the fiber. By
+        default, the index is used for "unordered" fibers with at least
+        32 elements. It can also be enabled for "ordered" fibers, where
+        it replaces the binary search for existing coordinates.
+
+        The index is built the first time it is needed and is then
+        kept up to date as elements are appended or removed from the
+        end of the fiber. Any other insertion or deletion (which would
+        shift the positions of the following elements), or handing out
+        the coordinates with `Fiber.getCoords()`, discards the index,
+        which is rebuilt the next time it is needed.
+
+        Parameters
+        ----------
+        enable: Boolean or None, default=True
+            Whether to use the index (None restores the default)
+
+        Returns
+        -------
+        None
+
+        See also
+        --------
+
+        `Fiber.getCoordIndexSize()`
+
+        """
+
+        self._use_coord_index = enable
+        self._clearCoordIndex()
+
+
+    def getCoordIndexSize(self):
+        """Get the memory used by the coordinate hash index
+
+        Returns
+        -------
+        size: integer
+            The number of bytes used by the index (0 if it has not
+            been built)
+
+        Notes
+        -----
+
+        The coordinates themselves are shared with the fiber, so only
+        the hash table and the positions are counted.
+
+        """
+
+        index = self._coord_index
+
+        if index is None:
+            return 0
+
+        return sys.getsizeof(index) \
+            + sum(sys.getsizeof(pos) for pos in index.values() if pos > 256)
+
+
+    def _getCoordIndex(self):
+        """Get the coordinate hash index (or None if it is not used)
+
+        The index maps each coordinate to its (first) position in
+        `self.coords`. It is (re)built if the number of coordinates no
+        longer matches the index, i.e., if the coordinates were changed
+        without going through the methods that maintain the index.
+
+        """
+
+        use = self._use_coord_index
+        if use is None:
+            use = not self._ordered
+
+        coords = self.coords
+
+        if not use \
+           or type(coords) is not list \
+           or len(coords) < _COORD_INDEX_MIN_OCCUPANCY:
+            self._coord_index = None
+            return None
+
+        index = self._coord_index
+
+        if index is None or self._coord_index_len != len(coords):
+            try:
+                index = dict(zip(reversed(coords),
+                                 range(len(coords) - 1, -1, -1)))
+            except TypeError:
+                # Unhashable coordinates
+                self._use_coord_index = False
+                return None
+
+            self._coord_index = index
+            self._coord_index_len = len(coords)
+
+        return index
+
+
+    def _clearCoordIndex(self):
+        """Discard the coordinate hash index (it is rebuilt when needed)"""
+
+        self._coord_index = None
+        self._coord_index_len = 0
+
+
+    def _indexInsert(self, pos, coord):
+        """Update the coordinate hash index after inserting `coord` at `pos`
+
+        Only an insertion at the end is applied to the index, since any
+        other would shift the positions of the following elements, so
+        the index is discarded instead.
+
+        """
+
+        index = self._coord_index
+
+        if index is None:
+            return
+
+        length = len(self.coords)
+
+        if self._coord_index_len != length - 1 or pos != length - 1:
+            self._clearCoordIndex()
+            return
+
+        if coord not in index:
+            index[coord] = pos
+
+        self._coord_index_len = length
+
+
+    def _indexReplace(self, pos, old_coord, coord):
+        """Update the coordinate hash index after replacing `old_coord`
+        with `coord` at `pos`"""
+
+        index = self._coord_index
+
+        if index is None or old_coord == coord:
+            return
+
+        if self._unique \
+           and self._coord_index_len == len(self.coords) \
+           and index.get(old_coord) == pos \
+           and coord not in index:
+            del index[old_coord]
+            index[coord] = pos
+        else:
+            self._clearCoordIndex()
+
+
+    def _indexDelete(self, pos, coord):
+        """Update the coordinate hash index after deleting `coord` at `pos`
+
+        As with `Fiber._indexInsert()`, only a deletion at the end is
+        applied to the index, otherwise the index is discarded.
+
+        """
+
+        index = self._coord_index
+
+        if index is None:
+            return
+
+        length = len(self.coords)
+
+        if self._coord_index_len != length + 1 or pos != length:
+            self._clearCoordIndex()
+            return
+
+        if index.get(coord) == pos:
+            del index[coord]
+
+        self._coord_index_len = length
+
     #
     # Computed attribute acccessors
     #
@@ -2085,6 +2441,8 @@ class Fiber:
 
         assert not self.isLazy()
 
+        self._unpackArrays()
+
         position = key
 
         #
@@ -2108,7 +2466,9 @@ class Fiber:
                 if position + 1 < len(self.coords) and coord >= self.coords[position + 1]:
                     raise CoordinateError
 
+            old_coord = self.coords[position]
             self.coords[position] = coord
+            self._indexReplace(position, old_coord, coord)
 
         #
         # A payload of None just updates the coordinate
@@ -2302,8 +2662,11 @@ class Fiber:
 
         """
 
+        self._unpackArrays()
+
         self.coords.clear()
         self.payloads.clear()
+        self._clearCoordIndex()
 
         # No longer lazy
         self._setIsLazy(False)
@@ -2349,8 +2712,11 @@ class Fiber:
 
         payload = Payload.maybe_box(value)
 
+        self._unpackArrays()
+
         self.coords.append(coord)
         self.payloads.append(payload)
+        self._indexInsert(len(self.coords) - 1, coord)
 
 
     def extend(self, other):
@@ -2392,7 +2758,12 @@ class Fiber:
             assert self.maxCoord() is None or self.maxCoord() < other.coords[0], \
                 "Fiber coordinates in 'ordered' fibers must be monotonically increasing"
 
-        self.coords.extend(other.coords)
+        self._unpackArrays()
+
+        for coord in other.coords:
+            self.coords.append(coord)
+            self._indexInsert(len(self.coords) - 1, coord)
+
         self.payloads.extend(other.payloads)
 
         return None
@@ -2464,6 +2835,8 @@ class Fiber:
             # Nothing to do
             return None
 
+        self._unpackArrays()
+
         if rankid is not None:
             depth = self._rankid2depth(rankid)
 
@@ -2496,6 +2869,9 @@ class Fiber:
             sorted_cp = sorted(zipped_cp)
             self.coords, self.payloads = [list(tuple) for tuple in zip(*sorted_cp)]
 
+        # All the coordinates may have changed
+        self._clearCoordIndex()
+
         #
         # Update the fiber's rank_id and/or shape
         #
@@ -2558,6 +2934,8 @@ class Fiber:
                 p.updatePayloads(func, depth=depth - 1)
         else:
             # Update my payloads
+            self._unpackArrays()
+
             for i, (c, p) in enumerate(self.iterOccupancy(tick=False)):
                 self.payloads[i] = func(i, c, p)
 
@@ -3005,6 +3383,7 @@ class Fiber:
             #
             self.coords = []
             self.payloads = []
+            self._clearCoordIndex()
 
         self._setDefault(other.getDefault())
         for c, p in other:
@@ -3298,6 +3677,10 @@ class Fiber:
         #
         # Othewise multiply `other` to each element of `self`
         #
+        # Note: the payloads are updated in place
+        #
+        self._unpackArrays()
+
         for _, p in self:
             p *= other
 
@@ -3450,6 +3833,10 @@ class Fiber:
 
                 assert isinstance(self.fiber.coords[0], int)
 
+                if self.fiber._isSliceable(self.pre_halo, self.post_halo):
+                    yield from self.iter_slices()
+                    return
+
                 active_start, active_end = self.fiber.getActive()
 
                 upper_coords = []
@@ -3502,12 +3889,34 @@ class Fiber:
                 for uc, lc, lp in zip(upper_coords, lower_coords, lower_payloads):
                     yield self.build_elem(uc, lc, lp)
 
+            def iter_slices(self):
+                # Without halos, each coordinate is in exactly one
+                # partition, so the elements of each (non-empty)
+                # partition can be sliced out between its bounds
+                fiber = self.fiber
+                active_start, active_end = fiber.getActive()
+                default = fiber.getDefault()
+
+                pos = fiber._bisectCoord(active_start)
+                end_pos = fiber._bisectCoord(active_end, pos)
+
+                while pos < end_pos:
+                    part = fiber.coords[pos] // self.step * self.step
+                    next_pos = fiber._bisectCoord(min(part + self.step, active_end), pos)
+
+                    coords, payloads = fiber._sliceElements(pos, next_pos, default)
+                    if coords:
+                        yield self.build_elem(part, coords, payloads)
+
+                    pos = next_pos
+
             def build_elem(self, part, coords, payloads):
                 if relativeCoords:
                     coords = [c - part for c in coords]
 
-                range_start = max(part, self.fiber.getActive()[0])
-                range_end = min(part + self.step, self.fiber.getActive()[1])
+                active_start, active_end = self.fiber.getActive()
+                range_start = max(part, active_start)
+                range_end = min(part + self.step, active_end)
                 active_range = (range_start, range_end)
 
                 return part, coords, payloads, active_range
@@ -3633,6 +4042,10 @@ class Fiber:
 
                 active_start, active_end = self.fiber.getActive()
 
+                if self.fiber._isSliceable(self.pre_halo, self.post_halo):
+                    yield from self.iter_slices(active_start, active_end)
+                    return
+
                 lower_coords = [[] for _ in splits]
                 lower_payloads = [[] for _ in splits]
 
@@ -3681,6 +4094,25 @@ class Fiber:
                     if lc:
                         yield self.build_elem(i, lc, lp)
 
+            def iter_slices(self, active_start, active_end):
+                # Without halos, the elements of each partition are the
+                # ones between its bounds (clipped to the active range)
+                fiber = self.fiber
+                default = fiber.getDefault()
+
+                for i in range(len(splits)):
+                    start = max(self.splits[i], active_start)
+                    end = min(self.splits[i + 1], active_end)
+                    if start >= end:
+                        continue
+
+                    lo = fiber._bisectCoord(start)
+                    hi = fiber._bisectCoord(end, lo)
+
+                    coords, payloads = fiber._sliceElements(lo, hi, default)
+                    if coords:
+                        yield self.build_elem(i, coords, payloads)
+
             def add_post_halo(self, coord):
                 if self.post_halo != 0:
                     return coord + self.post_halo
@@ -3690,8 +4122,9 @@ class Fiber:
                 if relative:
                     coords = [c - self.splits[ind] for c in coords]
 
-                range_start = max(self.splits[ind], self.fiber.getActive()[0])
-                range_end = min(self.splits[ind + 1], self.fiber.getActive()[1])
+                active_start, active_end = self.fiber.getActive()
+                range_start = max(self.splits[ind], active_start)
+                range_end = min(self.splits[ind + 1], active_end)
                 active_range = (range_start, range_end)
 
                 return self.splits[ind], coords, payloads, active_range
@@ -3750,13 +4183,23 @@ class Fiber:
         class _SplitterEqual():
 
             def __init__(self, fiber, step, pre_halo, post_halo, relative):
-                splits = []
-                for i, (c, _) in enumerate(fiber.iterActive(tick=False)):
-                    if i == 0:
-                        splits.append(fiber.getActive()[0])
+                active_start, active_end = fiber.getActive()
 
-                    elif i % step == 0:
-                        splits.append(c)
+                if not fiber.isLazy() and fiber.isOrdered():
+                    # Pick every step-th (non-empty) element directly
+                    lo = fiber._bisectCoord(active_start)
+                    hi = fiber._bisectCoord(active_end, lo)
+                    coords, _ = fiber._sliceElements(lo, hi)
+
+                    splits = [active_start] + coords[step::step] if coords else []
+                else:
+                    splits = []
+                    for i, (c, _) in enumerate(fiber.iterActive(tick=False)):
+                        if i == 0:
+                            splits.append(active_start)
+
+                        elif i % step == 0:
+                            splits.append(c)
 
                 self.iter = fiber._splitNonUniform_iter(splits, pre_halo, post_halo, relative)
 
@@ -3885,18 +4328,85 @@ class Fiber:
             A fiber like self with the top rank split into two according to the
             splitter
         """
-        fiber = copy.deepcopy(self)
+        # Copy without the owners, which would copy the whole tensor
+        fiber = Fiber._copyPayloads([self])[0]
 
         if depth == 0:
             return fiber._splitFiber(splitter)
 
         fiber.updatePayloadsBelow(Fiber._splitFiber, splitter, depth=depth-1)
 
-        # Only clear the owner after the split so that the fiber has the full
-        # shape information
-        fiber.setOwner(None)
         return fiber
 
+    def _isSliceable(self, pre_halo, post_halo):
+        """Can a split of the fiber (with the given halos) slice out the
+        elements of each partition?
+
+        This requires an eager, ordered fiber iterated over its
+        occupancy (i.e., in the "C" format) and no halos, so that each
+        element is in exactly one partition.
+
+        """
+        return pre_halo == 0 and post_halo == 0 \
+            and not self.isLazy() and self._ordered \
+            and _get_format(self) == "C"
+
+    def _bisectCoord(self, coord, lo=0):
+        """Find the first position at or after `lo` of an element of an
+        eager, ordered fiber with a coordinate not less than `coord`"""
+
+        if type(self.coords) is list:
+            return bisect.bisect_left(self.coords, coord, lo)
+
+        return self.coords.bisectLeft(coord, lo)
+
+    def _sliceElements(self, lo, hi, default=None):
+        """Get the coordinates and payloads of the non-empty elements at
+        positions [`lo`, `hi`) of an eager fiber
+
+        Parameters
+        ----------
+
+        lo: int
+            The first position
+
+        hi: int
+            The position after the last one
+
+        default: value, default=None
+            The default payload of the fiber (looked up if None)
+
+        Returns
+        -------
+
+        coords: list
+            The coordinates of the elements
+
+        payloads: list
+            The payloads of the elements
+
+        """
+        coords = self.coords[lo:hi]
+        payloads = self.payloads[lo:hi]
+
+        # Drop any empty elements (as iteration over the fiber would)
+        if default is None:
+            default = self.getDefault()
+
+        default_value = Payload.get(default)
+        is_empty = Payload.isEmpty
+
+        empty = [i for i, p in enumerate(payloads)
+                 if (p.value == default_value if type(p) is Payload
+                     else is_empty(p, default=default))]
+
+        if empty:
+            empty = set(empty)
+            coords = [c for i, c in enumerate(coords) if i not in empty]
+            payloads = [p for i, p in enumerate(payloads) if i not in empty]
+
+        return coords, payloads
+
     def _splitFiber(self, splitter):
         """Split a single fiber into two according to the splitter
 
@@ -4012,9 +4522,12 @@ class Fiber:
         Notes
         -----
 
-        This function relies on flattenRanks() and unflattenRanks().
-        FIXME: flattenRanks() could be more general to support all p1 types,
-        including tuples.
+        The swap is a transpose (like converting CSR to CSC): the
+        elements of the lower rank are put in a bucket for each of
+        their coordinates, and each bucket becomes a fiber of the new
+        lower rank. The result is the same as flattening the two ranks
+        with style="pair", sorting by the lower coordinate, and
+        unflattening.
 
         Note
         ----
@@ -4027,35 +4540,284 @@ class Fiber:
         assert self._ordered and self._unique
 
         #
-        # Flatten the (highest) two ranks
+        # Put the position of each element of the lower rank into the
+        # bucket of its coordinate (in the order of the upper rank)
         #
-        # Note: We do not need to deepcopy explicitly, because flattenRanks
-        # does the deepcopy for us
-        flattened = self.flattenRanks(style="pair")
+        buckets = {}
+        upper_coords = []
+        elements = []
+        default = Payload(0)
 
-        # Make sure that the flattened fiber has at least one coordinate
-        assert(len(flattened.coords) > 0)
+        for c1, p1 in zip(self.coords, self.payloads):
+            if not Payload.contains(p1, Fiber):
+                raise PayloadError
 
-        # Make sure the coord is a >=2-element tuple
-        assert(len(flattened.coords[0]) >= 2)
+            default = p1.getDefault()
 
-        #
-        # Sort on secord coordinate of flattened fiber
-        # and create new sorted fiber
-        #
-        sorted_cp = sorted([(c[::-1], p) for c, p in flattened])
+            for c0, p0 in p1:
+                bucket = buckets.get(c0)
+                if bucket is None:
+                    bucket = buckets[c0] = []
+
+                bucket.append(len(elements))
+                upper_coords.append(c1)
+                elements.append(p0)
 
-        coords = [c for c, _ in sorted_cp]
-        payloads = [p for _, p in sorted_cp]
+        # Make sure that there is at least one element to swap
+        assert len(elements) > 0
 
-        flattened_sorted = Fiber(coords, payloads, default=flattened.getDefault())
+        elements = Fiber._copyPayloads(elements)
 
         #
-        # Unflatten to get original coordinates in swapped ranks
+        # Create a fiber of the new lower rank from each bucket
         #
-        swapped = flattened_sorted.unflattenRanks()
+        coords = sorted(buckets)
+        payloads = []
+        for c0 in coords:
+            bucket = buckets[c0]
+            payloads.append(Fiber([upper_coords[i] for i in bucket],
+                                  [elements[i] for i in bucket],
+                                  default=default))
+
+        return Fiber(coords, payloads, default=Fiber())
+
+    @staticmethod
+    def _copyPayloads(payloads):
+        """Deep copy a list of payloads (which may be fibers)
+
+        The fibers are copied together with `Fiber._copyFibers()`,
+        without their owners, since copying an owning rank would copy
+        all of its fibers. Instead, as in
+        `Fiber.copy(preserve_owner=False)`, each copied fiber gets a
+        copy of its owner's rank attributes.
+
+        Parameters
+        ----------
+
+        payloads: list
+            The payloads to copy
+
+        Returns
+        -------
+
+        copied: list
+            The copied payloads
 
-        return swapped
+        """
+        copies = Fiber._copyFibers([p for p in payloads if isinstance(p, Fiber)])
+
+        return [copies[id(p)] if isinstance(p, Fiber) else copy.deepcopy(p)
+                for p in payloads]
+
+    @staticmethod
+    def _copyFibers(fibers, owners=None):
+        """Copy fibertrees level by level
+
+        Every fiber is copied to a new `Fiber` object. The copy of a
+        leaf fiber (judging by its first payload) whose coordinates are
+        integers and whose values are all integers, all floats or all
+        booleans is array-backed. It shares read-only arrays of those
+        values with the other copies of the same fiber, and the arrays
+        are only copied when the copy is mutated (see
+        `Fiber._packLeaf()` and
+        `fibertree.core.array_storage.SharedPayloadArray`). The
+        elements of any other leaf fiber are copied with a flat pass
+        (see `Fiber._copyLeafPayload()`), rather than with a generic
+        deep copy of each payload. Fibers created with
+        `Fiber.fromArrays()` share their arrays with their copies.
+
+        Parameters
+        ----------
+
+        fibers: list of Fibers
+            The (eager) roots of the fibertrees to copy
+
+        owners: dict, default=None
+            A map from the id of an owning rank of the originals to the
+            rank that will own their copies. The copies of any other
+            owned fibers get a copy of their owner's rank attributes.
+
+        Returns
+        -------
+
+        copies: dict
+            A map from the id of each fiber of the fibertrees to its
+            copy
+
+        """
+        from .array_storage import CoordArray, SharedPayloadArray
+
+        copies = {}
+        parents = []
+        attrs = {}
+
+        level = fibers
+        while level:
+            next_level = []
+
+            for fiber in level:
+                if id(fiber) in copies:
+                    continue
+
+                copied = copy.copy(fiber)
+                copied._clearCoordIndex()
+                copied.__dict__.pop("_packed", None)
+
+                owner = fiber.getOwner()
+                if owner is None:
+                    copied.setRankAttrs(copy.deepcopy(fiber.getRankAttrs()))
+                elif owners is not None and id(owner) in owners:
+                    copied.setOwner(owners[id(owner)])
+                    copied.setRankAttrs(copy.copy(fiber._rank_attrs))
+                else:
+                    if id(owner) not in attrs:
+                        attrs[id(owner)] = copy.deepcopy(owner.getAttrs())
+
+                    copied.setOwner(None)
+                    copied.setRankAttrs(copy.copy(attrs[id(owner)]))
+
+                payloads = fiber.payloads
+                shared = type(payloads) is not list and payloads.shared
+
+                if len(payloads) == 0:
+                    copied.coords = []
+                    copied.payloads = []
+                elif not shared and isinstance(payloads[0], Fiber):
+                    # The payloads are filled in once the children are copied
+                    if type(fiber.coords) is list:
+                        copied.coords = list(fiber.coords)
+
+                    parents.append((fiber, copied))
+                    next_level.extend(payloads)
+                elif type(payloads) is list or shared:
+                    packed = Fiber._packLeaf(fiber)
+
+                    if packed is None:
+                        copied.coords = list(fiber.coords)
+                        copied.payloads = [Fiber._copyLeafPayload(p)
+                                           for p in payloads]
+                    else:
+                        copied.coords = CoordArray(packed[0], fiber._ordered)
+                        copied.payloads = SharedPayloadArray(packed[1])
+
+                copies[id(fiber)] = copied
+
+            level = next_level
+
+        for fiber, copied in parents:
+            copied.payloads = [copies[id(p)] if isinstance(p, Fiber) else copy.deepcopy(p)
+                               for p in fiber.payloads]
+
+        return copies
+
+    @staticmethod
+    def _packLeaf(fiber):
+        """Get arrays of the coordinates and values of a leaf fiber
+
+        The arrays are shared (read-only) by the copies of the fiber.
+        The arrays of a list-based fiber are kept and shared again by
+        its later copies, as long as its coordinates and values are
+        unchanged. A copy with none of its payloads handed out shares
+        its own arrays.
+
+        Parameters
+        ----------
+
+        fiber: Fiber
+            A non-empty leaf fiber
+
+        Returns
+        -------
+
+        packed: tuple of numpy.ndarrays or None
+            The arrays of the coordinates and of the values, or None
+            if the fiber cannot be stored in arrays
+
+        """
+        coords = fiber.coords
+        payloads = fiber.payloads
+
+        if type(payloads) is list:
+            if any(type(p) is not Payload for p in payloads):
+                return None
+
+            values = [p.value for p in payloads]
+            packed = fiber._packed
+        elif payloads.boxes is None:
+            return (coords.array, payloads.array)
+        else:
+            values = payloads.tolist()
+            packed = (coords.array, payloads.array)
+
+        value_type = type(values[0])
+        if value_type not in (int, float, bool) \
+           or any(type(v) is not value_type for v in values):
+            return None
+
+        import numpy as np
+
+        if type(coords) is list:
+            if any(type(c) is not int for c in coords):
+                return None
+
+            coord_array = np.array(coords)
+            if coord_array.dtype.kind != "i":
+                return None
+        else:
+            coord_array = coords.array
+
+        value_array = np.array(values)
+        if value_array.dtype.kind not in "bif":
+            return None
+
+        if packed is not None \
+           and Fiber._isSameArray(packed[0], coord_array) \
+           and Fiber._isSameArray(packed[1], value_array):
+            return packed
+
+        coord_array.flags.writeable = False
+        value_array.flags.writeable = False
+
+        packed = (coord_array, value_array)
+        if type(payloads) is list:
+            fiber._packed = packed
+
+        return packed
+
+    @staticmethod
+    def _isSameArray(a, b):
+        """Return whether two arrays hold exactly the same values"""
+
+        return a.dtype == b.dtype and a.tobytes() == b.tobytes()
+
+    @staticmethod
+    def _copyLeafPayload(payload):
+        """Copy a payload of a leaf fiber
+
+        A payload boxing an immutable value is copied by filling in a
+        new box directly, which avoids the overhead of both the
+        `Payload` constructor and a deep copy. Any other payload is
+        deep copied.
+
+        Parameters
+        ----------
+
+        payload: Payload
+            The payload to copy
+
+        Returns
+        -------
+
+        copied: Payload
+            The copied payload
+
+        """
+        if type(payload) is Payload and type(payload.value) in _IMMUTABLE_VALUES:
+            copied = object.__new__(Payload)
+            copied.__dict__["value"] = payload.value
+            return copied
+
+        return copy.deepcopy(payload)
 
 
     def flattenRanks(self, depth=0, levels=1, style="tuple"):
@@ -4248,8 +5010,8 @@ class Fiber:
                 cur_payloads.append(p._mergeRanksHelper(
                                         levels=levels - 1, style=style, merge_fn=merge_fn))
 
-        coords = []
-        payloads = []
+        flat_coords = []
+        flat_payloads = []
 
         range_start = None
         range_end = None
@@ -4272,19 +5034,13 @@ class Fiber:
 
             low_shape = p1.getShape(all_ranks=False, authoritative=True)
             for c0, p0 in p1:
-                new_coord = self._flattenCoords(c1,
-                                                c0,
-                                                style=style,
-                                                shape=low_shape)
-
-                j = self._coord2pos(new_coord, coords=coords)
-
-                if j < len(coords) and new_coord == coords[j]:
-                    payloads[j].append(p0)
-                else:
-                    coords.insert(j, new_coord)
-                    payloads.insert(j, [p0])
+                flat_coords.append(self._flattenCoords(c1,
+                                                       c0,
+                                                       style=style,
+                                                       shape=low_shape))
+                flat_payloads.append(p0)
 
+        coords, payloads = Fiber._groupByCoord(flat_coords, flat_payloads)
         merged_payloads = [Fiber._mergeToFibertree(ps, merge_fn) for ps in payloads]
 
         # Compute the shape
@@ -4322,6 +5078,70 @@ class Fiber:
 
         return Fiber(coords, merged_payloads, default=default, active_range=active_range, shape=shape)
 
+    @staticmethod
+    def _groupByCoord(coords, payloads):
+        """Sort elements by coordinate and group the payloads of equal
+        coordinates
+
+        The sort is stable, so the payloads of each group are in their
+        original order. Integer coordinates and tuples of integers of a
+        single length are sorted with NumPy, others with `sorted()`.
+
+        Parameters
+        ----------
+
+        coords: list
+            The coordinate of each element
+
+        payloads: list
+            The payload of each element
+
+        Returns
+        -------
+
+        unique_coords: list
+            The sorted unique coordinates
+
+        grouped_payloads: list of lists
+            The payloads of the elements with each coordinate
+
+        """
+        import numpy as np
+
+        if len(coords) == 0:
+            return [], []
+
+        try:
+            keys = np.array(coords)
+        except ValueError:
+            # Tuples of different lengths
+            keys = None
+
+        if keys is not None and keys.dtype.kind in "iu" and keys.ndim <= 2:
+            if keys.ndim == 1:
+                order = np.argsort(keys, kind="stable")
+                keys = keys[order]
+                starts = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+            else:
+                order = np.lexsort(keys.T[::-1])
+                keys = keys[order]
+                starts = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+
+            order = order.tolist()
+            starts = [0] + starts.tolist()
+        else:
+            order = sorted(range(len(coords)), key=coords.__getitem__)
+            starts = [0] + [i for i in range(1, len(order))
+                            if coords[order[i]] != coords[order[i - 1]]]
+
+        ends = starts[1:] + [len(order)]
+
+        unique_coords = [coords[order[start]] for start in starts]
+        grouped_payloads = [[payloads[i] for i in order[start:end]]
+                            for start, end in zip(starts, ends)]
+
+        return unique_coords, grouped_payloads
+
     @staticmethod
     def _mergeToFibertree(to_merge, merge_fn):
         """Merge the given list of payloads into a single payload
@@ -4576,58 +5396,80 @@ class Fiber:
 #
     def copy(self, preserve_owner=True):
         """Deep copying that allows the owner to not be copied"""
-        if not preserve_owner:
-            owners = self._detach_owner()
+        if preserve_owner:
+            return copy.deepcopy(self)
 
-        copied = copy.deepcopy(self)
-
-        if not preserve_owner:
-            self._attach_owner(owners)
-            copied._attach_attrs(owners)
-
-        return copied
+        return Fiber._copyFibers([self])[id(self)]
 
 
     def __deepcopy__(self, memo):
         """__deepcopy__
 
-        Note: to ensure maintainability, we want to automatically copy
-        everything. We use pickling because it is much more performant
-        than the default deepcopy
+        The fibertree is copied with `Fiber._copyFibers()`. The
+        owning ranks are copied without their fibers (with pickling,
+        which is much more performant than the default deepcopy), and
+        then given the copies of their fibers in this fibertree.
 
-        The no_owner parameter means that the owning rank is not copied
+        Note: lazy fibers are pickled
         """
-        return pickle.loads(pickle.dumps(self))
+        if self.isLazy():
+            return pickle.loads(pickle.dumps(self))
 
-    def _detach_owner(self):
-        """Detatch the owner from this fiber and its children"""
-        owners = {}
-        owners[None] = self.getOwner()
-        self.setOwner(None)
+        ranks, copied_ranks = Fiber._copyRanks(self.getOwner())
+        owners = {id(rank): copied for rank, copied in zip(ranks, copied_ranks)}
 
-        for c, p in self.iterOccupancy(tick=False):
-            if isinstance(p, Fiber):
-                owners[c] = p._detach_owner()
+        copies = Fiber._copyFibers([self], owners)
 
-        return owners
+        for rank, copied in zip(ranks, copied_ranks):
+            copied.fibers = [copies[id(fiber)] for fiber in rank.getFibers()
+                             if id(fiber) in copies]
 
-    def _attach_attrs(self, owners):
-        owner = owners[None]
-        if owner is not None:
-            self.setRankAttrs(copy.deepcopy(owner.getAttrs()))
+        return copies[id(self)]
 
-        for c, p in self.iterOccupancy(tick=False):
-            if isinstance(p, Fiber):
-                p._attach_attrs(owners[c])
+    @staticmethod
+    def _copyRanks(rank):
+        """Copy a rank and the ranks below it without their fibers
+
+        Parameters
+        ----------
+
+        rank: Rank or None
+            The highest rank to copy
 
+        Returns
+        -------
 
-    def _attach_owner(self, owners):
-        """Reattach the owners to this fiber"""
-        self.setOwner(owners[None])
+        ranks: list of Ranks
+            The rank and the ranks below it
 
-        for c, p in self.iterOccupancy(tick=False):
-            if isinstance(p, Fiber):
-                p._attach_owner(owners[c])
+        copied_ranks: list of Ranks
+            The copies of `ranks`, with no fibers
+
+        """
+        ranks = []
+        while rank is not None:
+            ranks.append(rank)
+            rank = rank.getNextRank()
+
+        if not ranks:
+            return [], []
+
+        fibers = [rank.fibers for rank in ranks]
+        for rank in ranks:
+            rank.fibers = []
+
+        try:
+            copied = pickle.loads(pickle.dumps(ranks[0]))
+        finally:
+            for rank, rank_fibers in zip(ranks, fibers):
+                rank.fibers = rank_fibers
+
+        copied_ranks = []
+        while copied is not None:
+            copied_ranks.append(copied)
+            copied = copied.getNextRank()
+
+        return ranks, copied_ranks
 
 
 #
@@ -4908,7 +5750,7 @@ class Fiber:
         assert not self.isLazy()
 
         f = {'fiber':
-             {'coords': self.coords,
+             {'coords': list(self.coords),
               'payloads': [Payload.payload2dict(p) for p in self.payloads]}}
 
         return f
@@ -4963,7 +5805,9 @@ class Fiber:
 
         Handles cases where the fiber is "ordered" (using a binary
         search) or "unordered" (using a linear search). Also tries to
-        optimize search by using `start_pos` shortcuts.
+        optimize search by using `start_pos` shortcuts (using a
+        galloping search from `start_pos`) and the coordinate hash
+        index (see `Fiber.setCoordIndex()`).
 
         If the coordinate is not found return the index where it
         should be inserted, taking into account whether the fiber is
@@ -5001,6 +5845,29 @@ class Fiber:
         if coords is None:
             coords = self.coords
 
+            #
+            # Look up the coordinate in the hash index (if it is used)
+            #
+            coord_index = self._getCoordIndex()
+
+            if coord_index is not None:
+                try:
+                    index = coord_index.get(coord)
+                    hashable = True
+                except TypeError:
+                    index = None
+                    hashable = False
+
+                if index is not None \
+                   and (start_pos is None or index >= start_pos):
+                    return index
+
+                if hashable and not self._ordered:
+                    assert start_pos is None, \
+                        "Unordered fibers do not support `start pos`"
+
+                    return len(coords)
+
         if self._ordered:
             #
             # Find coordinate in an ordered fiber
@@ -5009,18 +5876,18 @@ class Fiber:
                 #
                 # Do a bisection search
                 #
-                index = bisect.bisect_left(coords, coord)
+                if type(coords) is list:
+                    index = bisect.bisect_left(coords, coord)
+                else:
+                    index = coords.bisectLeft(coord)
             else:
                 #
-                # Search linearly starting at `start_pos`
-                # Seach ends when the coordinate is found or passed
+                # Do a galloping search starting at `start_pos`
                 #
-                index = len(coords)
-
-                for i in range(start_pos, len(coords)):
-                    if coords[i] >= coord:
-                        index = i
-                        break
+                if type(coords) is list:
+                    index = find_ge(coords, coord, start_pos)
+                else:
+                    index = coords.bisectLeft(coord, start_pos)
         else:
             #
             # Find coordinate in an unordered fiber
@@ -5032,12 +5899,15 @@ class Fiber:
             # Search linearly starting at beginning
             # Seach ends when the coordinate is found
             #
-            index = len(coords)
+            if type(coords) is list:
+                index = find_eq(coords, coord)
+            else:
+                index = len(coords)
 
-            for i in range(len(coords)):
-                if coords[i] == coord:
-                    index = i
-                    break
+                for i in range(len(coords)):
+                    if coords[i] == coord:
+                        index = i
+                        break
 
         return index
 
@@ -7,20 +7,18 @@ A module storing the implementations of all of the iterators of the Fiber class
 """
 
 import bisect
+import heapq
+from itertools import islice
 
 from .any import ANY
 from .coord_payload import CoordPayload
+from .kernels import intersect_positions, union_positions
 from .metrics import Metrics
 from .payload import Payload
 
 def __iter__(self, tick=True, start_pos=None):
     """__iter__"""
-    if self.getOwner() is not None:
-        fmt = self.getOwner().getFormat()
-    elif self.getRankAttrs() is not None:
-        fmt = self.getRankAttrs().getFormat()
-    else:
-        fmt = "C"
+    fmt = _get_format(self)
 
     if fmt == "C":
         return self.iterOccupancy(tick, start_pos=start_pos)
@@ -119,7 +117,7 @@ def iterActiveShapeRef(self, tick=True):
     """
     return self.iterRangeShapeRef(*self.getActive(), tick=tick)
 
-def iterRange(self, start, end, tick=True, start_pos=None):
+def iterRange(self, start, end, tick=True, start_pos=None, style="coord_payload"):
     """
     Iterate over the non-default elements within the given range
 
@@ -137,55 +135,247 @@ def iterRange(self, start, end, tick=True, start_pos=None):
     start_pos: Optional[int]
         Saved position to start iteration
 
+    style: str, default="coord_payload"
+        The kind of element yielded: "coord_payload" for a new
+        `CoordPayload` per element, "tuple" for a `(coord, payload)`
+        tuple, or "reuse" for a single `CoordPayload` that is updated
+        in place for every element (so it must not be held on to
+        across iterations)
+
+    Notes
+    -----
+
+    For eager, ordered fibers the positions of `start` and `end` are
+    found with a binary search, so only the elements in the range are
+    visited. Otherwise the elements are scanned from the beginning
+    (or `start_pos`) until `end` is reached.
+
+    Whether metrics are collected is checked when the iteration
+    starts, not when the iterator is created.
+
     """
+    yield from _range_iter(self, start, end, tick, start_pos, style)
+
+def _range_iter(fiber, start, end, tick, start_pos, style):
+    """Create the iterator for `iterRange()`
+
+    Picks the (instrumented or uninstrumented) loop for iterating over
+    the elements of the fiber within the given range.
+
+    """
+    assert style in ("coord_payload", "tuple", "reuse"), \
+        f"Unknown iterRange style: {style}"
+
     # Cannot save a position of a lazy fiber
-    assert not self.isLazy() or start_pos is None
+    assert not fiber.isLazy() or start_pos is None
+
+    metrics = tick and Metrics.isCollecting()
 
-    # Get the iterator
-    if self.isLazy():
-        iter_ = self.iter()
+    # Get the iterator over the (position, coordinate, payload) triples
+    if fiber.isLazy():
         i = 0
+        iter_ = _scan_range(fiber.iter(), start, end)
+        box = Payload.maybe_box
     else:
         # Set i: the starting position
         start_pos = Payload.get(start_pos)
         if start_pos is not None:
-            assert start_pos < len(self.coords)
+            assert start_pos < len(fiber.coords)
             i = start_pos
         else:
             i = 0
 
-        iter_ = ((self.coords[j], self.payloads[j])
-                  for j in range(i, len(self.coords)))
+        if fiber._ordered:
+            lo, hi = _range_bounds(fiber.coords, start, end, i)
 
-    is_collecting, rank = _prep_metrics_inc(self)
+            # Plain iteration over the elements in the range
+            if not metrics and start_pos is None and style == "coord_payload":
+                return _iter_elements(fiber, _range_pairs(fiber.coords,
+                                                          fiber.payloads,
+                                                          lo, hi))
 
-    if is_collecting and tick:
-        Metrics.registerRank(rank)
+            iter_ = _bisect_range(fiber.coords, fiber.payloads, lo, hi)
+        elif type(fiber.coords) is list:
+            iter_ = _scan_range(zip(fiber.coords[i:], fiber.payloads[i:]),
+                                start, end, i)
+        else:
+            iter_ = _scan_range(zip(fiber.coords.iterFrom(i),
+                                    fiber.payloads.iterFrom(i)),
+                                start, end, i)
 
-    for j, (coord, payload) in enumerate(iter_):
-        # If we are outside the range, stop
-        if end is not None and coord >= end:
-            break
+        # The payloads of an eager fiber are already boxed
+        box = None
 
-        # If we are within the range, emit the non-default elements
-        elif start is None or coord >= start:
-            if not Payload.isEmpty(payload, default=self.getDefault()):
-                if start_pos is not None:
-                    self.setSavedPos(i + j, distance=j)
+    if metrics:
+        return _iter_range_metrics(fiber, iter_, i, start_pos, box, style)
 
-                if is_collecting and tick:
-                    Metrics.addUse(rank, coord, i + j)
+    return _iter_range(fiber, iter_, i, start_pos, box, style)
 
-                yield CoordPayload(coord, payload)
+def _iter_elements(fiber, pairs):
+    """Yield a `CoordPayload` for each (coordinate, payload) pair from
+    `pairs` with a non-empty payload
 
-                if is_collecting and tick:
-                    Metrics.incIter(rank)
+    This is the (uninstrumented) loop used by `iterRange()` for the
+    common case of iterating over an eager, ordered fiber. The (usual)
+    case of a boxed payload is checked for being empty by comparing
+    its value with the default directly.
 
-        # Otherwise continue iterating untile we find the beginning of the
-        # range
+    """
+    default = fiber.getDefault()
+    default_value = Payload.get(default)
+    is_empty = Payload.isEmpty
 
-    if is_collecting and tick:
-        Metrics.endIter(rank)
+    for coord, payload in pairs:
+        if type(payload) is Payload:
+            if payload.value == default_value:
+                continue
+        elif is_empty(payload, default=default):
+            continue
+
+        yield CoordPayload(coord, payload)
+
+def _iter_range(fiber, iter_, i, start_pos, box, style):
+    """The body of `iterRange()` when metrics are not being collected
+
+    Iterates over the (position, coordinate, payload) triples from
+    `iter_` and yields the elements with a non-empty payload in the
+    given `style`.
+
+    """
+    default = fiber.getDefault()
+    default_value = Payload.get(default)
+    is_empty = Payload.isEmpty
+    element = None
+
+    for pos, coord, payload in iter_:
+        if type(payload) is Payload:
+            if payload.value == default_value:
+                continue
+        elif is_empty(payload, default=default):
+            continue
+
+        if start_pos is not None:
+            fiber.setSavedPos(pos, distance=pos - i)
+
+        if box is not None:
+            payload = box(payload)
+
+        if style == "coord_payload":
+            yield CoordPayload(coord, payload)
+        elif style == "tuple":
+            yield (coord, payload)
+        else:
+            if element is None:
+                element = CoordPayload(coord, payload)
+            else:
+                element.coord = coord
+                element.payload = payload
+
+            yield element
+
+def _iter_range_metrics(fiber, iter_, i, start_pos, box, style):
+    """The body of `iterRange()` when metrics are being collected
+
+    Same as `_iter_range()` but also records the iteration over the
+    rank and a use of each element yielded.
+
+    """
+    rank = str(fiber.getRankAttrs().getId())
+
+    Metrics.registerRank(rank)
+
+    default = fiber.getDefault()
+    is_empty = Payload.isEmpty
+    element = None
+
+    for pos, coord, payload in iter_:
+        if is_empty(payload, default=default):
+            continue
+
+        if start_pos is not None:
+            fiber.setSavedPos(pos, distance=pos - i)
+
+        Metrics.addUse(rank, coord, pos)
+
+        if box is not None:
+            payload = box(payload)
+
+        if style == "coord_payload":
+            yield CoordPayload(coord, payload)
+        elif style == "tuple":
+            yield (coord, payload)
+        else:
+            if element is None:
+                element = CoordPayload(coord, payload)
+            else:
+                element.coord = coord
+                element.payload = payload
+
+            yield element
+
+        Metrics.incIter(rank)
+
+    Metrics.endIter(rank)
+
+def _range_bounds(coords, start, end, pos):
+    """Find the positions of a range in an ordered fiber
+
+    Returns the first and last (exclusive) positions at or after
+    position `pos` of the elements of an eager, ordered fiber with a
+    coordinate in [`start`, `end`), using binary searches.
+
+    """
+
+    if type(coords) is list:
+        lo = pos if start is None else bisect.bisect_left(coords, start, pos)
+        hi = len(coords) if end is None else bisect.bisect_left(coords, end, lo)
+    else:
+        lo = pos if start is None else coords.bisectLeft(start, pos)
+        hi = len(coords) if end is None else coords.bisectLeft(end, lo)
+
+    return lo, hi
+
+def _range_pairs(coords, payloads, lo, hi):
+    """Iterate over the (coordinate, payload) pairs at positions [`lo`,
+    `hi`) of an eager fiber"""
+
+    if type(coords) is list:
+        return zip(coords[lo:hi], payloads[lo:hi])
+
+    return islice(zip(coords.iterFrom(lo), payloads.iterFrom(lo)), hi - lo)
+
+def _bisect_range(coords, payloads, lo, hi):
+    """Iterate over the elements of an ordered fiber in a range
+
+    Yields the (position, coordinate, payload) of each element of an
+    eager fiber at positions [`lo`, `hi`) (see `_range_bounds()`).
+
+    """
+
+    if type(coords) is list:
+        for pos in range(lo, hi):
+            yield pos, coords[pos], payloads[pos]
+    else:
+        yield from zip(range(lo, hi), coords.iterFrom(lo), payloads.iterFrom(lo))
+
+def _scan_range(iter_, start, end, pos=0):
+    """Iterate over the elements in a range by scanning
+
+    Yields the (position, coordinate, payload) of each element from
+    the (coordinate, payload) iterator `iter_` with a coordinate that
+    is at least `start`, stopping at the first coordinate that is not
+    less than `end`.
+
+    """
+
+    for pos, (coord, payload) in enumerate(iter_, pos):
+        # If we are outside the range, stop
+        if end is not None and coord >= end:
+            break
+
+        # If we are within the range, emit the element
+        if start is None or coord >= start:
+            yield pos, coord, payload
 
 def iterRangeShape(self, start, end, step=1, tick=True):
     """Iterate over the given range, including default elements
@@ -206,20 +396,12 @@ def iterRangeShape(self, start, end, step=1, tick=True):
     """
     assert not self.isLazy()
 
-    is_collecting, rank = _prep_metrics_inc(self)
-
-    if is_collecting and tick:
-        Metrics.registerRank(rank)
+    if tick and Metrics.isCollecting():
+        yield from _iter_shape_metrics(self, self.getPayload, start, end, step)
+        return
 
     for c in range(start, end, step):
-        p = self.getPayload(c)
-        yield CoordPayload(c, p)
-
-        if is_collecting and tick:
-            Metrics.incIter(rank)
-
-    if is_collecting and tick:
-        Metrics.endIter(rank)
+        yield CoordPayload(c, self.getPayload(c))
 
 def iterRangeShapeRef(self, start, end, step=1, tick=True):
     """Iterate over the given range, including default elements
@@ -240,38 +422,40 @@ def iterRangeShapeRef(self, start, end, step=1, tick=True):
     """
     assert not self.isLazy()
 
-    is_collecting, rank = _prep_metrics_inc(self)
+    if tick and Metrics.isCollecting():
+        yield from _iter_shape_metrics(self, self.getPayloadRef, start, end, step)
+        return
 
-    if is_collecting and tick:
-        Metrics.registerRank(rank)
+    for c in range(start, end, step):
+        yield CoordPayload(c, self.getPayloadRef(c))
+
+def _iter_shape_metrics(fiber, get_payload, start, end, step):
+    """The body of `iterRangeShape()` and `iterRangeShapeRef()` when
+    metrics are being collected"""
+
+    rank = str(fiber.getRankAttrs().getId())
+
+    Metrics.registerRank(rank)
 
     for c in range(start, end, step):
-        p = self.getPayloadRef(c)
+        p = get_payload(c)
         yield CoordPayload(c, p)
 
-        if is_collecting and tick:
-            Metrics.incIter(rank)
+        Metrics.incIter(rank)
 
-    if is_collecting and tick:
-        Metrics.endIter(rank)
+    Metrics.endIter(rank)
 
 
-def _prep_metrics_inc(fiber):
-    """Prepare to do a metrics increment
+def _get_format(fiber):
+    """Get the format ("C" or "U") used to iterate over a fiber"""
 
-    Returns
-    -------
+    if fiber.getOwner() is not None:
+        return fiber.getOwner().getFormat()
 
-    is_collecting: bool
-        True if Metrics collection is on
+    if fiber.getRankAttrs() is not None:
+        return fiber.getRankAttrs().getFormat()
 
-    rank: str
-        The name of the rank number to increment over
-    """
-    is_collecting = Metrics.isCollecting()
-    rank = str(fiber.getRankAttrs().getId())
-
-    return is_collecting, rank
+    return "C"
 
 #
 # Dense coiterators
@@ -520,7 +704,7 @@ def intersection(*args, **kwargs):
 
                 is_collecting = Metrics.isCollecting()
                 leader_traced = False
-                traces = [""] * len(self.fibers)
+                traces = [None] * len(self.fibers)
                 if is_collecting:
                     rank = self.fibers[0].getRankAttrs().getId()
                     traces = ["intersect_" + str(Metrics.getLabel(rank)) \
@@ -578,25 +762,95 @@ def union(*args):
 
     Currently only supported for "ordered", "unique" fibers.
 
-    """
+    The fibers are merged in a single pass with a heap holding the
+    next element of each fiber. When metrics are being collected the
+    union is instead computed as a sequence of two-operand unions so
+    that the "union_*" traces match those of `Fiber.__or__()`.
 
-    nested_result = args[0] | args[1]
+    """
 
-    for arg in args[2:]:
-        nested_result = nested_result | arg
+    for arg in args:
+        assert arg._ordered and arg._unique
 
     # Lazy implementation
     class union_iterator:
-        nested = nested_result
-        num_args = len(args)
+        fibers = args
 
         def __iter__(self):
-            for c, np in self.nested:
-                p = [None] * (self.num_args + 1)
+            if Metrics.isCollecting():
+                return self._iter_nested()
+
+            return self._iter_merge()
+
+        def _iter_merge(self):
+            """
+            Iterator implementing a k-way merge of the fibers
+            """
+            fibers = self.fibers
+            num_args = len(fibers)
+
+            iters = [fiber.__iter__(tick=False) for fiber in fibers]
+
+            heap = []
+            for i, iter_ in enumerate(iters):
+                c, p = _get_next(iter_)
+                if c is not None:
+                    heap.append((c, i, p))
+
+            heapq.heapify(heap)
+
+            while heap:
+                c = heap[0][0]
+                payloads = [None] * num_args
+
+                while heap and heap[0][0] == c:
+                    _, i, payloads[i] = heapq.heappop(heap)
+
+                    next_c, next_p = _get_next(iters[i])
+                    if next_c is not None:
+                        heapq.heappush(heap, (next_c, i, next_p))
+
+                mask = ""
+                first = None
+                for i, p in enumerate(payloads):
+                    if p is not None:
+                        mask += chr(ord("A") + i)
+                        if first is None:
+                            first = i
+
+                #
+                # Fill in the defaults for the missing payloads the
+                # same way the equivalent sequence of two-operand
+                # unions ((A | B) | C) | ... would
+                #
+                for i, p in enumerate(payloads):
+                    if p is not None:
+                        continue
+
+                    if i > first or first == 1:
+                        payloads[i] = fibers[i]._createDefault()
+                    else:
+                        payloads[i] = fibers[i]._instantiateDefault(None, fibers[i].getDefault())
+
+                yield CoordPayload(c, (mask, *payloads))
+
+        def _iter_nested(self):
+            """
+            Iterator over a sequence of two-operand unions
+            """
+            nested = self.fibers[0] | self.fibers[1]
+
+            for arg in self.fibers[2:]:
+                nested = nested | arg
+
+            num_args = len(self.fibers)
+
+            for c, np in nested:
+                p = [None] * (num_args + 1)
 
                 # This is the mask
                 p[0] = ""
-                for i in range(self.num_args - 1, 0, -1):
+                for i in range(num_args - 1, 0, -1):
                     if isinstance(np, Payload):
                         np = np.v()
 
@@ -630,6 +884,122 @@ def _get_next(iter_):
 
     return CoordPayload(coord, payload)
 
+#
+# Minimum combined occupancy of two fibers for which the vectorized
+# intersection is used (below it the NumPy overheads dominate)
+#
+_VECTOR_AND_MIN_OCCUPANCY = 64
+
+def _coord_array(fiber):
+    """Get the coordinates of a fiber as an integer NumPy array (or None)"""
+
+    import numpy as np
+
+    coords = fiber.coords
+
+    if type(coords) is list:
+        if type(coords[0]) is not int:
+            return None
+
+        coords = np.array(coords)
+    else:
+        coords = coords.array
+
+    if coords.dtype.kind not in "iu":
+        return None
+
+    return coords
+
+def _is_positional(fiber):
+    """Check if a fiber's elements can be merged by position
+
+    True if the fiber is eager, ordered, unique and iterated over in
+    compressed format, so merging its coordinates directly is
+    equivalent to merging its iterator (after skipping the elements
+    with empty payloads).
+
+    """
+
+    return not fiber.isLazy() \
+        and fiber.isOrdered() and fiber.isUnique() \
+        and _get_format(fiber) == "C"
+
+def _same_kind_lists(a_coords, b_coords):
+    """Check if two non-empty coordinate lists can be merged directly
+
+    Both must be lists of the same kind of coordinate (i.e., scalars or
+    tuples of the same length), otherwise the merge methods project
+    one of the fibers (see `__and__()`).
+
+    """
+
+    if type(a_coords) is not list or type(b_coords) is not list:
+        return False
+
+    return _coord_len(a_coords[0]) == _coord_len(b_coords[0])
+
+def _coord_len(coord):
+    """Get the number of ranks of a coordinate"""
+
+    return len(coord) if isinstance(coord, tuple) else 1
+
+def _intersect_positions(a_fiber, b_fiber):
+    """Find the positions of the common coordinates of two fibers
+
+    Search for the coordinates common to two eager, ordered, unique
+    fibers that are iterated over in compressed format. For fibers
+    with (scalar) integer coordinates and enough elements, the shorter
+    fiber's coordinates are looked up in the longer one's with a
+    single batched binary search. Otherwise the coordinate lists are
+    merged with `kernels.intersect_positions()`.
+
+    Returns
+    -------
+
+    positions: tuple of lists or None
+        The positions in `a_fiber` and `b_fiber` of the common
+        coordinates, or None if the fibers are not suitable
+
+    """
+
+    if not (_is_positional(a_fiber) and _is_positional(b_fiber)):
+        return None
+
+    if len(a_fiber.coords) == 0 or len(b_fiber.coords) == 0:
+        return ([], [])
+
+    if len(a_fiber.coords) + len(b_fiber.coords) >= _VECTOR_AND_MIN_OCCUPANCY:
+        a_coords = _coord_array(a_fiber)
+        b_coords = _coord_array(b_fiber)
+
+        if a_coords is not None and b_coords is not None:
+            return _search_positions(a_coords, b_coords)
+
+    if not _same_kind_lists(a_fiber.coords, b_fiber.coords):
+        return None
+
+    return intersect_positions(a_fiber.coords, b_fiber.coords)
+
+def _search_positions(a_coords, b_coords):
+    """Find the positions of the common values of two sorted arrays"""
+
+    import numpy as np
+
+    swap = len(a_coords) > len(b_coords)
+    if swap:
+        a_coords, b_coords = b_coords, a_coords
+
+    b_pos = np.searchsorted(b_coords, a_coords)
+    found = b_coords[np.minimum(b_pos, len(b_coords) - 1)] == a_coords
+
+    a_pos = np.flatnonzero(found).tolist()
+    b_pos = b_pos[found].tolist()
+
+    if swap:
+        return (b_pos, a_pos)
+
+    return (a_pos, b_pos)
+
 #
 # Merge methods
 #
@@ -676,6 +1046,10 @@ def __and__(self, other):
 
     Currently only supported for "ordered", "unique" fibers.
 
+    When metrics are not being collected and both fibers are eager,
+    the matching positions are found directly from the coordinate
+    lists (see `_intersect_positions()`).
+
     """
 
     assert self._ordered and self._unique
@@ -689,6 +1063,14 @@ def __and__(self, other):
             Iterator simulating the intersection operator
             """
             is_collecting = Metrics.isCollecting()
+
+            if not is_collecting:
+                positions = _intersect_positions(self.a_fiber, self.b_fiber)
+
+                if positions is not None:
+                    yield from self._iter_positions(*positions)
+                    return
+
             a_traced = False
             b_traced = False
             if is_collecting:
@@ -808,6 +1190,28 @@ def __and__(self, other):
 
             return
 
+        def _iter_positions(self, a_positions, b_positions):
+            """
+            Yield the non-empty elements at the given matching positions
+            """
+            a_coords = self.a_fiber.coords
+            a_payloads = self.a_fiber.payloads
+            a_default = self.a_fiber.getDefault()
+
+            b_payloads = self.b_fiber.payloads
+            b_default = self.b_fiber.getDefault()
+
+            for a_pos, b_pos in zip(a_positions, b_positions):
+                a_payload = a_payloads[a_pos]
+                if Payload.isEmpty(a_payload, default=a_default):
+                    continue
+
+                b_payload = b_payloads[b_pos]
+                if Payload.isEmpty(b_payload, default=b_default):
+                    continue
+
+                yield a_coords[a_pos], (a_payload, b_payload)
+
     fiber = self.fromIterator(and_iterator, active_range=self.getActive())
     fiber.getRankAttrs().setId(self.getRankAttrs().getId())
     return fiber
@@ -855,6 +1259,10 @@ def __or__(self, other):
 
     Currently only supported for "ordered", "unique" fibers.
 
+    When metrics are not being collected and both fibers are eager,
+    the coordinate lists are merged directly (see
+    `kernels.union_positions()`).
+
     """
 
 
@@ -866,6 +1274,17 @@ def __or__(self, other):
 
         def __iter__(self):
             is_collecting = Metrics.isCollecting()
+
+            if not is_collecting \
+               and _is_positional(self.a_fiber) \
+               and _is_positional(self.b_fiber) \
+               and (len(self.a_fiber.coords) == 0
+                    or len(self.b_fiber.coords) == 0
+                    or _same_kind_lists(self.a_fiber.coords,
+                                        self.b_fiber.coords)):
+                yield from self._iter_merge()
+                return
+
             a_traced = False
             b_traced = False
             if is_collecting:
@@ -942,6 +1361,53 @@ def __or__(self, other):
                     yield b_coord, ("B", a_default, b_payload)
                     b_coord, b_payload = _get_next(b)
 
+        def _iter_merge(self):
+            """
+            Merge the coordinate lists, treating empty payloads as missing
+            """
+            a_coords = self.a_fiber.coords
+            a_payloads = self.a_fiber.payloads
+            a_default = self.a_fiber.getDefault()
+
+            b_coords = self.b_fiber.coords
+            b_payloads = self.b_fiber.payloads
+            b_default = self.b_fiber.getDefault()
+
+            if type(a_coords) is not list:
+                a_coords = a_coords.tolist()
+
+            if type(b_coords) is not list:
+                b_coords = b_coords.tolist()
+
+            coords, a_positions, b_positions = union_positions(a_coords, b_coords)
+
+            for coord, a_pos, b_pos in zip(coords, a_positions, b_positions):
+                a_payload = None
+                if a_pos >= 0:
+                    a_payload = a_payloads[a_pos]
+                    if Payload.isEmpty(a_payload, default=a_default):
+                        a_payload = None
+
+                b_payload = None
+                if b_pos >= 0:
+                    b_payload = b_payloads[b_pos]
+                    if Payload.isEmpty(b_payload, default=b_default):
+                        b_payload = None
+
+                if a_payload is None:
+                    if b_payload is None:
+                        continue
+
+                    a_payload = self.a_fiber._createDefault()
+                    yield coord, ("B", a_payload, b_payload)
+
+                elif b_payload is None:
+                    b_payload = self.b_fiber._createDefault()
+                    yield coord, ("A", a_payload, b_payload)
+
+                else:
+                    yield coord, ("AB", a_payload, b_payload)
+
     result = self.fromIterator(or_iterator, active_range=self.getActive())
     result._setDefault(("", self.getDefault(), other.getDefault()))
     result.getRankAttrs().setId(self.getRankAttrs().getId())
@@ -1090,6 +1556,9 @@ def __lshift__(self, other, start_pos=None):
     """
     assert not self.isLazy()
 
+    # The target's payloads are updated in place
+    self._unpackArrays()
+
     self.setActive(other.getActive())
 
     class lshift_iterator:
@@ -1209,9 +1678,7 @@ def __lshift__(self, other, start_pos=None):
                         (not isinstance(a_payload, type(self.a_fiber)) and \
                         a_payload == self.a_fiber.getDefault()):
                     # Clear the fiber
-                    index = bisect.bisect_left(self.a_fiber.coords, b_coord)
-                    del self.a_fiber.coords[index]
-                    del self.a_fiber.payloads[index]
+                    self.a_fiber._deletePayload(b_coord)
 
                     # Remove the payload from its owning rank (if relevant)
                     if self.a_fiber.getOwner() is not None and \
@@ -0,0 +1,258 @@
+#cython: language_level=3
+#cython: wraparound=False
+"""Kernels
+
+A module holding the inner loops of the hot paths of the `Fiber`
+class (coordinate search and the two-operand merges) written in
+Cython's "pure Python" mode.
+
+When the package is installed with Cython available (see `setup.py`),
+this module is compiled into an extension module with typed loop
+indices. Otherwise the identical Python source is simply imported
+(with a stand-in for the `cython` module if Cython is not installed
+at all), so callers never need to check which version is in use. The
+`COMPILED` flag records which one was loaded.
+
+All the functions operate on plain Python lists of coordinates and
+only compare the coordinates with `==` and `<`, so they work for any
+coordinate type (e.g., integers or tuples).
+
+"""
+
+from bisect import bisect_left
+
+try:
+    import cython
+
+    #
+    # True if this module was loaded from the compiled extension
+    #
+    COMPILED = cython.compiled
+except ImportError:
+    #
+    # Without Cython, provide the (no-op) parts of its "pure Python"
+    # mode used below
+    #
+    class cython:
+        """Stand-in for the `cython` module"""
+
+        compiled = False
+        Py_ssize_t = int
+
+        @staticmethod
+        def locals(**types):
+            """Ignore the declared types of the local variables"""
+            return lambda func: func
+
+    COMPILED = False
+
+
+@cython.locals(start=cython.Py_ssize_t,
+               lo=cython.Py_ssize_t,
+               hi=cython.Py_ssize_t,
+               step=cython.Py_ssize_t,
+               n=cython.Py_ssize_t)
+def find_ge(coords: list, coord, start=0):
+    """Find the first position at or after `start` whose coordinate is
+    greater than or equal to `coord` in an ordered list of coordinates
+
+    A galloping search is used, i.e., positions `start`, `start+1`,
+    `start+3`, `start+7`, ... are probed until a coordinate greater
+    than or equal to `coord` is found and then the last interval is
+    bisected. So the cost is logarithmic in the distance from `start`
+    to the position found rather than linear.
+
+    Parameters
+    ----------
+
+    coords: list
+        The (ordered) coordinates to search
+
+    coord: coordinate
+        The coordinate to search for
+
+    start: integer, default=0
+        The position to start the search at
+
+    Returns
+    -------
+
+    pos: integer
+        The position found, or `len(coords)` if there is none
+
+    """
+
+    n = len(coords)
+
+    lo = start
+    hi = start
+    step = 1
+
+    while hi < n and coords[hi] < coord:
+        lo = hi + 1
+        hi += step
+        step *= 2
+
+    if hi > n:
+        hi = n
+
+    if lo > hi:
+        lo = hi
+
+    return bisect_left(coords, coord, lo, hi)
+
+
+@cython.locals(i=cython.Py_ssize_t,
+               n=cython.Py_ssize_t)
+def find_eq(coords: list, coord):
+    """Find the first position of `coord` in an unordered list of
+    coordinates
+
+    Parameters
+    ----------
+
+    coords: list
+        The coordinates to search
+
+    coord: coordinate
+        The coordinate to search for
+
+    Returns
+    -------
+
+    pos: integer
+        The position found, or `len(coords)` if there is none
+
+    """
+
+    n = len(coords)
+
+    for i in range(n):
+        if coords[i] == coord:
+            return i
+
+    return n
+
+
+@cython.locals(i=cython.Py_ssize_t,
+               j=cython.Py_ssize_t,
+               a_len=cython.Py_ssize_t,
+               b_len=cython.Py_ssize_t)
+def intersect_positions(a_coords: list, b_coords: list):
+    """Find the positions of the coordinates common to two ordered,
+    unique lists of coordinates with a two-finger merge
+
+    Parameters
+    ----------
+
+    a_coords: list
+        The first list of coordinates
+
+    b_coords: list
+        The second list of coordinates
+
+    Returns
+    -------
+
+    positions: tuple of lists
+        The positions in `a_coords` and `b_coords` of the common
+        coordinates
+
+    """
+
+    a_pos = []
+    b_pos = []
+
+    a_len = len(a_coords)
+    b_len = len(b_coords)
+
+    i = 0
+    j = 0
+
+    while i < a_len and j < b_len:
+        a_coord = a_coords[i]
+        b_coord = b_coords[j]
+
+        if a_coord == b_coord:
+            a_pos.append(i)
+            b_pos.append(j)
+            i += 1
+            j += 1
+        elif a_coord < b_coord:
+            i += 1
+        else:
+            j += 1
+
+    return (a_pos, b_pos)
+
+
+@cython.locals(i=cython.Py_ssize_t,
+               j=cython.Py_ssize_t,
+               a_len=cython.Py_ssize_t,
+               b_len=cython.Py_ssize_t)
+def union_positions(a_coords: list, b_coords: list):
+    """Merge two ordered, unique lists of coordinates
+
+    Parameters
+    ----------
+
+    a_coords: list
+        The first list of coordinates
+
+    b_coords: list
+        The second list of coordinates
+
+    Returns
+    -------
+
+    merged: tuple of lists
+        The merged coordinates and, for each of them, the position of
+        the coordinate in `a_coords` and `b_coords` (or -1 if it is
+        not present in that list)
+
+    """
+
+    coords = []
+    a_pos = []
+    b_pos = []
+
+    a_len = len(a_coords)
+    b_len = len(b_coords)
+
+    i = 0
+    j = 0
+
+    while i < a_len and j < b_len:
+        a_coord = a_coords[i]
+        b_coord = b_coords[j]
+
+        if a_coord == b_coord:
+            coords.append(a_coord)
+            a_pos.append(i)
+            b_pos.append(j)
+            i += 1
+            j += 1
+        elif a_coord < b_coord:
+            coords.append(a_coord)
+            a_pos.append(i)
+            b_pos.append(-1)
+            i += 1
+        else:
+            coords.append(b_coord)
+            a_pos.append(-1)
+            b_pos.append(j)
+            j += 1
+
+    while i < a_len:
+        coords.append(a_coords[i])
+        a_pos.append(i)
+        b_pos.append(-1)
+        i += 1
+
+    while j < b_len:
+        coords.append(b_coords[j])
+        a_pos.append(-1)
+        b_pos.append(j)
+        j += 1
+
+    return (coords, a_pos, b_pos)
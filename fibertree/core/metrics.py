@@ -1,19 +1,46 @@
 #cython: language_level=3
 # cython: profile=True
+"""Metrics
+
+A module holding the classes used to collect metrics (e.g., counts of
+operations and traces of uses) from the execution of an HiFiber
+kernel.
+
+The state of a collection is held in a `MetricsSession`. The
+`Metrics` class is a facade whose (class-level) attributes and methods
+are those of the **current** session, i.e., the session activated by
+the innermost enclosing `with MetricsSession() ...` block in the
+current thread (or asyncio task), or the default session if there is
+none. So the code of the fibertree (e.g., `fibertree.core.iterators`
+and `Payload`) just calls `Metrics.<method>()`, while each of several
+concurrent simulations (e.g., in a thread pool) can collect into a
+session of its own:
+
+    with MetricsSession() as session:
+        Metrics.beginCollect("tmp/variant1")
+        ...
+        Metrics.endCollect()
+
+"""
+
+from contextvars import ContextVar
 from functools import reduce
 
-class Metrics:
-    """A globally available class for tracking metrics.
+from .trace_sink import CsvTraceSink, NpyTraceSink, TraceSink
 
-    The Metrics class provides an interface for collecting metrics from the
-    execution of an HiFiber kernel. All methods are class-level so that the metrics
-    can be updated and read from anywhere.
+
+class MetricsSession:
+    """A session of metrics collection.
+
+    A MetricsSession holds the state of the metrics collected from the
+    execution of an HiFiber kernel. It is normally accessed through
+    the `Metrics` facade, which forwards to the current session.
 
     Attributes
     ----------
 
-    The Metrics class has a set of attributes that can be set and accessed.
-    These include:
+    A MetricsSession has a set of attributes that can be set and
+    accessed. These include:
 
     - A **collecting** boolean, which specifies whether or not data collection
       is in progress.
@@ -23,36 +50,51 @@ class Metrics:
 
 
     Constructor
-    ----------
+    -----------
 
-    There is no reason to ever create an instance of the Metrics class
+    Create an (inactive) session. The session is made the current
+    session by using it as a context manager.
 
     """
-    # Create a class instance variable for the metrics collection
-    all_rank_matches = {}
-    collecting = False
-    fiber_label = {}
-    iteration = None
-    line_order = None
-    loop_order = None
-    metrics = None
-    num_cached_uses = 1000
-    point = None
-    prefix = None
-    rank_matches = {}
-    rank_flatten = {}
-
-    # Dict[rank, Dict[type, Tuple[Optional[file_trace], Optional[mem_trace], is_started]]]
-    # file_trace: trace written to a file
-    # mem_trace: trace saved in memory
-    # is_started: the header has been added to the trace
-    traces = {}
 
-    def __init__(self):
-        raise NotImplementedError
+    trace_sinks = {"csv": CsvTraceSink, "npy": NpyTraceSink}
 
-    @classmethod
-    def addUse(cls, rank, coord, pos, type_="iter", iteration_num=None):
+    def __init__(self):
+        # Create an instance variable for the metrics collection
+        self.all_rank_matches = {}
+        self.collecting = False
+        self.fiber_label = {}
+        self.iteration = None
+        self.line_order = None
+        self.loop_order = None
+        self.metrics = None
+        self.num_cached_uses = 1000
+        self.point = None
+        self.prefix = None
+        self.rank_matches = {}
+        self.rank_flatten = {}
+        self.trace_sink = CsvTraceSink
+
+        # Dict[rank, Dict[type, Tuple[Optional[file_trace], Optional[mem_trace], is_started]]]
+        # file_trace: trace written to a file (a TraceSink)
+        # mem_trace: trace saved in memory
+        # is_started: the header has been added to the trace
+        self.traces = {}
+
+        self._tokens = []
+
+    def __enter__(self):
+        """Make this session the current session"""
+
+        self._tokens.append(_current_session.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Restore the previously current session"""
+
+        _current_session.reset(self._tokens.pop())
+
+    def addUse(self, rank, coord, pos, type_="iter", iteration_num=None):
         """Add a use of all tensors at the given rank and coord
 
         Parameters
@@ -77,49 +119,43 @@ class Metrics:
         None
 
         """
-        assert cls.collecting
-        assert rank in cls.line_order or rank in cls.rank_matches
+        assert self.collecting
+        assert rank in self.line_order or rank in self.rank_matches
 
         if isinstance(coord, tuple):
-            coord = cls.rank_flatten[rank](coord)
+            coord = self.rank_flatten[rank](coord)
 
         # Update the point
-        if rank in cls.line_order:
-            i = cls.line_order[rank]
-            cls.point[i] = coord
+        if rank in self.line_order:
+            i = self.line_order[rank]
+            self.point[i] = coord
 
         # Otherwise, set i based on the rank this rank matches
         else:
-            i = cls.line_order[cls.rank_matches[rank]]
+            i = self.line_order[self.rank_matches[rank]]
 
         # Make sure we are tracking this rank and type_
-        if rank not in cls.traces.keys():
+        if rank not in self.traces.keys():
             return
 
-        if type_ not in cls.traces[rank].keys():
+        if type_ not in self.traces[rank].keys():
             return
 
         if iteration_num is None:
-            iteration_num = cls.iteration
+            iteration_num = self.iteration
 
         iteration = iteration_num[:(i + 1)]
 
-        point = cls.point[:i] + [coord]
+        point = self.point[:i] + [coord]
 
         data = iteration + point + [pos]
-        file_trace, mem_trace, _ = cls.traces[rank][type_]
+        file_trace, mem_trace, _ = self.traces[rank][type_]
         if file_trace is not None:
             file_trace.append(data)
         if mem_trace is not None:
             mem_trace.append(data)
 
-        # If we are at the limit of the number of cached uses, write the data
-        # to disk
-        if file_trace is not None and len(file_trace) == cls.num_cached_uses:
-            cls._writeTrace(rank, type_)
-
-    @classmethod
-    def associateShape(cls, rank, shape):
+    def associateShape(self, rank, shape):
         """Associate the given rank with the given shape
 
         Used to flatten tuple coordinates into integer coordinates to keep
@@ -131,10 +167,9 @@ class Metrics:
                 final += coord * reduce(lambda x, y: x * y, shape[i + 1:], 1)
             return final
 
-        cls.rank_flatten[rank] = flatten
+        self.rank_flatten[rank] = flatten
 
-    @classmethod
-    def beginCollect(cls, prefix=None):
+    def beginCollect(self, prefix=None):
         """Begin metrics collection
 
         Start collecting metrics during future HiFiber program execution.
@@ -151,21 +186,20 @@ class Metrics:
         None
 
         """
-        cls.all_rank_matches = {}
-        cls.collecting = True
-        cls.fiber_label = {}
-        cls.iteration = []
-        cls.line_order = {}
-        cls.loop_order = []
-        cls.metrics = {}
-        cls.point = []
-        cls.prefix = prefix
-        cls.rank_matches = {}
-        cls.rank_flatten = {}
-        cls.traces = {}
-
-    @classmethod
-    def dump(cls):
+        self.all_rank_matches = {}
+        self.collecting = True
+        self.fiber_label = {}
+        self.iteration = []
+        self.line_order = {}
+        self.loop_order = []
+        self.metrics = {}
+        self.point = []
+        self.prefix = prefix
+        self.rank_matches = {}
+        self.rank_flatten = {}
+        self.traces = {}
+
+    def dump(self):
         """Get the most-recently collected set of metrics
 
         Return the dictionary containing all metrics collected since the most
@@ -183,10 +217,9 @@ class Metrics:
             The dictionary of metrics collected
 
         """
-        return cls.metrics
+        return self.metrics
 
-    @classmethod
-    def consumeTrace(cls, rank, type_):
+    def consumeTrace(self, rank, type_):
         """Consume a consumable (in memory) trace
 
         Return the list of entries in the trace added since the most recent
@@ -208,17 +241,16 @@ class Metrics:
             The list of entries in the trace since the last call to
             `Metrics.consumeTrace()`
         """
-        assert cls.collecting
+        assert self.collecting
 
-        file_trace, mem_trace, is_started = cls.traces[rank][type_]
+        file_trace, mem_trace, is_started = self.traces[rank][type_]
         assert mem_trace is not None
 
-        cls.traces[rank][type_] = (file_trace, [], is_started)
+        self.traces[rank][type_] = (file_trace, [], is_started)
 
         return mem_trace
 
-    @classmethod
-    def endCollect(cls):
+    def endCollect(self):
         """End metrics collection
 
         Stop collecting metrics during future HiFiber program execution.
@@ -235,10 +267,10 @@ class Metrics:
 
         """
         # Save the trace of uses
-        for rank, dicts in cls.traces.items():
+        for rank, dicts in self.traces.items():
             for type_, (file_trace, mem_trace, _) in dicts.items():
                 if file_trace is not None:
-                    cls._writeTrace(rank, type_)
+                    file_trace.close()
 
                 # Ensure that all consumable traces have been fully consumed
                 if mem_trace is not None:
@@ -246,17 +278,16 @@ class Metrics:
 
 
         # Clear all info
-        cls.collecting = False
-        cls.fiber_label = {}
-        cls.iteration = None
-        cls.line_order = None
-        cls.loop_order = None
-        cls.point = None
-        cls.prefix = None
-        cls.traces = {}
-
-    @classmethod
-    def endIter(cls, rank):
+        self.collecting = False
+        self.fiber_label = {}
+        self.iteration = None
+        self.line_order = None
+        self.loop_order = None
+        self.point = None
+        self.prefix = None
+        self.traces = {}
+
+    def endIter(self, rank):
         """
         End iteration over a given rank
 
@@ -272,16 +303,15 @@ class Metrics:
         None
 
         """
-        assert cls.collecting
+        assert self.collecting
 
-        cls.fiber_label[rank] = 0
-        if rank in cls.line_order:
-            cls.iteration[cls.line_order[rank]] = 0
+        self.fiber_label[rank] = 0
+        if rank in self.line_order:
+            self.iteration[self.line_order[rank]] = 0
         else:
-            cls.iteration[cls.line_order[cls.rank_matches[rank]]] = 0
+            self.iteration[self.line_order[self.rank_matches[rank]]] = 0
 
-    @classmethod
-    def getIter(cls):
+    def getIter(self):
         """Get the inner loop iteration number
 
         Parameters
@@ -295,10 +325,9 @@ class Metrics:
         None
 
         """
-        return cls.iteration
+        return self.iteration
 
-    @classmethod
-    def getIndex(cls, rank):
+    def getIndex(self, rank):
         """Get the index in the line order of this rank
 
         Parameters
@@ -313,16 +342,15 @@ class Metrics:
         None
 
         """
-        assert cls.collecting
-        assert rank in cls.line_order or rank in cls.rank_matches
+        assert self.collecting
+        assert rank in self.line_order or rank in self.rank_matches
 
-        if rank in cls.line_order:
-            return cls.line_order[rank]
+        if rank in self.line_order:
+            return self.line_order[rank]
         else:
-            return cls.line_order[cls.rank_matches[rank]]
+            return self.line_order[self.rank_matches[rank]]
 
-    @classmethod
-    def getLabel(cls, rank):
+    def getLabel(self, rank):
         """Get a new label for a fiber at this rank
 
         Parameters
@@ -340,28 +368,27 @@ class Metrics:
         None
 
         """
-        assert cls.collecting
+        assert self.collecting
 
-        if rank in cls.line_order:
+        if rank in self.line_order:
             iter_rank = rank
 
-        elif rank in cls.rank_matches:
-            iter_rank = cls.rank_matches[rank]
+        elif rank in self.rank_matches:
+            iter_rank = self.rank_matches[rank]
 
         # If the correct rank has not been registered yet, create a new
         # Fiber label and combine later
-        elif rank in cls.fiber_label:
+        elif rank in self.fiber_label:
             iter_rank = rank
 
         else:
-            cls.fiber_label[rank] = 0
+            self.fiber_label[rank] = 0
             iter_rank = rank
 
-        cls.fiber_label[iter_rank] += 1
-        return cls.fiber_label[iter_rank] - 1
+        self.fiber_label[iter_rank] += 1
+        return self.fiber_label[iter_rank] - 1
 
-    @classmethod
-    def incCount(cls, line, metric, inc):
+    def incCount(self, line, metric, inc):
         """Increment a count metric during collection
 
         Increment the given count metric associated with the given line of
@@ -386,21 +413,20 @@ class Metrics:
         None
 
         """
-        assert cls.collecting
+        assert self.collecting
 
         line = line.strip()
 
-        if line not in cls.metrics:
-            cls.metrics[line] = {}
+        if line not in self.metrics:
+            self.metrics[line] = {}
 
-        if metric not in cls.metrics[line]:
-            cls.metrics[line][metric] = 0
+        if metric not in self.metrics[line]:
+            self.metrics[line][metric] = 0
 
-        cls.metrics[line][metric] += inc
+        self.metrics[line][metric] += inc
 
 
-    @classmethod
-    def incIter(cls, line):
+    def incIter(self, line):
         """Increment the given line's iteration number by one
 
         Parameters
@@ -415,17 +441,16 @@ class Metrics:
         None
 
         """
-        assert cls.collecting
-        assert line in cls.line_order or line in cls.rank_matches
+        assert self.collecting
+        assert line in self.line_order or line in self.rank_matches
 
-        if line in cls.line_order.keys():
-            cls.iteration[cls.line_order[line]] += 1
+        if line in self.line_order.keys():
+            self.iteration[self.line_order[line]] += 1
 
         else:
-            cls.iteration[cls.line_order[cls.rank_matches[line]]] += 1
+            self.iteration[self.line_order[self.rank_matches[line]]] += 1
 
-    @classmethod
-    def isCollecting(cls):
+    def isCollecting(self):
         """Returns True during metrics collection
 
         Returns True if metrics are being collected, and false if they are not.
@@ -441,10 +466,9 @@ class Metrics:
         None
 
         """
-        return cls.collecting
+        return self.collecting
 
-    @classmethod
-    def isTraced(cls, rank, type_):
+    def isTraced(self, rank, type_):
         """Returns True if the given rank and trace is actually being collected
 
         Parameters
@@ -457,12 +481,11 @@ class Metrics:
             The name of the trace in question
 
         """
-        assert cls.collecting
+        assert self.collecting
 
-        return rank in cls.traces and type_ in cls.traces[rank]
+        return rank in self.traces and type_ in self.traces[rank]
 
-    @classmethod
-    def matchRanks(cls, rank1, rank2):
+    def matchRanks(self, rank1, rank2):
         """Register the fact that rank1 and rank2 are associated with the same
         level of the loop nest
 
@@ -478,21 +501,20 @@ class Metrics:
         None
 
         """
-        if rank1 not in cls.all_rank_matches:
-            cls.all_rank_matches[rank1] = set()
+        if rank1 not in self.all_rank_matches:
+            self.all_rank_matches[rank1] = set()
 
-        if rank2 not in cls.all_rank_matches:
-            cls.all_rank_matches[rank2] = set()
+        if rank2 not in self.all_rank_matches:
+            self.all_rank_matches[rank2] = set()
 
-        all_matches = cls.all_rank_matches[rank1].union(cls.all_rank_matches[rank2])
+        all_matches = self.all_rank_matches[rank1].union(self.all_rank_matches[rank2])
         all_matches.add(rank1)
         all_matches.add(rank2)
 
         for rank in all_matches:
-            cls.all_rank_matches[rank] = all_matches.difference({rank})
+            self.all_rank_matches[rank] = all_matches.difference({rank})
 
-    @classmethod
-    def registerRank(cls, rank):
+    def registerRank(self, rank):
         """Register a rank as a part of the loop order
 
         Parameters
@@ -507,34 +529,33 @@ class Metrics:
         None
 
         """
-        assert cls.collecting
+        assert self.collecting
 
         # If this rank has already been registered, do nothing
-        if rank in cls.line_order.keys():
+        if rank in self.line_order.keys():
             return
 
-        cls.fiber_label[rank] = 0
-        cls.iteration.append(0)
-        cls.line_order[rank] = len(cls.iteration) - 1
-        cls.loop_order.append(rank)
-        cls.point.append(0)
+        self.fiber_label[rank] = 0
+        self.iteration.append(0)
+        self.line_order[rank] = len(self.iteration) - 1
+        self.loop_order.append(rank)
+        self.point.append(0)
 
-        if rank in cls.traces.keys():
-            for type_ in cls.traces[rank]:
-                cls._startTrace(rank, type_)
+        if rank in self.traces.keys():
+            for type_ in self.traces[rank]:
+                self._startTrace(rank, type_)
 
-        for src_rank, dst_ranks in cls.all_rank_matches.items():
+        for src_rank, dst_ranks in self.all_rank_matches.items():
             if rank not in dst_ranks:
                 continue
 
-            cls.rank_matches[src_rank] = rank
+            self.rank_matches[src_rank] = rank
 
-            if src_rank in cls.traces.keys():
-                for type_ in cls.traces[src_rank]:
-                    cls._startTrace(src_rank, type_)
+            if src_rank in self.traces.keys():
+                for type_ in self.traces[src_rank]:
+                    self._startTrace(src_rank, type_)
 
-    @classmethod
-    def setNumCachedUses(cls, num_cached_uses):
+    def setNumCachedUses(self, num_cached_uses):
         """Set the number of uses that are saved to memory before the trace is
         written to disk per rank
 
@@ -552,10 +573,41 @@ class Metrics:
         """
         assert num_cached_uses > 1
 
-        cls.num_cached_uses = num_cached_uses
+        self.num_cached_uses = num_cached_uses
 
-    @classmethod
-    def _startTrace(cls, rank, type_="iter"):
+    def setTraceSink(self, sink):
+        """Set the format of the traces written to disk
+
+        Traces are written as comma separated values (.csv) files by
+        default. Writing them as binary NumPy (.npy) files (see
+        `fibertree.core.trace_sink.NpyTraceSink`) is much faster and
+        the files are much smaller.
+
+        Note: applies to the traces set up by later calls to
+        `Metrics.trace()`
+
+        Parameters
+        ----------
+
+        sink: str or TraceSink subclass
+            The name of the format ("csv" or "npy") or the class used
+            to write each trace
+
+        Returns
+        -------
+
+        None
+
+        """
+        if isinstance(sink, str):
+            assert sink in self.trace_sinks, "Unknown trace format: %s" % sink
+            sink = self.trace_sinks[sink]
+
+        assert issubclass(sink, TraceSink)
+
+        self.trace_sink = sink
+
+    def _startTrace(self, rank, type_="iter"):
         """Start to trace the given rank
 
         Parameters
@@ -573,35 +625,26 @@ class Metrics:
         None
 
         """
-        assert rank in cls.line_order or rank in cls.rank_matches
+        assert rank in self.line_order or rank in self.rank_matches
 
-        if rank in cls.line_order:
-            end = cls.line_order[rank] + 1
+        if rank in self.line_order:
+            end = self.line_order[rank] + 1
         else:
-            end = cls.line_order[cls.rank_matches[rank]] + 1
+            end = self.line_order[self.rank_matches[rank]] + 1
 
-        file_trace, mem_trace, _ = cls.traces[rank][type_]
-        cls.traces[rank][type_] = (file_trace, mem_trace, True)
+        file_trace, mem_trace, _ = self.traces[rank][type_]
+        self.traces[rank][type_] = (file_trace, mem_trace, True)
 
-        if file_trace is not None:
-            with open(cls.prefix + "-" + rank + "-" + type_ + ".csv", "w") as f:
-                f.write("")
-
-        pos = ",".join(r + "_pos" for r in cls.loop_order[:end])
-        coord = ",".join(r for r in cls.loop_order[:end])
-
-        headings = [pos, coord, "fiber_pos"]
-        headings = list(r + "_pos" for r in cls.loop_order[:end]) + \
-            cls.loop_order[:end] + ["fiber_pos"]
+        headings = list(r + "_pos" for r in self.loop_order[:end]) + \
+            self.loop_order[:end] + ["fiber_pos"]
 
         if file_trace is not None:
-            file_trace.append(headings)
+            file_trace.start(headings)
         if mem_trace is not None:
             mem_trace.append(headings)
 
 
-    @classmethod
-    def trace(cls, rank, type_="iter", consumable=False):
+    def trace(self, rank, type_="iter", consumable=False):
         """Set a rank to trace
 
         Note must be called after Metrics.beginCollect()
@@ -621,24 +664,25 @@ class Metrics:
         None
 
         """
-        assert consumable or cls.prefix is not None
-        assert cls.collecting
+        assert consumable or self.prefix is not None
+        assert self.collecting
 
-        if rank not in cls.traces.keys():
-            cls.traces[rank] = {}
+        if rank not in self.traces.keys():
+            self.traces[rank] = {}
 
-        if type_ not in cls.traces[rank].keys():
-            cls.traces[rank][type_] = (None, None, False)
+        if type_ not in self.traces[rank].keys():
+            self.traces[rank][type_] = (None, None, False)
 
-        file_trace, mem_trace, is_started = cls.traces[rank][type_]
+        file_trace, mem_trace, is_started = self.traces[rank][type_]
         if consumable:
-            cls.traces[rank][type_] = (file_trace, [], is_started)
+            self.traces[rank][type_] = (file_trace, [], is_started)
         else:
-            cls.traces[rank][type_] = ([], mem_trace, is_started)
+            file_trace = self.trace_sink(self.prefix + "-" + rank + "-" + type_,
+                                        self.num_cached_uses)
+            self.traces[rank][type_] = (file_trace, mem_trace, is_started)
 
-    @classmethod
-    def _writeTrace(cls, rank, type_):
-        """Write the trace to the file
+    def _writeTrace(self, rank, type_):
+        """Write the buffered entries of the trace to the file
 
         Parameters
         ----------
@@ -655,11 +699,187 @@ class Metrics:
         None
 
         """
-        file_trace, mem_trace, _ = cls.traces[rank][type_]
+        file_trace, _, _ = self.traces[rank][type_]
         assert file_trace is not None
 
-        trace_strs = [",".join(str(val) for val in line) + "\n" for line in file_trace]
-        with open(cls.prefix + "-" + rank + "-" + type_ + ".csv", "a") as f:
-            f.write("".join(trace_strs))
+        file_trace.flush()
+
+
+#
+# The session used when no other session has been activated
+#
+_default_session = MetricsSession()
+
+_current_session = ContextVar("fibertree_metrics_session",
+                              default=_default_session)
+
+
+class _MetricsFacade(type):
+    """Metaclass forwarding the attributes of `Metrics` to the current
+    session"""
+
+    def __getattr__(cls, name):
+
+        return getattr(_current_session.get(), name)
+
+    def __setattr__(cls, name, value):
+
+        setattr(_current_session.get(), name, value)
+
+
+class Metrics(metaclass=_MetricsFacade):
+    """A globally available class for tracking metrics.
+
+    The Metrics class provides an interface for collecting metrics from the
+    execution of an HiFiber kernel. All methods are class-level so that the metrics
+    can be updated and read from anywhere.
+
+    The methods of the Metrics class call the corresponding methods of
+    the current `MetricsSession` (see the module documentation), e.g.,
+    `Metrics.addUse()` calls `MetricsSession.addUse()` of the current
+    session, and its attributes (e.g., `Metrics.collecting`) are the
+    attributes of the current session.
+
+    Constructor
+    ----------
+
+    There is no reason to ever create an instance of the Metrics class
+
+    """
+
+    def __init__(self):
+        raise NotImplementedError
+
+    @classmethod
+    def getSession(cls):
+        """Get the current session
+
+        Parameters
+        ----------
+
+        None
+
+        Returns
+        -------
+
+        session: MetricsSession
+            The session the methods of the Metrics class are applied to
+
+        """
+        return _current_session.get()
+
+    @classmethod
+    def addUse(cls, rank, coord, pos, type_="iter", iteration_num=None):
+        """See `MetricsSession.addUse()`"""
+
+        return _current_session.get().addUse(rank, coord, pos, type_=type_,
+                                             iteration_num=iteration_num)
+
+    @classmethod
+    def associateShape(cls, rank, shape):
+        """See `MetricsSession.associateShape()`"""
+
+        return _current_session.get().associateShape(rank, shape)
+
+    @classmethod
+    def beginCollect(cls, prefix=None):
+        """See `MetricsSession.beginCollect()`"""
+
+        return _current_session.get().beginCollect(prefix=prefix)
+
+    @classmethod
+    def dump(cls):
+        """See `MetricsSession.dump()`"""
+
+        return _current_session.get().dump()
+
+    @classmethod
+    def consumeTrace(cls, rank, type_):
+        """See `MetricsSession.consumeTrace()`"""
+
+        return _current_session.get().consumeTrace(rank, type_)
+
+    @classmethod
+    def endCollect(cls):
+        """See `MetricsSession.endCollect()`"""
+
+        return _current_session.get().endCollect()
+
+    @classmethod
+    def endIter(cls, rank):
+        """See `MetricsSession.endIter()`"""
+
+        return _current_session.get().endIter(rank)
+
+    @classmethod
+    def getIter(cls):
+        """See `MetricsSession.getIter()`"""
+
+        return _current_session.get().getIter()
+
+    @classmethod
+    def getIndex(cls, rank):
+        """See `MetricsSession.getIndex()`"""
+
+        return _current_session.get().getIndex(rank)
+
+    @classmethod
+    def getLabel(cls, rank):
+        """See `MetricsSession.getLabel()`"""
+
+        return _current_session.get().getLabel(rank)
+
+    @classmethod
+    def incCount(cls, line, metric, inc):
+        """See `MetricsSession.incCount()`"""
+
+        return _current_session.get().incCount(line, metric, inc)
+
+    @classmethod
+    def incIter(cls, line):
+        """See `MetricsSession.incIter()`"""
+
+        return _current_session.get().incIter(line)
+
+    @classmethod
+    def isCollecting(cls):
+        """See `MetricsSession.isCollecting()`"""
+
+        return _current_session.get().collecting
+
+    @classmethod
+    def isTraced(cls, rank, type_):
+        """See `MetricsSession.isTraced()`"""
+
+        return _current_session.get().isTraced(rank, type_)
+
+    @classmethod
+    def matchRanks(cls, rank1, rank2):
+        """See `MetricsSession.matchRanks()`"""
+
+        return _current_session.get().matchRanks(rank1, rank2)
+
+    @classmethod
+    def registerRank(cls, rank):
+        """See `MetricsSession.registerRank()`"""
+
+        return _current_session.get().registerRank(rank)
+
+    @classmethod
+    def setNumCachedUses(cls, num_cached_uses):
+        """See `MetricsSession.setNumCachedUses()`"""
+
+        return _current_session.get().setNumCachedUses(num_cached_uses)
+
+    @classmethod
+    def setTraceSink(cls, sink):
+        """See `MetricsSession.setTraceSink()`"""
+
+        return _current_session.get().setTraceSink(sink)
+
+    @classmethod
+    def trace(cls, rank, type_="iter", consumable=False):
+        """See `MetricsSession.trace()`"""
 
-        cls.traces[rank][type_] = ([], mem_trace, True)
+        return _current_session.get().trace(rank, type_=type_,
+                                            consumable=consumable)
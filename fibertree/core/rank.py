@@ -482,6 +482,12 @@ class Rank:
         #
         # Add fiber to list of fibers of rank
         #
+        # Note: the fibers of a rank loaded with Tensor.fromFile()
+        #       are created on demand, so convert them to a list
+        #
+        if type(self.fibers) is not list:
+            self.fibers = list(self.fibers)
+
         self.fibers.append(fiber)
 
     def pop(self):
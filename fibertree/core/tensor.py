@@ -12,7 +12,6 @@ from sys import exit
 import copy
 import pickle
 import yaml
-from copy import deepcopy
 
 from .rank    import Rank
 from .fiber   import Fiber
@@ -246,6 +245,34 @@ class Tensor:
         return Tensor.fromFiber(rank_ids, root, shape=shape)
 
 
+    @classmethod
+    def fromFile(cls, filename):
+        """Construct a tensor from a binary tensor file
+
+        This constructor opens a tensor written with
+        `Tensor.toFile()`. The arrays in the file are memory mapped
+        and the fibers of the tensor are only created as they are
+        accessed.
+
+        Parameters
+        -----------
+
+        filename: string
+            Filename of file containing a binary representation of a tensor
+
+        Notes
+        -----
+
+        The leaf fibers of the tensor are array-backed (see
+        `Fiber.fromArrays()`).
+
+        """
+
+        from .tensor_file import loadTensorFile
+
+        return loadTensorFile(cls, filename)
+
+
     @classmethod
     def fromUncompressed(cls,
                          rank_ids=None,
@@ -716,7 +743,7 @@ class Tensor:
         # Note: shapes and owners will be overwritten in _addFiber()
         #
         if root.getOwner() is not None:
-            root = deepcopy(root.copy(preserve_owner=False))
+            root = root.copy(preserve_owner=False)
 
         self._root = root
 
@@ -752,6 +779,10 @@ class Tensor:
 
         self.ranks[level].append(fiber)
 
+        # The payloads of the fibers of the last rank are not fibers
+        if level + 1 == len(self.ranks):
+            return
+
         # Note: The code below handles the (probably abandoned)
         #       transistion from raw fibers as payloads to fibers in
         #       Payload
@@ -1398,9 +1429,9 @@ class Tensor:
         assert sorted(old_rank_ids) == sorted(rank_ids)
 
         old_name = self.getName()
-        copied = copy.deepcopy(self)
 
         if old_rank_ids == rank_ids:
+            copied = copy.deepcopy(self)
             copied.setName(f"{old_name}+swizzled")
             return copied
 
@@ -1416,60 +1447,18 @@ class Tensor:
         for rank_id in rank_ids:
             guide.append(old_rank_ids.index(rank_id))
 
-        coords = []
-        payloads = {}
-        frontier = [(copied.getRoot(), None, None, -1)]
-        frontier_coords = [None] * swiz_len
-
-        ranges = {rank: set() for rank in old_rank_ids}
-
-        # Depth-first search through the fibertree and extract the coordinate
-        # payload pairs
-        while frontier:
-            head, parent, coord, depth = frontier.pop()
-            if coord is not None:
-                frontier_coords[depth] = coord
-
-            if parent is not None:
-                ranges[parent.getRankAttrs().getId()].add(parent.getActive())
-
-            # If this is the last point we need to swizzle, save the payload
-            if depth == swiz_len - 1:
-                new_c = tuple(frontier_coords[guide[i]] for i in range(swiz_len))
-
-                coords.append(new_c)
-                payloads[new_c] = head
-                continue
+        coords, heads, ranges = self._swizzleExtract(swiz_len)
 
-            # Otherwise, add this fiber to the frontier
-            for c, p in zip(head.coords, head.payloads):
-                frontier.append((p, head, c, depth + 1))
+        # Sort the elements by their new coordinates
+        keys = [coords[guide[i]] for i in range(swiz_len)]
+        order = Tensor._swizzleOrder(keys)
 
-        # Sort the coordinates
-        coords.sort(reverse=True)
+        keys = [key[order] for key in keys]
+        heads = [heads[j] for j in order.tolist()]
 
-        # Add back all of the payloads
-        root = Fiber()
-        fibers = [root] + [None] * (swiz_len - 1)
-        last_coord = (None,) * swiz_len
-        while coords:
-            coord = coords.pop()
-
-            # Reuse the payloads we have gotten so far
-            same = True
-            for i, c in enumerate(coord[:-1]):
-                same = same and c == last_coord[i]
-
-                # Get a new payload if we are on a new tree
-                if not same:
-                    child = Fiber()
-                    fibers[i].append(c, child)
-                    fibers[i + 1] = child
-
-            # Append the payload
-            fibers[-1].append(coord[-1], payloads[coord])
-
-            last_coord = coord
+        root = Tensor._swizzleBuild(keys,
+                                    heads,
+                                    [ranges[rank_id] for rank_id in rank_ids[:swiz_len]])
 
         # Build the new tensor
         kwargs = {"name": f"{old_name}+swizzled",
@@ -1485,28 +1474,174 @@ class Tensor:
                 + old_shape[swiz_len:]
             kwargs["shape"] = new_shape
 
-        swizzled = Tensor.fromFiber(**kwargs)
+        return Tensor.fromFiber(**kwargs)
+
+    def _swizzleExtract(self, swiz_len):
+        """Extract the elements of the top `swiz_len` ranks
+
+        Returns
+        -------
+
+        coords: list of np.ndarray
+            For each rank, the coordinate at that rank of each element
+
+        heads: list
+            The payload of each element, i.e., a copy of the values of
+            the leaf payloads or of the fibers of the remaining ranks
+
+        ranges: dict
+            The set of active ranges of the non-empty fibers of each
+            rank
+
+        """
+        import numpy as np
+
+        ranges = {rank_id: set() for rank_id in self.getRankIds()}
+
+        # Collect the coordinates of each rank, with the position of the
+        # fiber (in the rank above) each coordinate belongs to
+        level_coords = []
+        parents = []
+
+        fibers = [self.getRoot()]
+        for _ in range(swiz_len):
+            coords = []
+            counts = []
+            children = []
+
+            for fiber in fibers:
+                if len(fiber.coords) > 0:
+                    ranges[fiber.getRankAttrs().getId()].add(fiber.getActive())
+
+                coords.extend(fiber.coords)
+                counts.append(len(fiber.coords))
+                children.extend(fiber.payloads)
+
+            level_coords.append(Tensor._coordArray(coords))
+            parents.append(np.repeat(np.arange(len(fibers)), counts))
+            fibers = children
+
+        # Find the coordinate at every rank of each element
+        element_coords = [None] * swiz_len
+        positions = np.arange(len(fibers))
+        for depth in reversed(range(swiz_len)):
+            element_coords[depth] = level_coords[depth][positions]
+            positions = parents[depth][positions]
+
+        # Copy the fibers of the remaining ranks or the leaf values
+        if swiz_len < len(self.getRankIds()):
+            heads = Fiber._copyPayloads(fibers)
+        else:
+            heads = [Payload.get(payload) for payload in fibers]
+
+        return element_coords, heads, ranges
+
+    @staticmethod
+    def _coordArray(coords):
+        """Convert a list of coordinates to an array (of objects unless
+        they are integers)"""
+        import numpy as np
+
+        array = np.array(coords) if coords else np.empty(0, dtype=np.int64)
+        if array.ndim == 1 and array.dtype.kind in "iu":
+            return array
+
+        return np.fromiter(coords, dtype=object, count=len(coords))
+
+    @staticmethod
+    def _swizzleOrder(keys):
+        """Get the order that sorts the elements by the given keys (most
+        significant first)"""
+        import numpy as np
+
+        if all(key.dtype != object for key in keys):
+            return np.lexsort(keys[::-1])
 
-        # For each fiber, reset its active range
-        frontier = [swizzled.getRoot()]
-        while frontier:
-            fiber = frontier.pop()
-            rank = fiber.getRankAttrs().getId()
-            rank_ranges = ranges[rank]
+        lists = [key.tolist() for key in keys]
+        order = sorted(range(len(keys[0])),
+                       key=lambda j: tuple(list_[j] for list_ in lists))
 
-            if not fiber.isEmpty() and rank_ranges:
-                starts = [range_[0] for range_ in rank_ranges if range_[0] <= fiber.coords[0] and range_[1] > fiber.coords[0]]
-                start = min(starts)
+        return np.array(order, dtype=np.int64)
 
-                ends = [range_[1] for range_ in rank_ranges if range_[0] <= fiber.coords[-1] and range_[1] > fiber.coords[-1]]
-                end = max(ends)
+    @staticmethod
+    def _swizzleBuild(keys, heads, ranges):
+        """Build a fibertree from its sorted elements
+
+        Parameters
+        ----------
+
+        keys: list of np.ndarray
+            For each rank, the coordinate at that rank of each element,
+            sorted
+
+        heads: list
+            The payload of each element
 
-                fiber.setActive((start, end))
+        ranges: list of sets
+            For each rank, the active ranges used to set the active range
+            of each fiber
 
-                if isinstance(fiber.payloads[0], Fiber):
-                    frontier.extend(fiber.payloads)
+        Returns
+        -------
+
+        root: Fiber
+            The root of the fibertree
 
-        return swizzled
+        """
+        import numpy as np
+
+        num_elems = len(heads)
+
+        # The positions (in the elements) at which each rank's coordinate
+        # starts a new element of that rank
+        starts = []
+        is_new = np.zeros(num_elems, dtype=bool)
+        if num_elems > 0:
+            is_new[0] = True
+
+        for key in keys:
+            is_new[1:] |= key[1:] != key[:-1]
+            starts.append(np.flatnonzero(is_new))
+
+        # Build the fibers of each rank from the bottom up, grouping the
+        # elements of a rank by the element of the rank above they
+        # belong to
+        payloads = heads
+        for depth in reversed(range(len(keys))):
+            coords = keys[depth][starts[depth]].tolist()
+
+            if depth == 0:
+                bounds = [0, len(coords)]
+            else:
+                bounds = np.searchsorted(starts[depth], starts[depth - 1]).tolist() \
+                    + [len(coords)]
+
+            fibers = []
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                fiber_coords = coords[start:end]
+                active_range = Tensor._swizzleActive(fiber_coords, ranges[depth])
+                fibers.append(Fiber(fiber_coords,
+                                    payloads[start:end],
+                                    active_range=active_range))
+
+            payloads = fibers
+
+        return payloads[0]
+
+    @staticmethod
+    def _swizzleActive(coords, ranges):
+        """Get the active range of a fiber of a swizzled rank: the widest
+        of the active ranges of the rank before swizzling that contain its
+        first and last coordinates"""
+        if not coords or not ranges:
+            return None
+
+        start = min(range_[0] for range_ in ranges
+                    if range_[0] <= coords[0] and range_[1] > coords[0])
+        end = max(range_[1] for range_ in ranges
+                  if range_[0] <= coords[-1] and range_[1] > coords[-1])
+
+        return (start, end)
 
 
     def swapRanks(self, depth=0):
@@ -2024,6 +2159,32 @@ class Tensor:
         with open(filename, 'w') as file:
             yaml.dump(tensor_dict, file)
 
+
+    def toFile(self, filename):
+        """Write a tensor to a file in a binary format
+
+        The fibertree is written as a set of arrays in compressed
+        sparse fiber (CSF) form (see `fibertree.core.tensor_file`),
+        which can be opened with `Tensor.fromFile()`.
+
+        Parameters
+        ----------
+
+        filename: string
+            Filename of the file to write
+
+        Notes
+        -----
+
+        Only tensors with scalar integer coordinates and scalar
+        numeric payloads are supported.
+
+        """
+
+        from .tensor_file import dumpTensorFile
+
+        dumpTensorFile(self, filename)
+
 #
 # Copy operation
 #
@@ -2032,9 +2193,45 @@ class Tensor:
 
         Note: to ensure maintainability, we want to automatically copy
         everything. We use pickling because it is much more performant
-        than the default deepcopy
+        than the default deepcopy. However, the fibertree is left out
+        of the pickle and copied with `Fiber._copyFibers()`, whose
+        copies of the leaf fibers share arrays of their values with the
+        other copies of this tensor until they are mutated.
         """
-        return pickle.loads(pickle.dumps(self))
+        root = self._root
+
+        if not isinstance(root, Fiber) or root.isLazy():
+            return pickle.loads(pickle.dumps(self))
+
+        state = self.__dict__.copy()
+        fibers = [rank.fibers for rank in self.ranks]
+
+        try:
+            self._root = None
+            self.__dict__.pop("_footprint_tables", None)
+            for rank in self.ranks:
+                rank.fibers = []
+
+            copied = pickle.loads(pickle.dumps(self))
+        finally:
+            self.__dict__.update(state)
+            for rank, rank_fibers in zip(self.ranks, fibers):
+                rank.fibers = rank_fibers
+
+        owners = {id(rank): copied_rank
+                  for rank, copied_rank in zip(self.ranks, copied.ranks)}
+
+        fibers = [list(rank_fibers) for rank_fibers in fibers]
+        copies = Fiber._copyFibers([root] + [fiber for rank_fibers in fibers
+                                              for fiber in rank_fibers],
+                                    owners)
+
+        for copied_rank, rank_fibers in zip(copied.ranks, fibers):
+            copied_rank.fibers = [copies[id(fiber)] for fiber in rank_fibers]
+
+        copied._root = copies[id(root)]
+
+        return copied
 
 #
 # Utility methods
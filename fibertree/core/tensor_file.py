@@ -0,0 +1,235 @@
+#cython: language_level=3
+"""Tensor File
+
+A module implementing a binary, columnar on-disk format for tensors
+(see `Tensor.toFile()` and `Tensor.fromFile()`).
+
+The fibertree is stored in compressed sparse fiber (CSF) form. For
+each rank there is an array holding the coordinates of all the fibers
+in the rank (in tree order) and an array of segment offsets, such
+that the coordinates of the i-th fiber of the rank are at positions
+`segments[i]` to `segments[i+1]`. The payload of the j-th element of
+a non-leaf rank is the j-th fiber of the next rank, and there is a
+single array holding the payloads of the elements of the leaf rank.
+
+File layout
+-----------
+
+- An 8 byte magic string (including a format version number)
+- The length of the header as a little-endian 64-bit integer
+- A JSON header with the rank ids, shape, name, default and the
+  dtype, length and offset of each array
+- The arrays, each starting at a 64-byte aligned offset
+
+Since the arrays are stored raw, they are opened with
+`numpy.memmap` and fibers are only created as they are accessed.
+
+"""
+
+import json
+
+import numpy as np
+
+from .array_storage import CSFRank
+from .payload import Payload
+
+_MAGIC = b"FTCSF\x00\x01\x00"
+
+_ALIGNMENT = 64
+
+
+def dumpTensorFile(tensor, filename):
+    """Write a tensor to a file in the binary CSF format
+
+    Parameters
+    ----------
+
+    tensor: Tensor
+        The tensor to write
+
+    filename: str
+        The name of the file to write
+
+    Notes
+    -----
+
+    Only tensors with ordered, unique fibers, scalar integer
+    coordinates and scalar numeric payloads are supported.
+
+    """
+
+    rank_ids = tensor.getRankIds()
+    root = tensor.getRoot()
+
+    arrays = {}
+
+    if len(rank_ids) == 0:
+        arrays["payloads"] = _toArray([Payload.get(root)])
+    else:
+        fibers = [root]
+
+        for level in range(len(rank_ids)):
+            coords = []
+            segments = [0]
+            payloads = []
+
+            for fiber in fibers:
+                assert fiber.isOrdered() and fiber.isUnique(), \
+                    "Only ordered, unique fibers are supported"
+
+                coords.extend(fiber.getCoords())
+                segments.append(len(coords))
+                payloads.extend(fiber.getPayloads())
+
+            arrays[f"coords_{level}"] = _toArray(coords, dtype=np.int64)
+            arrays[f"segments_{level}"] = np.array(segments, dtype=np.int64)
+
+            assert arrays[f"coords_{level}"].dtype.kind in "iu", \
+                "Only integer coordinates are supported"
+
+            if level == len(rank_ids) - 1:
+                arrays["payloads"] = _toArray([Payload.get(p) for p in payloads])
+            else:
+                fibers = payloads
+
+    assert arrays["payloads"].dtype.kind in "biuf", \
+        "Only numeric payloads are supported"
+
+    if len(rank_ids) == 0:
+        shape = []
+        default = 0
+    else:
+        shape = tensor.getShape()
+        default = Payload.get(tensor.getDefault())
+
+    header = {'rank_ids': rank_ids,
+              'shape': shape,
+              'name': tensor.getName(),
+              'default': default,
+              'arrays': {}}
+
+    #
+    # Place the arrays after the header
+    #
+    offset = 0
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str,
+                                  'length': array.shape[0],
+                                  'offset': offset}
+
+        offset += _align(array.nbytes)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(len(_MAGIC) + 8 + len(header_bytes))
+
+    with open(filename, "wb") as f:
+        f.write(_MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+
+        for name, array in arrays.items():
+            f.seek(data_start + header['arrays'][name]['offset'])
+            f.write(array.tobytes())
+
+        # Make sure the file covers the padding of the last array
+        f.truncate(data_start + offset)
+
+
+def loadTensorFile(cls, filename):
+    """Open a tensor in a file in the binary CSF format
+
+    Parameters
+    ----------
+
+    cls: class
+        The tensor class to create
+
+    filename: str
+        The name of the file to read
+
+    Returns
+    -------
+
+    tensor: Tensor
+        A tensor whose fibers will be created as they are accessed
+
+    """
+
+    with open(filename, "rb") as f:
+        magic = f.read(len(_MAGIC))
+
+        assert magic == _MAGIC, \
+            f"{filename} is not a fibertree tensor file"
+
+        header_len = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    data_start = _align(len(_MAGIC) + 8 + header_len)
+
+    arrays = {}
+    for name, info in header['arrays'].items():
+        dtype = np.dtype(info['dtype'])
+
+        if info['length'] == 0:
+            arrays[name] = np.zeros(0, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(filename,
+                                     dtype=dtype,
+                                     mode="r",
+                                     offset=data_start + info['offset'],
+                                     shape=(info['length'],))
+
+    rank_ids = header['rank_ids']
+
+    if len(rank_ids) == 0:
+        tensor = cls(rank_ids=[], name=header['name'])
+        tensor._root = Payload(arrays["payloads"][0].item())
+        tensor.setMutable(False)
+        return tensor
+
+    tensor = cls(rank_ids=rank_ids,
+                 shape=header['shape'],
+                 name=header['name'],
+                 default=header['default'])
+
+    #
+    # Create the ranks from the leaf up, replacing each rank's
+    # (empty) list of fibers with the lazily created fibers
+    #
+    csf_rank = None
+
+    for level in reversed(range(len(rank_ids))):
+        rank = tensor.ranks[level]
+
+        if csf_rank is None:
+            csf_rank = CSFRank(rank,
+                               arrays[f"coords_{level}"],
+                               arrays[f"segments_{level}"],
+                               payloads=arrays["payloads"])
+        else:
+            csf_rank = CSFRank(rank,
+                               arrays[f"coords_{level}"],
+                               arrays[f"segments_{level}"],
+                               next_rank=csf_rank)
+
+        rank.fibers = csf_rank.getFibers()
+
+    tensor._root = tensor.ranks[0].getFibers()[0]
+    tensor.setMutable(False)
+
+    return tensor
+
+
+def _toArray(values, dtype=None):
+    """Convert a list of scalars to an array"""
+
+    if len(values) == 0 and dtype is not None:
+        return np.zeros(0, dtype=dtype)
+
+    return np.array(values)
+
+
+def _align(offset):
+    """Round an offset up to the alignment of the arrays"""
+
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
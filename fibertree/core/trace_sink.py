@@ -0,0 +1,403 @@
+#cython: language_level=3
+#cython: profile=True
+"""Trace Sink
+
+A module holding the classes that store the traces of uses collected
+by `Metrics.addUse()` (see `Metrics.trace()`).
+
+Each traced (rank, type) pair gets its own sink, which is created by
+`Metrics.trace()`. A sink is given the heading of each column of the
+trace when iteration over the rank begins (`TraceSink.start()`), then
+the entries of the trace one at a time (`TraceSink.append()`), and is
+closed at the end of collection (`TraceSink.close()`).
+
+Two sinks are provided:
+
+- `CsvTraceSink` (the default) writes a comma separated values file
+  (`<prefix>-<rank>-<type>.csv`), which is the format read by the
+  classes in `fibertree.model`.
+
+- `NpyTraceSink` writes a NumPy `.npy` file
+  (`<prefix>-<rank>-<type>.npy`) holding a one-dimensional array of
+  records with one int64 field per column of the trace. The entries
+  are copied into preallocated arrays, and full arrays are written to
+  the file by a background thread, so the traced program does not wait
+  for values to be formatted or written to disk. The trace can be
+  read with `loadTrace()` and converted to a .csv file with
+  `traceToCsv()`.
+
+The sink used is selected with `Metrics.setTraceSink()`.
+
+"""
+
+import queue
+import threading
+
+#
+# Number of full arrays of a `NpyTraceSink` that can be waiting to be
+# written to disk before `NpyTraceSink.append()` waits for the
+# background thread
+#
+_MAX_PENDING = 8
+
+
+class TraceSink:
+    """Base class of the destinations of a trace
+
+    Parameters
+    ----------
+
+    prefix: str
+        The filename (without the extension) of the trace
+
+    num_cached_uses: int
+        The number of entries of the trace buffered in memory before
+        they are written out
+
+    """
+
+    #
+    # The extension of the filename of the trace
+    #
+    extension = ""
+
+    def __init__(self, prefix, num_cached_uses):
+
+        self.filename = prefix + self.extension
+        self.num_cached_uses = num_cached_uses
+
+    def start(self, headings):
+        """Start the trace
+
+        Parameters
+        ----------
+
+        headings: list of str
+            The heading of each column of the trace
+
+        """
+        raise NotImplementedError
+
+    def append(self, data):
+        """Add an entry to the trace
+
+        Parameters
+        ----------
+
+        data: list of int
+            The value of each column of the entry
+
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Write out the buffered entries of the trace"""
+
+        raise NotImplementedError
+
+    def close(self):
+        """Write out the buffered entries of the trace and finish the
+        trace"""
+
+        self.flush()
+
+
+class CsvTraceSink(TraceSink):
+    """A trace written to a comma separated values file"""
+
+    extension = ".csv"
+
+    def __init__(self, prefix, num_cached_uses):
+
+        super().__init__(prefix, num_cached_uses)
+
+        self.buffer = []
+
+    def start(self, headings):
+        """start"""
+
+        with open(self.filename, "w") as f:
+            f.write("")
+
+        self.buffer = []
+        self.append(headings)
+
+    def append(self, data):
+        """append"""
+
+        self.buffer.append(data)
+
+        # If we are at the limit of the number of cached uses, write the data
+        # to disk
+        if len(self.buffer) == self.num_cached_uses:
+            self.flush()
+
+    def flush(self):
+        """flush"""
+
+        trace_strs = [",".join(str(val) for val in line) + "\n" for line in self.buffer]
+        with open(self.filename, "a") as f:
+            f.write("".join(trace_strs))
+
+        self.buffer = []
+
+
+class NpyTraceSink(TraceSink):
+    """A trace written to a NumPy .npy file by a background thread
+
+    The file holds a one-dimensional array of records with one int64
+    field, named by the heading, for each column of the trace.
+    Therefore all the values in the trace must be integers.
+
+    """
+
+    extension = ".npy"
+
+    def __init__(self, prefix, num_cached_uses):
+
+        super().__init__(prefix, num_cached_uses)
+
+        self.headings = None
+        self.width = None
+
+        # The array currently being filled and the number of entries in it
+        self.buffer = None
+        self.num_entries = 0
+
+        # The number of entries handed to the background thread
+        self.length = 0
+
+        # Arrays already written to disk that can be filled again
+        self.free = []
+
+        self.file = None
+        self.header_len = None
+        self.pending = None
+        self.writer = None
+        self.error = None
+
+    def start(self, headings):
+        """start"""
+
+        # Restarting the trace drops everything already in it
+        if self.file is not None:
+            self._stop()
+            self.file.close()
+            self.file = None
+
+        if self.buffer is not None:
+            self.free.append(self.buffer)
+
+        if len(headings) != self.width:
+            self.free = []
+
+        self.headings = list(headings)
+        self.width = len(self.headings)
+
+        self.buffer = None
+        self.num_entries = 0
+        self.length = 0
+        self.header_len = None
+        self.error = None
+
+        self._open()
+
+    def append(self, data):
+        """append"""
+
+        buffer = self.buffer
+        if buffer is None:
+            buffer = self._allocate(len(data))
+
+        buffer[self.num_entries] = data
+        self.num_entries += 1
+
+        if self.num_entries == len(buffer):
+            self.flush()
+
+    def flush(self):
+        """flush"""
+
+        if self.num_entries == 0:
+            return
+
+        self._open()
+
+        self.pending.put((self.buffer, self.num_entries))
+        self.length += self.num_entries
+
+        self.buffer = None
+        self.num_entries = 0
+
+    def close(self):
+        """close"""
+
+        self.flush()
+
+        if self.file is None:
+            return
+
+        self._stop()
+
+        self.file.seek(0)
+        self.file.write(self._header(self.length))
+        self.file.close()
+
+        self.file = None
+
+        if self.error is not None:
+            raise self.error
+
+    def _allocate(self, width):
+        """Get an empty array to hold entries of the trace"""
+
+        import numpy as np
+
+        if self.width is None:
+            self.width = width
+
+        assert width == self.width, "Trace entries must all have the same length"
+
+        if self.free:
+            self.buffer = self.free.pop()
+        else:
+            self.buffer = np.empty((max(self.num_cached_uses, 1), self.width),
+                                   dtype=np.int64)
+
+        return self.buffer
+
+    def _open(self):
+        """Create the file and start the background thread"""
+
+        if self.file is not None:
+            return
+
+        if self.headings is None:
+            self.headings = ["col%d" % i for i in range(self.width)]
+
+        #
+        # Reserve space for a header big enough for any length, which
+        # is filled in by `close()`
+        #
+        header = self._header(2**63 - 1)
+        self.header_len = len(header)
+
+        self.file = open(self.filename, "wb")
+        self.file.write(header)
+
+        self.pending = queue.Queue(maxsize=_MAX_PENDING)
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+
+    def _stop(self):
+        """Wait for the background thread to write all the arrays handed
+        to it and stop"""
+
+        self.pending.put(None)
+        self.writer.join()
+
+    def _header(self, length):
+        """Create the .npy (version 1.0) header of a trace of the given
+        length"""
+
+        descr = [(heading, "<i8") for heading in self.headings]
+        header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" \
+                 % (descr, length)
+
+        # The magic string, version and header length take 10 bytes
+        total_len = 10 + len(header) + 1
+
+        if self.header_len is None:
+            total_len = -(-total_len // 64) * 64
+        else:
+            total_len = self.header_len
+
+        header = header.ljust(total_len - 11) + "\n"
+        assert len(header) < 2**16
+
+        return b"\x93NUMPY\x01\x00" \
+            + len(header).to_bytes(2, "little") \
+            + header.encode("latin1")
+
+    def _write(self):
+        """Write the arrays handed over by `flush()` (run by the
+        background thread)"""
+
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+
+            buffer, num_entries = item
+
+            try:
+                if self.error is None:
+                    self.file.write(buffer[:num_entries].data)
+            except Exception as error:
+                self.error = error
+
+            self.free.append(buffer)
+
+
+def loadTrace(filename, mmap_mode="r"):
+    """Load a trace written by a `NpyTraceSink`
+
+    Parameters
+    ----------
+
+    filename: str
+        The name of the .npy file
+
+    mmap_mode: str or None, default="r"
+        Memory map the file with the given mode (see `numpy.load()`)
+
+    Returns
+    -------
+
+    trace: numpy.ndarray
+        A one-dimensional array of records with one int64 field per
+        column of the trace
+
+    """
+
+    import numpy as np
+
+    return np.load(filename, mmap_mode=mmap_mode)
+
+
+def traceToCsv(filename, csv_filename):
+    """Convert a trace written by a `NpyTraceSink` into a .csv file
+
+    The .csv file is the same as the one written by a `CsvTraceSink`,
+    so it can be read by the classes in `fibertree.model`.
+
+    Parameters
+    ----------
+
+    filename: str
+        The name of the .npy file
+
+    csv_filename: str
+        The name of the .csv file to write
+
+    Returns
+    -------
+
+    None
+
+    """
+
+    import numpy as np
+
+    trace = loadTrace(filename)
+    names = trace.dtype.names
+
+    with open(csv_filename, "w") as f:
+        f.write(",".join(names) + "\n")
+
+        chunk = 65536
+        for start in range(0, len(trace), chunk):
+            values = trace[start:start + chunk]
+            values = np.stack([values[name] for name in names], axis=1)
+            f.writelines(",".join(map(str, line)) + "\n"
+                         for line in values.tolist())
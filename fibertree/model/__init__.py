@@ -2,3 +2,4 @@ from .compute import Compute
 from .format import Format
 from .intersect import LeaderFollowerIntersector, SkipAheadIntersector, TwoFingerIntersector
 from .traffic import Traffic
+from .trace_reader import TraceReader, readTrace, writeTrace
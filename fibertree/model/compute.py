@@ -2,9 +2,12 @@
 """
 Compute the number operations executed
 """
-import bisect
+import numpy as np
 
 from fibertree import Tensor
+from fibertree.core.array_storage import CoordArray
+
+from .trace_reader import TraceReader
 
 class Compute:
     """Class for storing all compute counting methods
@@ -22,14 +25,7 @@ class Compute:
         """
         Compute the number of iterations (lines) in this trace
         """
-        with open(trace, "r") as f:
-            f.readline()
-
-            iters = 0
-            while f.readline():
-                iters += 1
-
-        return iters
+        return len(TraceReader(trace))
 
     @staticmethod
     def numOps(dump, op):
@@ -80,66 +76,179 @@ class Compute:
             return swaps
 
         # Otherwise merge
-        coords = []
-        for _, payload in fiber:
-            coords.append(sorted([-c for c in payload.getCoords()]))
+        coords = [Compute._coordArray(payload) for _, payload in fiber]
+        return Compute._mergeTree(coords, radix, next_latency)
 
-        while len(coords) > 1:
-            new = []
-            if radix > len(coords):
-                radix = len(coords)
+    @staticmethod
+    def _coordArray(fiber):
+        """Get the coordinates of a fiber as an array (without creating a
+        list if the fiber is array-backed)"""
+        if isinstance(fiber.coords, CoordArray):
+            return fiber.coords.array
 
-            for i in range(0, len(coords), radix):
-                end = min(i + radix, len(coords))
-                ops, merged = Compute._merge(coords[i:end], radix, next_latency)
+        return np.array(fiber.getCoords(), dtype=np.int64)
 
-                swaps += ops
-                new.append(merged)
+    @staticmethod
+    def _mergeTree(coords, radix, next_latency):
+        """Compute the cost of merging lists of coordinates with a tree of
+        mergers of the given radix
 
-            coords = new
+        Each level of the tree merges consecutive groups of `radix` lists.
+        The merged lists are never built: only the list of each coordinate
+        changes from level to level.
+        """
+        lengths = [len(list_) for list_ in coords]
+        num_coords = sum(lengths)
+        num_lists = len(coords)
+
+        # With a finite next latency, the cost of a level is the latency
+        # times the number of lists and coordinates
+        if isinstance(next_latency, int):
+            swaps = 0
+            while num_lists > 1:
+                radix = min(radix, num_lists)
+                swaps += next_latency * (num_lists + num_coords)
+                num_lists = -(-num_lists // radix)
+
+            return swaps
+
+        values = np.concatenate(coords) if coords else np.empty(0, dtype=np.int64)
+        lists = np.repeat(np.arange(num_lists), lengths)
+
+        swaps = 0
+        while num_lists > 1:
+            radix = min(radix, num_lists)
+            groups = lists // radix
+
+            swaps += Compute._numCompares(values, lists, groups)
+
+            lists = groups
+            num_lists = -(-num_lists // radix)
 
         return swaps
 
     @staticmethod
-    def _merge(coords, radix, next_latency):
+    def _numCompares(values, lists, groups):
+        """Compute the number of comparisons made by mergers that insert
+        the head of each list into a sorted list of heads
+
+        Each group of lists is merged by a separate merger. Inserting a
+        coordinate compares it with every head that is popped before it,
+        plus one. Heads are popped in the order of their coordinates
+        (later lists first if they are equal).
+
+        Parameters
+        ----------
+
+        values: np.ndarray
+            The coordinates
+
+        lists: np.ndarray
+            The (nondecreasing) list of each coordinate
+
+        groups: np.ndarray
+            The (nondecreasing) group of each coordinate
+
+        Returns
+        -------
+
+        compares: int
+            The total number of comparisons
+
         """
-        Merge sorted lists of coordinates into a single list
+        if len(values) == 0:
+            return 0
+
+        # The lists in the order their coordinates are popped
+        order = np.lexsort((-lists, values, groups))
+        popped = lists[order]
+
+        # The positions (in pop order) of the coordinates of each list
+        by_list = np.argsort(popped, kind="stable")
+        same = popped[by_list[1:]] == popped[by_list[:-1]]
+
+        # Inserting the first coordinate of each list (in list order)
+        # compares it with the earlier lists' first coordinates that are
+        # popped before it
+        firsts = by_list[np.concatenate([[True], ~same])]
+        group_sizes = np.bincount(groups[order][firsts])
+        compares = len(firsts) + int(np.sum(group_sizes * (group_sizes - 1) // 2)) \
+            - Compute._numInversions(firsts)
+
+        # Inserting the next coordinate q of a list after popping p
+        # compares it with one head for each other list with a coordinate
+        # popped between p and q. That is the number of coordinates
+        # between them, less the pairs of consecutive coordinates of one
+        # list that are nested between them
+        starts = by_list[:-1][same]
+        ends = by_list[1:][same]
+        if len(ends) == 0:
+            return compares
+
+        # Nested pairs start within the longer pair, so they are closer
+        # than its length in the order of their starts
+        compares += int(np.sum(ends - starts)) \
+            - Compute._numInversions(ends[np.argsort(starts)],
+                                     int(np.max(ends - starts)))
+
+        return compares
 
-        All coordinates are negated to work with list.pop() and bisect
+    @staticmethod
+    def _numInversions(values, max_distance=None):
+        """Count the pairs of elements of an array of non-negative integers
+        that are out of order
+
+        If the pairs are known to be less than `max_distance` apart, and
+        that is short enough, each distance is checked directly.
+        Otherwise the pairs are counted bit by bit, from the highest: a
+        pair is out of order if its values first differ in a bit that is
+        set in the earlier element. The elements are kept grouped by the
+        bits above the current one (in their original order within each
+        group), so each bit takes one linear pass that counts, for every
+        element with the bit clear, the earlier elements of its group
+        with the bit set, and then stably partitions each group on the
+        bit. So the cost is O(n log m) for a maximum value m.
         """
-        # If we have a finite next latency, use that
-        if isinstance(next_latency, int):
-            merged = [c for list_ in coords for c in list_]
-            merged.sort()
-            return next_latency * (len(coords) + len(merged)), merged
+        values = np.asarray(values, dtype=np.int64)
+        size = len(values)
+        if size < 2:
+            return 0
+
+        if max_distance is not None and max_distance <= 3 * size.bit_length():
+            return sum(int(np.count_nonzero(values[:-distance] > values[distance:]))
+                       for distance in range(1, min(max_distance, size)))
 
-        # Otherwise, merge incrementally
-        # First get the heads
-        head = []
-        compares = 0
+        positions = np.arange(size)
+        is_start = np.empty(size, dtype=bool)
+        is_start[0] = True
 
-        # First insert all fibers
-        for i, list_ in enumerate(coords):
-            elem = (list_.pop(), i)
-            j = bisect.bisect_right(head, elem)
-            compares += len(head) - j + 1
-            head.insert(j, elem)
+        inversions = 0
+        for bit in range(int(values.max()).bit_length() - 1, -1, -1):
+            prefixes = values >> (bit + 1)
+            is_set = (values >> bit) & 1
 
-        # Now build the result
-        merged = []
-        while head:
-            elem = head.pop()
-            merged.append(elem[0])
-            if len(coords[elem[1]]) == 0:
-                continue
+            # The start of the group of each element
+            np.not_equal(prefixes[1:], prefixes[:-1], out=is_start[1:])
+            group_starts = np.flatnonzero(is_start)
+            groups = np.cumsum(is_start) - 1
+            starts = group_starts[groups]
 
-            new = (coords[elem[1]].pop(), elem[1])
-            j = bisect.bisect_right(head, new)
-            compares += len(head) - j + 1
+            # The number of earlier elements of the group with the bit set
+            set_before = np.cumsum(is_set) - is_set
+            set_before -= set_before[starts]
 
-            head.insert(j, new)
+            is_clear = is_set == 0
+            inversions += int(np.sum(set_before[is_clear]))
 
-        merged.sort()
+            # Stably move the elements with the bit clear to the front of
+            # their group
+            num_clear = np.add.reduceat(is_clear, group_starts)
+            targets = np.where(is_clear,
+                               positions - set_before,
+                               starts + num_clear[groups] + set_before)
 
-        return compares, merged
+            partitioned = np.empty_like(values)
+            partitioned[targets] = values
+            values = partitioned
 
+        return inversions
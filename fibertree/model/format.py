@@ -3,8 +3,19 @@
 """Format
 
 A class for computing the true memory footprint of a tensor
+
+The footprints are computed from tables of the number of fibers and
+elements of each rank, and of the number of elements of each fiber
+(with the range of its children in the next rank), built with one
+traversal of the fibertree. The tables do not depend on the bits of
+the spec, so they are cached on the tensor and shared by all of its
+Formats. The tables are dropped if the root of the tensor is replaced
+or any fiber may have been mutated since they were built (see
+`Fiber._mutation_count`).
 """
 
+import numpy as np
+
 from fibertree import Fiber
 
 class Format:
@@ -142,6 +153,11 @@ class Format:
 
     def getFiber(self, *coords):
         """Get the footprint of a single fiber"""
+        found = self._findFiber(coords)
+        if found is not None:
+            rank, level, i = found
+            return self._getFootprint(rank, 1, int(level[1][i]))
+
         fiber = self._getFiberFromCoords(*coords)
         rank = fiber.getRankAttrs().getId()
 
@@ -149,15 +165,15 @@ class Format:
 
     def getRank(self, rank_id):
         """Get the footprint of a full rank"""
-        i = self.tensor.getRankIds().index(rank_id)
-        rank = self.tensor.ranks[i]
+        num_fibers, num_coords, num_shape = self._getTables()["ranks"][rank_id]
 
-        total = self.spec[rank_id]["rhbits"]
-
-        for fiber in rank.getFibers():
-            total += self._getFiberFootprint(rank_id, fiber)
+        if self.spec[rank_id]["format"] == "C":
+            num_elems = num_coords
+        else:
+            num_elems = num_shape
 
-        return total
+        return self.spec[rank_id]["rhbits"] \
+            + self._getFootprint(rank_id, num_fibers, num_elems)
 
     def getRoot(self):
         """Get the footprint of the root"""
@@ -169,6 +185,11 @@ class Format:
             return self.spec[self.tensor.getRankIds()[-1]]["cbits"] + \
                 self.spec[self.tensor.getRankIds()[-1]]["pbits"]
 
+        found = self._findFiber(coords)
+        if found is not None:
+            _, _, i = found
+            return int(self._getSubTrees()[len(coords)][i])
+
         fibers = [self._getFiberFromCoords(*coords)]
 
         total = 0
@@ -222,6 +243,165 @@ class Format:
         else:
             num_elems = fiber.getShape(all_ranks=False)
 
-        return self.spec[rank]["fhbits"] \
-            + self.spec[rank]["pbits"] * num_elems \
-            + self.spec[rank]["cbits"] * num_elems
+        return self._getFootprint(rank, 1, num_elems)
+
+    def _getFootprint(self, rank, num_fibers, num_elems):
+        """Get the footprint of fibers of a rank with a total number of
+        elements (either ints or arrays)"""
+        return self.spec[rank]["fhbits"] * num_fibers \
+            + (self.spec[rank]["pbits"] + self.spec[rank]["cbits"]) * num_elems
+
+    def _getTables(self):
+        """Get the footprint tables of the tensor
+
+        The tables are cached on the tensor while its root is unchanged
+        and no fiber has been mutated. Each entry is filled when first
+        needed.
+        """
+        tensor = self.tensor
+        root = tensor.getRoot()
+        mutation_count = Fiber._mutation_count
+
+        cached = getattr(tensor, "_footprint_tables", None)
+        if cached is not None \
+           and cached[0] is root \
+           and cached[1] == mutation_count:
+            return cached[2]
+
+        tables = {"ranks": _RankCounts(tensor)}
+        tensor._footprint_tables = (root, mutation_count, tables)
+
+        return tables
+
+    def _getLevels(self):
+        """Get the fiber tables of the tensor for the formats of the spec"""
+        formats = tuple(self.spec[rank]["format"] for rank in self.tensor.getRankIds())
+        tables = self._getTables()
+
+        if formats not in tables:
+            tables[formats] = _buildLevels(self.tensor.getRoot(), formats)
+
+        return tables[formats]
+
+    def _findFiber(self, coords):
+        """Find the rank, level table and index of the fiber at the given
+        coordinates (or None if it is not in the tables)"""
+        levels = self._getLevels()
+        if len(coords) >= len(levels):
+            return None
+
+        level = levels[len(coords)]
+        i = level[0].get(tuple(coords))
+        if i is None:
+            return None
+
+        return self.tensor.getRankIds()[len(coords)], level, i
+
+    def _getSubTrees(self):
+        """Get the footprint of the subtree under every fiber of each rank
+
+        Computed bottom-up: the footprint of a subtree is the footprint
+        of its fiber plus the sum of the footprints of the subtrees of
+        its children, which are a range of the next rank.
+        """
+        levels = self._getLevels()
+        cached = getattr(self, "_subtrees", None)
+        if cached is not None and cached[0] is levels:
+            return cached[1]
+
+        subtrees = []
+        below = None
+        for rank, (_, num_elems, child_starts) in reversed(list(zip(self.tensor.getRankIds(), levels))):
+            total = self._getFootprint(rank, 1, num_elems)
+
+            if below is not None:
+                prefix = np.concatenate(([0], np.cumsum(below)))
+                total = total + prefix[child_starts[1:]] - prefix[child_starts[:-1]]
+
+            subtrees.append(total)
+            below = total
+
+        subtrees.reverse()
+        self._subtrees = (levels, subtrees)
+
+        return subtrees
+
+
+class _RankCounts(dict):
+    """The number of fibers, coordinates and elements of the shape of the
+    fibers of each rank of a tensor, counted when first needed"""
+
+    def __init__(self, tensor):
+
+        super().__init__()
+        self.tensor = tensor
+
+    def __missing__(self, rank_id):
+        i = self.tensor.getRankIds().index(rank_id)
+        fibers = self.tensor.ranks[i].getFibers()
+
+        counts = (len(fibers),
+                  sum(len(fiber) for fiber in fibers),
+                  sum(fiber.getShape(all_ranks=False) for fiber in fibers))
+        self[rank_id] = counts
+
+        return counts
+
+
+def _buildLevels(root, formats):
+    """Build the fiber tables of each rank with one traversal
+
+    The fibers of each rank are visited in order (the children of each
+    fiber of the previous rank in turn), iterating over the shape of
+    uncompressed ranks and the occupancy of compressed ones (as
+    `Format.getSubTree()` does).
+
+    Returns
+    -------
+
+    levels: List[Tuple[dict, np.ndarray, np.ndarray]]
+        For each rank, the index of each fiber by its coordinates, the
+        number of elements of each fiber, and the start of the children
+        of each fiber in the next rank (with the total number of
+        children appended)
+
+    """
+    levels = []
+    fibers = [root]
+    prefixes = [()]
+
+    for depth, format_ in enumerate(formats):
+        is_leaf = depth == len(formats) - 1
+
+        num_elems = np.empty(len(fibers), dtype=np.int64)
+        child_starts = np.empty(len(fibers) + 1, dtype=np.int64)
+        children = []
+        child_prefixes = []
+
+        for i, (fiber, prefix) in enumerate(zip(fibers, prefixes)):
+            child_starts[i] = len(children)
+
+            if format_ == "C":
+                num_elems[i] = len(fiber)
+                iter_ = fiber.iterOccupancy()
+            else:
+                num_elems[i] = fiber.getShape(all_ranks=False)
+                iter_ = fiber.iterShape()
+
+            if is_leaf:
+                continue
+
+            for coord, payload in iter_:
+                if isinstance(payload, Fiber):
+                    children.append(payload)
+                    child_prefixes.append(prefix + (coord,))
+
+        child_starts[-1] = len(children)
+
+        positions = {prefix: i for i, prefix in enumerate(prefixes)}
+        levels.append((positions, num_elems, child_starts))
+
+        fibers = children
+        prefixes = child_prefixes
+
+    return levels
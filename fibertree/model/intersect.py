@@ -3,6 +3,10 @@
 Compute the number of intersection attempts for different intersection styles
 """
 
+import numpy as np
+
+from .trace_reader import readTrace
+
 class Intersector:
     """Superclass for counting intersections"""
 
@@ -37,6 +41,51 @@ class Intersector:
         """
         raise NotImplementedError
 
+    def addTraceArrays(self, *traces):
+        """Count the intersections in whole traces at once
+
+        Unlike `addTraces()`, the traces may hold any number of fibers.
+        Each run of entries with the same fiber (all the coordinates but
+        the last) and increasing coordinates is counted as a separate
+        intersection, exactly as if it were passed to `addTraces()` on
+        its own. The k-th occurrence of a fiber in one trace is
+        intersected with its k-th occurrence in the other trace.
+
+        Parameters
+        ----------
+
+        traces: np.ndarray
+            Two-dimensional integer arrays with a row per entry and the
+            columns of the trace (without the header, see `readTrace()`)
+
+        Returns
+        -------
+
+        None
+
+        Note: Should be implemented by each subclass
+
+        """
+        raise NotImplementedError
+
+    def addTraceFiles(self, *filenames):
+        """Count the intersections in whole trace files at once (see
+        `addTraceArrays()`)
+
+        Parameters
+        ----------
+
+        filenames: str
+            The names of the .csv or .npy trace files
+
+        Returns
+        -------
+
+        None
+
+        """
+        self.addTraceArrays(*(readTrace(fn)[1] for fn in filenames))
+
     def getNumIntersects(self):
         """Get the number of intersection tests performed so far
 
@@ -82,6 +131,25 @@ class LeaderFollowerIntersector(Intersector):
 
         self.num_intersects += new_intersects
 
+    def addTraceArrays(self, *traces):
+        """Count the intersections in whole traces at once
+
+        Parameters
+        ----------
+
+        traces: np.ndarray
+            An array with a row per entry of the trace
+
+        Returns
+        -------
+
+        None
+
+        """
+        assert len(traces) == 1
+
+        self.num_intersects += len(traces[0])
+
 class SkipAheadIntersector(Intersector):
     """Class for counting intersections with a skip-ahead-intersector"""
 
@@ -180,6 +248,36 @@ class SkipAheadIntersector(Intersector):
             if fiber != old_fiber:
                 curr = None
 
+    def addTraceArrays(self, *traces):
+        """Count the intersections in whole traces at once
+
+        Each match is one step, and so is each run of coordinates
+        skipped in one fiber (see `addTraceArrays()` of `Intersector`)
+
+        Parameters
+        ----------
+
+        traces: np.ndarray
+            Arrays with a row per entry of the traces of the two fibers
+
+        Returns
+        -------
+
+        None
+
+        """
+        assert len(traces) == 2
+
+        fibers, sides = _mergeSteps(*traces)
+
+        # A run starts at each skipped coordinate that does not follow a
+        # coordinate skipped in the same fiber of the same operand
+        run_start = np.ones(len(sides), dtype=bool)
+        run_start[1:] = (fibers[1:] != fibers[:-1]) | (sides[1:] != sides[:-1])
+
+        matches = sides == 2
+        self.num_intersects += int(np.sum(matches | run_start))
+
 class TwoFingerIntersector(Intersector):
     """Class for counting intersections with a two-finger-intersector"""
 
@@ -260,3 +358,143 @@ class TwoFingerIntersector(Intersector):
             else:
                 fiber = None
 
+    def addTraceArrays(self, *traces):
+        """Count the intersections in whole traces at once
+
+        Each coordinate compared is one step (see `addTraceArrays()` of
+        `Intersector`)
+
+        Parameters
+        ----------
+
+        traces: np.ndarray
+            Arrays with a row per entry of the traces of the two fibers
+
+        Returns
+        -------
+
+        None
+
+        """
+        assert len(traces) == 2
+
+        fibers, _ = _mergeSteps(*traces)
+        self.num_intersects += len(fibers)
+
+def _mergeSteps(trace0, trace1):
+    """Get the steps of a two-finger merge of each pair of fibers in two
+    traces
+
+    A merge steps through the union of the coordinates of the fibers in
+    order, and stops once either fiber has no more coordinates. So it
+    takes a step for each coordinate up to the smaller of the last
+    coordinates of the two fibers.
+
+    Returns
+    -------
+
+    fibers: np.ndarray
+        The fiber of each step
+
+    sides: np.ndarray
+        For each step, 0 or 1 if only that operand has the coordinate,
+        or 2 if both do (a match)
+
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(trace0) == 0 or len(trace1) == 0:
+        return empty, empty
+
+    num_ranks = (trace0.shape[1] - 1) // 2
+    points = [np.asarray(trace, dtype=np.int64)[:, num_ranks:num_ranks * 2]
+              for trace in (trace0, trace1)]
+
+    # Split each trace into fibers, and number them so the k-th
+    # occurrence of a fiber gets the same id in both traces
+    segments = [_fiberSegments(point) for point in points]
+    keys = np.concatenate([key for _, key in segments])
+    ids = _groupIds(keys)
+
+    num_segments = len(segments[0][1])
+    fibers = [ids[:num_segments][segments[0][0]],
+              ids[num_segments:][segments[1][0]]]
+    coords = [point[:, -1] for point in points]
+
+    # Only the coordinates up to the smaller of the last coordinates of
+    # the two fibers are stepped through
+    num_fibers = ids.max() + 1
+    lasts = []
+    for fiber, coord in zip(fibers, coords):
+        last = np.full(num_fibers, np.iinfo(np.int64).min)
+        np.maximum.at(last, fiber, coord)
+        lasts.append(last)
+
+    limit = np.minimum(*lasts)
+    kept = [coord <= limit[fiber] for fiber, coord in zip(fibers, coords)]
+
+    # Merge the coordinates of both operands and find the matches
+    fiber = np.concatenate([fibers[0][kept[0]], fibers[1][kept[1]]])
+    coord = np.concatenate([coords[0][kept[0]], coords[1][kept[1]]])
+    side = np.repeat([0, 1], [np.sum(kept[0]), np.sum(kept[1])])
+
+    order = np.lexsort((side, coord, fiber))
+    fiber = fiber[order]
+    coord = coord[order]
+    side = side[order]
+
+    match = (fiber[1:] == fiber[:-1]) & (coord[1:] == coord[:-1])
+
+    step = np.ones(len(fiber), dtype=bool)
+    step[1:] = ~match
+    side[:-1][match] = 2
+
+    return fiber[step], side[step]
+
+def _fiberSegments(points):
+    """Split the points of a trace into runs of the same fiber with
+    increasing coordinates
+
+    Returns
+    -------
+
+    segments: np.ndarray
+        The segment of each point
+
+    keys: np.ndarray
+        For each segment, its fiber followed by the number of earlier
+        segments of the same fiber
+
+    """
+    prefix = points[:, :-1]
+    coord = points[:, -1]
+
+    starts = np.ones(len(points), dtype=bool)
+    starts[1:] = np.any(prefix[1:] != prefix[:-1], axis=1) | (coord[1:] <= coord[:-1])
+    segments = np.cumsum(starts) - 1
+
+    prefixes = prefix[starts]
+    ids = _groupIds(prefixes)
+
+    # The occurrence of each segment's fiber
+    order = np.argsort(ids, kind="stable")
+    first = np.searchsorted(ids[order], ids[order], side="left")
+    occurrence = np.empty(len(ids), dtype=np.int64)
+    occurrence[order] = np.arange(len(ids)) - first
+
+    return segments, np.hstack([prefixes, occurrence[:, None]])
+
+def _groupIds(keys):
+    """Number the distinct rows of a two-dimensional array in
+    lexicographic order"""
+    if keys.shape[1] == 0:
+        return np.zeros(len(keys), dtype=np.int64)
+
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+
+    new = np.ones(len(keys), dtype=bool)
+    new[1:] = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    ids = np.empty(len(keys), dtype=np.int64)
+    ids[order] = np.cumsum(new) - 1
+
+    return ids
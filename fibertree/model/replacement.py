@@ -0,0 +1,308 @@
+#cython: language_level=3
+"""Replacement
+
+A module holding the replacement policies of the caches modeled by
+`Traffic.cacheTraffic()`.
+
+A policy tracks the lines of one set of the cache that may be evicted
+(pinned lines are tracked by the cache itself), and chooses the next
+one to evict. Lines are opaque hashable keys. Every access to a line
+comes with the time of the next access to that line (its position in
+the merged trace), which only clairvoyant policies use.
+
+The following policies are provided:
+
+- `OptPolicy` ("opt"): Belady's MIN, evicting the line whose next
+  access is furthest in the future. Lines are held in a heap keyed by
+  the time of their next access, and entries made stale by a later
+  access are discarded lazily when they reach the top of the heap.
+
+- `LruPolicy` ("lru"): evict the least recently used line.
+
+- `FifoPolicy` ("fifo"): evict the line that was filled first.
+
+- `LfuPolicy` ("lfu"): evict the least frequently used line (breaking
+  ties by recency).
+
+- `RandomPolicy` ("random"): evict a line chosen uniformly at random.
+
+"""
+
+import heapq
+import random
+
+from collections import OrderedDict
+
+
+class ReplacementPolicy:
+    """Base class of the replacement policies of a cache set
+
+    Parameters
+    ----------
+
+    seed: Optional[int]
+        The seed of any random choices made by the policy
+
+    """
+
+    #
+    # Whether the policy knows the time of the next access to each line.
+    # A clairvoyant cache evicts lines at their last use and does not
+    # fill lines that would be evicted before they are used again
+    #
+    clairvoyant = False
+
+    def __init__(self, seed=None):
+
+        self.lines = set()
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __contains__(self, line):
+        return line in self.lines
+
+    def insert(self, line, next_use):
+        """Add a line filled into the cache
+
+        Parameters
+        ----------
+
+        line: Hashable
+            The line
+
+        next_use: Optional[int]
+            The time of the next access to the line (None if it is
+            never accessed again)
+
+        """
+        self.lines.add(line)
+
+    def touch(self, line, next_use):
+        """Record a hit on a line
+
+        Parameters
+        ----------
+
+        line: Hashable
+            The line
+
+        next_use: Optional[int]
+            The time of the next access to the line (None if it is
+            never accessed again)
+
+        """
+        pass
+
+    def remove(self, line):
+        """Remove a line that is no longer evictable
+
+        Parameters
+        ----------
+
+        line: Hashable
+            The line
+
+        """
+        self.lines.remove(line)
+
+    def admit(self, next_use):
+        """Check if a new line should be filled into a full set
+
+        Parameters
+        ----------
+
+        next_use: Optional[int]
+            The time of the next access to the new line
+
+        Returns
+        -------
+
+        admit: bool
+            True if the new line should replace a line of the set
+
+        """
+        return True
+
+    def evict(self):
+        """Remove the next line to evict
+
+        Returns
+        -------
+
+        line: Hashable
+            The evicted line
+
+        """
+        raise NotImplementedError
+
+
+class OptPolicy(ReplacementPolicy):
+    """Belady's MIN replacement policy"""
+
+    clairvoyant = True
+
+    def __init__(self, seed=None):
+
+        super().__init__(seed)
+
+        # The time of the next access to each line, and a max-heap of
+        # (-next_use, line), which may hold stale entries
+        self.next_uses = {}
+        self.heap = []
+
+    def __len__(self):
+        return len(self.next_uses)
+
+    def __contains__(self, line):
+        return line in self.next_uses
+
+    def insert(self, line, next_use):
+        self.next_uses[line] = next_use
+        heapq.heappush(self.heap, (-next_use, line))
+
+        # Rebuild the heap if it is mostly stale entries
+        if len(self.heap) > 2 * len(self.next_uses) + 64:
+            self.heap = [(-use, line) for line, use in self.next_uses.items()]
+            heapq.heapify(self.heap)
+
+    def touch(self, line, next_use):
+        self.insert(line, next_use)
+
+    def remove(self, line):
+        del self.next_uses[line]
+
+    def admit(self, next_use):
+        return next_use < self._furthest()
+
+    def evict(self):
+        self._furthest()
+        _, line = heapq.heappop(self.heap)
+        del self.next_uses[line]
+
+        return line
+
+    def _furthest(self):
+        """Drop stale entries from the top of the heap and get the time of
+        the furthest next access"""
+        heap = self.heap
+        while True:
+            use, line = heap[0]
+            if self.next_uses.get(line) == -use:
+                return -use
+
+            heapq.heappop(heap)
+
+
+class LruPolicy(ReplacementPolicy):
+    """Least recently used replacement policy"""
+
+    def __init__(self, seed=None):
+
+        super().__init__(seed)
+        self.lines = OrderedDict()
+
+    def insert(self, line, next_use):
+        self.lines[line] = None
+
+    def touch(self, line, next_use):
+        self.lines.move_to_end(line)
+
+    def remove(self, line):
+        del self.lines[line]
+
+    def evict(self):
+        line, _ = self.lines.popitem(last=False)
+        return line
+
+
+class FifoPolicy(LruPolicy):
+    """First-in first-out replacement policy"""
+
+    def touch(self, line, next_use):
+        pass
+
+
+class LfuPolicy(ReplacementPolicy):
+    """Least frequently used replacement policy"""
+
+    def __init__(self, seed=None):
+
+        super().__init__(seed)
+
+        # The (number of uses, time of last use) of each line, and a
+        # min-heap of (uses, time, line), which may hold stale entries
+        self.lines = {}
+        self.heap = []
+        self.time = 0
+
+    def insert(self, line, next_use):
+        self._push(line, 1)
+
+    def touch(self, line, next_use):
+        self._push(line, self.lines[line][0] + 1)
+
+    def remove(self, line):
+        del self.lines[line]
+
+    def evict(self):
+        heap = self.heap
+        while True:
+            uses, time, line = heapq.heappop(heap)
+            if self.lines.get(line) == (uses, time):
+                del self.lines[line]
+                return line
+
+    def _push(self, line, uses):
+        self.time += 1
+        self.lines[line] = uses, self.time
+        heapq.heappush(self.heap, (uses, self.time, line))
+
+        if len(self.heap) > 2 * len(self.lines) + 64:
+            self.heap = [(uses, time, line)
+                         for line, (uses, time) in self.lines.items()]
+            heapq.heapify(self.heap)
+
+
+class RandomPolicy(ReplacementPolicy):
+    """Random replacement policy"""
+
+    def __init__(self, seed=None):
+
+        super().__init__(seed)
+
+        # The lines in a list (for the random choice) and the position of
+        # each line in the list (for removal)
+        self.lines = {}
+        self.order = []
+        self.rng = random.Random(seed)
+
+    def insert(self, line, next_use):
+        self.lines[line] = len(self.order)
+        self.order.append(line)
+
+    def remove(self, line):
+        # Move the last line into the removed line's position
+        pos = self.lines.pop(line)
+        last = self.order.pop()
+        if last != line:
+            self.order[pos] = last
+            self.lines[last] = pos
+
+    def evict(self):
+        line = self.order[self.rng.randrange(len(self.order))]
+        self.remove(line)
+
+        return line
+
+
+#
+# The replacement policies by name
+#
+policies = {
+    "opt": OptPolicy,
+    "lru": LruPolicy,
+    "fifo": FifoPolicy,
+    "lfu": LfuPolicy,
+    "random": RandomPolicy,
+}
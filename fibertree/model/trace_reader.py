@@ -0,0 +1,261 @@
+#cython: language_level=3
+"""Trace Reader
+
+A module for reading (and writing) the traces consumed by the classes
+in `fibertree.model`.
+
+A trace is either a .csv file written by a `CsvTraceSink` (or by the
+model code itself) or a .npy file written by a `NpyTraceSink` (see
+`fibertree.core.trace_sink`). Either way, it is read as a
+two-dimensional int64 array with a row per entry and a column per
+heading. An "is_write" column (see `Traffic._combineTraces()`) holds
+0 (False) or 1 (True).
+
+A `TraceReader` parses the file in batches of rows, so traces too
+large to hold in memory can be streamed, and `readTrace()` reads a
+whole trace at once.
+
+"""
+
+import os
+import warnings
+
+import numpy as np
+
+from fibertree.core.trace_sink import loadTrace
+
+#
+# The default number of rows of a trace parsed at a time
+#
+_BATCH_SIZE = 65536
+
+
+class TraceReader:
+    """A reader of the entries of a trace file
+
+    Parameters
+    ----------
+
+    filename: str
+        The name of the .csv or .npy file
+
+    batch_size: int, default=65536
+        The number of rows in each batch
+
+    """
+
+    def __init__(self, filename, batch_size=_BATCH_SIZE):
+
+        assert batch_size > 0
+
+        self.filename = filename
+        self.batch_size = batch_size
+        self.is_npy = os.path.splitext(filename)[1] == ".npy"
+
+        if self.is_npy:
+            self.headings = list(loadTrace(filename).dtype.names)
+        else:
+            with open(filename) as f:
+                self.headings = f.readline().rstrip("\n").split(",")
+
+    def __len__(self):
+        """Get the number of entries (excluding the header) in the trace"""
+
+        if self.is_npy:
+            return len(loadTrace(self.filename))
+
+        num_lines = 0
+        last = b"\n"
+        with open(self.filename, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                num_lines += chunk.count(b"\n")
+                last = chunk[-1:]
+
+        # Count a final line with no newline
+        if last != b"\n":
+            num_lines += 1
+
+        return max(num_lines - 1, 0)
+
+    def __iter__(self):
+        """Iterate over the batches of entries of the trace
+
+        Yields
+        ------
+
+        batch: np.ndarray
+            A two-dimensional int64 array with a row per entry and a
+            column per heading
+
+        """
+        if self.is_npy:
+            trace = loadTrace(self.filename)
+            for start in range(0, len(trace), self.batch_size):
+                yield self._fromRecords(trace[start:start + self.batch_size])
+
+            return
+
+        with open(self.filename) as f:
+            f.readline()
+
+            while True:
+                lines = [line for _, line in zip(range(self.batch_size), f)]
+                if not lines:
+                    return
+
+                yield self._parse(lines)
+
+    def column(self, heading):
+        """Get the index of the column with the given heading
+
+        Parameters
+        ----------
+
+        heading: str
+            The heading of the column
+
+        Returns
+        -------
+
+        index: int
+            The index of the column
+
+        """
+        return self.headings.index(heading)
+
+    def read(self):
+        """Read all the entries of the trace
+
+        Returns
+        -------
+
+        trace: np.ndarray
+            A two-dimensional int64 array with a row per entry and a
+            column per heading
+
+        """
+        if self.is_npy:
+            return self._fromRecords(loadTrace(self.filename, mmap_mode=None))
+
+        batches = list(self)
+        if not batches:
+            return np.empty((0, len(self.headings)), dtype=np.int64)
+
+        return np.concatenate(batches)
+
+    def _fromRecords(self, records):
+        """Convert an array of records into a two-dimensional array"""
+
+        return np.array(records).view(np.int64).reshape(len(records), len(self.headings))
+
+    def _parse(self, lines):
+        """Parse lines of a .csv trace"""
+
+        if self.headings[-1] == "is_write":
+            lines = [line.replace("True", "1").replace("False", "0") for line in lines]
+
+        # Blank lines result in a warning
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            batch = np.loadtxt(lines, delimiter=",", dtype=np.int64, ndmin=2)
+
+        return batch.reshape(-1, len(self.headings))
+
+
+def readTrace(filename):
+    """Read a whole trace
+
+    Parameters
+    ----------
+
+    filename: str
+        The name of the .csv or .npy file
+
+    Returns
+    -------
+
+    headings: List[str]
+        The heading of each column
+
+    trace: np.ndarray
+        A two-dimensional int64 array with a row per entry
+
+    """
+    reader = TraceReader(filename)
+    return reader.headings, reader.read()
+
+
+def formatRows(headings, trace):
+    """Format the rows of a trace as .csv lines (without newlines)
+
+    Parameters
+    ----------
+
+    headings: List[str]
+        The heading of each column
+
+    trace: np.ndarray
+        A two-dimensional int64 array with a row per entry
+
+    Returns
+    -------
+
+    lines: List[str]
+        The lines of the trace
+
+    """
+    return _format(headings, trace).splitlines()
+
+
+def _format(headings, trace):
+    """Format the rows of a trace as .csv text with a single % operation"""
+
+    if len(trace) == 0:
+        return ""
+
+    fields = ["%d"] * len(headings)
+    values = trace
+
+    if headings[-1] == "is_write":
+        fields[-1] = "%s"
+        values = trace.astype(object)
+        values[:, -1] = np.where(trace[:, -1] != 0, "True", "False")
+
+    line = ",".join(fields) + "\n"
+    return (line * len(trace)) % tuple(values.ravel().tolist())
+
+
+def writeTrace(filename, headings, trace):
+    """Write a trace, which can be read with a `TraceReader`
+
+    Parameters
+    ----------
+
+    filename: str
+        The name of the .csv or .npy file
+
+    headings: List[str]
+        The heading of each column
+
+    trace: np.ndarray
+        A two-dimensional int64 array with a row per entry
+
+    Returns
+    -------
+
+    None
+
+    """
+    trace = np.asarray(trace, dtype=np.int64).reshape(-1, len(headings))
+
+    if os.path.splitext(filename)[1] == ".npy":
+        records = np.ascontiguousarray(trace).view(
+            [(heading, "<i8") for heading in headings]).reshape(-1)
+        np.save(filename, records)
+        return
+
+    with open(filename, "w") as f:
+        f.write(",".join(headings) + "\n")
+
+        for start in range(0, len(trace), _BATCH_SIZE):
+            f.write(_format(headings, trace[start:start + _BATCH_SIZE]))
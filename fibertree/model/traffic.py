@@ -5,17 +5,23 @@
 A class for computing the memory traffic incurred by a tensor
 """
 
-import functools
 import heapq
 import itertools
-import os
 
 import bisect
-from file_read_backwards import FileReadBackwards
-from sortedcontainers import SortedList
+import numpy as np
 
 from fibertree import Tensor
 
+from .replacement import policies
+from .trace_reader import formatRows, readTrace, writeTrace
+
+#
+# Stack distance beyond which `Traffic._stackDistances()` finds the
+# lines to move in an OPT stack with NumPy instead of a Python loop
+#
+_SHORT_DISTANCE = 64
+
 class Traffic:
     """Class for computing the memory traffic of a tensor"""
 
@@ -36,94 +42,83 @@ class Traffic:
         output_fn: str
             Filename of the output trace
         """
-        def get_data(line):
-            if line:
-                full = line[:-1].split(",")[:-1]
-                return tuple(int(val) for val in full[len(full) // 2:])
+        headings, trace = readTrace(input_fn)
+        fil_headings, fil_trace = readTrace(filter_fn)
 
-            return ()
+        # The data is the coordinates (excluding the position in the fiber)
+        def get_data(headings, trace, width):
+            start = (len(headings) - 1) // 2
+            return trace[:, start:len(headings) - 1][:, :width]
 
-        with open(input_fn, "r") as f_in, open(filter_fn, "r") as f_fil, \
-                open(output_fn, "w") as f_out:
-            f_out.write(f_in.readline())
-            f_fil.readline()
+        data_in = get_data(headings, trace, len(headings))
+        data_fil = get_data(fil_headings, fil_trace, data_in.shape[1])
 
-            line_in = f_in.readline()
-            line_fil = f_fil.readline()
+        keep = Traffic._matchInOrder(data_in, data_fil)
+        writeTrace(output_fn, headings, trace[keep])
 
-            data_in = get_data(line_in)
-            data_fil = get_data(line_fil)[:len(data_in)]
+    @staticmethod
+    def _matchInOrder(data_in, data_fil):
+        """Get a mask of the rows of `data_in` matched by a two-finger
+        merge with the rows of `data_fil`
 
-            while line_in and line_fil:
-                if data_in == data_fil:
-                    f_out.write(line_in)
+        If both are ordered, each row of `data_in` is kept if fewer
+        earlier rows of `data_in` are equal to it than there are rows of
+        `data_fil` equal to it.
+        """
+        if Traffic._isOrdered(data_in) and Traffic._isOrdered(data_fil):
+            if len(data_in) == 0 or len(data_fil) == 0:
+                return np.zeros(len(data_in), dtype=bool)
 
-                    line_in = f_in.readline()
-                    line_fil = f_fil.readline()
+            # Number the distinct rows in order
+            data = np.concatenate([data_in, data_fil])
+            order = np.lexsort(data.T[::-1])
+            sorted_data = data[order]
 
-                    data_in = get_data(line_in)
-                    data_fil = get_data(line_fil)[:len(data_in)]
+            ids = np.empty(len(data), dtype=np.int64)
+            ids[order] = np.cumsum(np.concatenate(
+                [[0], np.any(sorted_data[1:] != sorted_data[:-1], axis=1)]))
+            ids_in = ids[:len(data_in)]
 
-                elif data_in < data_fil:
-                    line_in = f_in.readline()
-                    data_in = get_data(line_in)
+            counts = np.bincount(ids[len(data_in):], minlength=ids.max() + 1)
 
-                else:
-                    line_fil = f_fil.readline()
-                    data_fil = get_data(line_fil)[:len(data_in)]
+            # The number of earlier rows equal to each row
+            first = np.searchsorted(ids_in, ids_in, side="left")
+            return np.arange(len(ids_in)) - first < counts[ids_in]
 
-    @staticmethod
-    def _combineTraces(read_fn=None, write_fn=None, comb_fn=None):
-        """Combine traces into a single trace"""
-        assert comb_fn and (read_fn or write_fn)
+        rows_in = [tuple(row) for row in data_in.tolist()]
+        rows_fil = [tuple(row) for row in data_fil.tolist()]
 
-        def next_line(f):
-            line = f.readline()
-            if line:
-                split = line[:-1].split(",")
-                return tuple(int(val) for val in split[:len(split) // 2]), line
-            else:
-                return (float("inf"),), line
-
-        with open(comb_fn, "w") as f_comb:
-            head = None
-            f_read = None
-            f_write = None
-
-            # Read the first line
-            if read_fn is not None:
-                f_read = open(read_fn, "r")
-                head = f_read.readline()
-                read_line = next_line(f_read)
-            else:
-                read_line = (float("inf"),), ""
+        keep = np.zeros(len(rows_in), dtype=bool)
+        i = 0
+        j = 0
+        while i < len(rows_in) and j < len(rows_fil):
+            if rows_in[i] == rows_fil[j]:
+                keep[i] = True
+                i += 1
+                j += 1
+
+            elif rows_in[i] < rows_fil[j]:
+                i += 1
 
-            if write_fn is not None:
-                f_write = open(write_fn, "r")
-                head = f_write.readline()
-                write_line = next_line(f_write)
             else:
-                write_line = (float("inf"),), ""
+                j += 1
 
-            f_comb.write(head[:-1] + ",is_write\n")
+        return keep
 
-            # While either file has more
-            while read_line[1] or write_line[1]:
-                # If the write stamp is earlier
-                if write_line[0] < read_line[0]:
-                    f_comb.write(write_line[1][:-1] + ",True\n")
-                    write_line = next_line(f_write)
+    @staticmethod
+    def _combineTraces(read_fn=None, write_fn=None, comb_fn=None):
+        """Combine traces into a single trace"""
+        assert comb_fn and (read_fn or write_fn)
 
-                # Otherwise record the write
-                else:
-                    f_comb.write(read_line[1][:-1] + ",False\n")
-                    read_line = next_line(f_read)
+        args = {}
+        if read_fn is not None:
+            args["read"] = readTrace(read_fn)
 
-            if f_read:
-                f_read.close()
+        if write_fn is not None:
+            args["write"] = readTrace(write_fn)
 
-            if f_write:
-                f_write.close()
+        headings, trace = Traffic._combineTraceArrays(**args)
+        writeTrace(comb_fn, headings, trace)
 
     @staticmethod
     def _buildPoint(split, mask, elems_per_line):
@@ -137,43 +132,165 @@ class Traffic:
     @staticmethod
     def _buildNextUseTrace(ranks, elems_per_line, input_fn, output_fn):
         """Build a trace of for each access to a tensor (as specified by its
-        ranks), when the corresponding next use was"""
-        out_split = os.path.splitext(output_fn)
-
-        # Build a mask specifying the locations of the interesting ranks
-        with open(input_fn) as f_in:
-            head_in = f_in.readline()[:-1].split(",")
-            iter_ranks = head_in[(len(head_in) - 2) // 2:-2]
-            mask = [rank in ranks for rank in iter_ranks]
-
-        # With each use, save the next use by iterating backwards
-        last_points = {}
-        with open(output_fn, "w") as f_out, FileReadBackwards(input_fn) as f_in:
-            for line in f_in:
-                # FileReadBackwards already removes the trailing newline
-                split = line.split(",")
-
-                # If we have reached the header, we are done
-                if not split[0].isdigit():
-                    break
+        ranks), when the corresponding next use was
 
-                # Get the tensor point and compute its corresponding line
-                point = Traffic._buildPoint(split, mask, elems_per_line)
+        Note: the output trace is written in reverse order (with the
+        header last)"""
+        head_in, trace = readTrace(input_fn)
+        lines = formatRows(head_in, trace)
 
-                # If there is a last_use
-                line_split = line.split(",")
-                if point in last_points:
-                    last_split = last_points[point].split(",")
-                    new_csv = line + "," + last_points[point]
+        next_uses = Traffic._nextUses(ranks, elems_per_line, head_in, trace)
+
+        with open(output_fn, "w") as f_out:
+            for line, next_use in zip(reversed(lines), reversed(next_uses.tolist())):
+                if next_use >= 0:
+                    new_csv = line + "," + lines[next_use]
                 else:
-                    new_csv = line + "," + ",".join("None" for _ in split)
+                    new_csv = line + "," + ",".join("None" for _ in line.split(","))
 
                 f_out.write(new_csv + "\n")
-                last_points[point] = line
 
             head_out = ",".join(head_in + [val + "_next" for val in head_in])
             f_out.write(head_out + "\n")
 
+    @staticmethod
+    def _combineTraceArrays(read=None, write=None):
+        """Combine the (headings, trace) pairs of a read and a write trace
+        (see `readTrace()`) into a single trace with an "is_write"
+        column
+
+        The accesses are ordered as by `_combineTraces()`: by their
+        iteration stamps, with reads before writes at the same stamp.
+        """
+        assert read is not None or write is not None
+
+        headings = None
+        traces = []
+        for access, is_write in [(read, 0), (write, 1)]:
+            if access is None:
+                traces.append(np.empty((0, 0), dtype=np.int64))
+                continue
+
+            headings, trace = access
+            is_write_col = np.full((len(trace), 1), is_write, dtype=np.int64)
+            traces.append(np.hstack([trace, is_write_col]))
+
+        width = len(headings) + 1
+        read_trace, write_trace = (trace.reshape(-1, width) for trace in traces)
+
+        num_ranks = (len(headings) - 1) // 2
+        order = Traffic._mergeOrder(read_trace[:, :num_ranks],
+                                    write_trace[:, :num_ranks])
+
+        trace = np.concatenate([read_trace, write_trace])[order]
+
+        return headings + ["is_write"], trace
+
+    @staticmethod
+    def _mergeOrder(read_stamps, write_stamps):
+        """Get the order of the accesses of a read and a write trace
+        (concatenated) when they are merged by iteration stamp, as in
+        `_combineTraces()`"""
+        stamps = np.concatenate([read_stamps, write_stamps])
+
+        # If both traces are ordered, the merge is a stable sort
+        if Traffic._isOrdered(read_stamps) and Traffic._isOrdered(write_stamps):
+            return np.lexsort(stamps.T[::-1])
+
+        reads = [tuple(stamp) for stamp in read_stamps.tolist()]
+        writes = [tuple(stamp) for stamp in write_stamps.tolist()]
+
+        order = []
+        i = 0
+        j = 0
+        while i < len(reads) or j < len(writes):
+            if j < len(writes) and (i == len(reads) or writes[j] < reads[i]):
+                order.append(len(reads) + j)
+                j += 1
+            else:
+                order.append(i)
+                i += 1
+
+        return np.array(order, dtype=np.int64)
+
+    @staticmethod
+    def _isOrdered(stamps):
+        """Check if the rows of a two-dimensional array are in
+        lexicographic order"""
+        if len(stamps) < 2:
+            return True
+
+        diff = stamps[1:] - stamps[:-1]
+
+        # The sign of the first non-zero column of each difference
+        first = (diff != 0).argmax(axis=1)
+        return bool(np.all(diff[np.arange(len(diff)), first] >= 0))
+
+    @staticmethod
+    def _nextUses(ranks, elems_per_line, headings, trace):
+        """Find the next use of the tensor line accessed by each access of
+        a (combined) trace
+
+        Each access is mapped to its line (see `_buildPoint()`), the
+        accesses are grouped by line with a (stable) sort, and the next
+        use of each access is the following access in its group.
+
+        Parameters
+        ----------
+
+        ranks: List[str]
+            The ranks of the tensor
+
+        elems_per_line: int
+            The number of elements per line
+
+        headings: List[str]
+            The headings of the trace (see `readTrace()`)
+
+        trace: np.ndarray
+            The trace of accesses (see `readTrace()`)
+
+        Returns
+        -------
+
+        next_uses: np.ndarray
+            The index in the trace of the next use of each access, or -1
+            if there is none
+
+        """
+        points = Traffic._linePoints(ranks, elems_per_line, headings, trace)
+
+        if len(trace) == 0:
+            return np.full(0, -1, dtype=np.int64)
+
+        _, lines = np.unique(points, axis=0, return_inverse=True)
+        return Traffic._nextSame(lines.reshape(-1))
+
+    @staticmethod
+    def _linePoints(ranks, elems_per_line, headings, trace):
+        """Get the point (coord, ... coord, line) of the line accessed by
+        each access of a (combined) trace (see `_buildPoint()`)"""
+        num_ranks = (len(headings) - 2) // 2
+        iter_ranks = headings[num_ranks:-2]
+        cols = [num_ranks + i for i, rank in enumerate(iter_ranks) if rank in ranks]
+
+        points = trace[:, cols]
+        points[:, -1] = trace[:, -2] // elems_per_line * elems_per_line
+
+        return points
+
+    @staticmethod
+    def _nextSame(ids):
+        """Get the index of the next element of an array with the same
+        value as each element, or -1 if there is none"""
+        next_same = np.full(len(ids), -1, dtype=np.int64)
+
+        order = np.argsort(ids, kind="stable")
+        same = ids[order[1:]] == ids[order[:-1]]
+        next_same[order[:-1][same]] = order[1:][same]
+
+        return next_same
+
     @staticmethod
     def buffetTraffic(bindings, formats, trace_fns, capacity, line_sz,
             loop_ranks=None):
@@ -343,11 +460,17 @@ class Traffic:
             evict_elem(key, line_sz, obj, objs, occupancy, sim_info, traffic) ->
                 objs, occupancy, sim_info, traffic
 
+        The `trace` passed to the hooks is the access, followed by its next
+        use (or Nones), followed by the time of the next use in the merged
+        trace of all bindings (or None, see `_accessTimes()`). Dirty lines
+        still buffered at the end of the trace are written back.
+
         Note: assumes all fibers start at line boundaries and all elements
         reside on exactly one line (if the footprint is not a multiple of the
         line size, every line is padded)
         """
         # Get the loop ranks of each tensor
+        order = []
         if loop_ranks is None:
             loop_ranks = {}
 
@@ -360,8 +483,8 @@ class Traffic:
                     new_rank = loop_ranks[rank]
                 loop_rank_ids[tensor].append(new_rank)
 
-        # First combine read and write traces
-        read_write_traces = {}
+        # Combine the read and write traces and find the next uses
+        traces = {}
         traffic = {}
         for (tensor, rank, type_, access), fn in trace_fns.items():
             # Initialize the traffic array
@@ -371,48 +494,32 @@ class Traffic:
 
             # Make sure we have not combined the accesses yet
             key = tensor, rank, type_
-            if key in read_write_traces:
+            if key in traces:
                 continue
 
             # Combine
-            split_fn = os.path.splitext(fn)
-            comb_fn = split_fn[0] + "-comb-" + "-".join(key) + split_fn[1]
-            args = {access + "_fn": fn, "comb_fn": comb_fn}
+            args = {access: readTrace(fn)}
 
             other_access = "read" if access == "write" else "write"
             if key + (other_access,) in trace_fns:
-                args[other_access + "_fn"] = trace_fns[key + (other_access,)]
-
-            Traffic._combineTraces(**args)
-            read_write_traces[key] = comb_fn
+                args[other_access] = readTrace(trace_fns[key + (other_access,)])
 
+            headings, trace = Traffic._combineTraceArrays(**args)
 
-        # Build traces with the next use
-        next_use_traces = {}
-        for key, fn in read_write_traces.items():
-            tensor, rank, type_ = key
             elems_per_line = line_sz // formats[tensor].getElem(rank, type_)
             assert elems_per_line > 0
 
-            split_fn = os.path.splitext(fn)
-            next_fn = split_fn[0] + "-next-" + "-".join(key) + split_fn[1]
+            next_uses = Traffic._nextUses(loop_rank_ids[tensor],
+                                          elems_per_line, headings, trace)
 
-            Traffic._buildNextUseTrace(loop_rank_ids[tensor], elems_per_line, fn, next_fn)
-            next_use_traces[key] = next_fn
+            # The trace, next uses, and position of the next access (the
+            # access times are added once the bindings are ordered)
+            traces[key] = [trace, next_uses, 0]
 
-        # Open all the traces
-        traces = {}
-        for key, fn in next_use_traces.items():
-            traces[key] = FileReadBackwards(fn)
-
-        # Get the loop order and pop off the headers
-        order = []
-        for file_ in traces.values():
-            line = file_.readline()[:-1].split(",")
-
-            start = (len(line) - 4) // 4
+            # Get the loop order
+            start = (len(headings) - 2) // 2
             if start > len(order):
-                order = line[start:(start * 2)]
+                order = headings[start:(start * 2)]
 
         # Fill the loop ranks
         for rank in order:
@@ -455,6 +562,12 @@ class Traffic:
         for info in bind_info:
             all_num_ranks.append(order.index(loop_ranks[info[1]]) + 1)
 
+        # Number the accesses of all the bindings in the order they occur,
+        # so the next use of each access has an integer time
+        times = Traffic._accessTimes(bind_info, traces, order)
+        for info, info_times in zip(bind_info, times):
+            traces[info[:3]].append(info_times)
+
         sim_info = pre_sim_hook(bind_info)
 
         # Order the traces in the order they occur
@@ -551,59 +664,87 @@ class Traffic:
             j = bisect.bisect_left(next_keys, next_key)
             next_keys.insert(j, next_key)
 
-        # Close all files
-        for file_ in traces.values():
-            file_.close()
+        # Write back any lines that are still dirty at the end of the trace
+        for tensor in objs:
+            for type_ in objs[tensor]:
+                for write_back, _ in objs[tensor][type_].values():
+                    if write_back:
+                        traffic[tensor]["write"] += line_sz
+
+        return traffic, overflows
+
+    @staticmethod
+    def _accessTimes(bind_info, traces, order):
+        """Get the time (position in the merged trace) of each access of
+        the traces of the given bindings
 
-        # Remove all of the newly created files
-        for fn in read_write_traces.values():
-            os.remove(fn)
+        The accesses are ordered as they are simulated by
+        `_bufferTraffic()`: by the iteration stamp padded with -1s, then
+        the position of the binding, then the position in its trace.
+        """
+        keys = []
+        for i, info in enumerate(bind_info):
+            trace = traces[info[:3]][0]
+            num_ranks = (trace.shape[1] - 2) // 2 if len(trace) else 0
 
-        for fn in next_use_traces.values():
-            os.remove(fn)
+            key = np.full((len(trace), len(order) + 2), -1, dtype=np.int64)
+            key[:, :num_ranks] = trace[:, :num_ranks]
+            key[:, -2] = i
+            key[:, -1] = np.arange(len(trace))
+            keys.append(key)
 
-        return traffic, overflows
+        all_keys = np.concatenate(keys)
+        times = np.empty(len(all_keys), dtype=np.int64)
+        times[np.lexsort(all_keys.T[::-1])] = np.arange(len(all_keys))
+
+        bounds = np.cumsum([len(key) for key in keys])[:-1]
+        return np.split(times, bounds)
 
     @staticmethod
     def _extractNext(i, info, traces, order):
         """Get the next stamps for the given binding info"""
         # Get the trace
-        line = traces[info[:3]].readline()
+        cursor = traces[info[:3]]
+        trace, next_uses, pos, times = cursor
 
-        # If there are no more lines, push this trace to the end
-        if len(line) == 0:
+        # If there are no more accesses, push this trace to the end
+        if pos == len(trace):
             return (float("inf"),) * len(order) + (i,), []
 
-        split = line[:-1].split(",")
-        trace = []
-        for val in split:
-            if val.isdigit():
-                trace.append(int(val))
-            elif val[0] == "N":
-                trace.append(None)
-            elif val[0] == "T":
-                trace.append(True)
-            elif val[0] == "F":
-                trace.append(False)
-            else:
-                # Should never reach here
-                raise ValueError("Unknown value: " + val)
+        cursor[2] += 1
 
+        # The access followed by its next use (or Nones)
+        access = Traffic._traceAccess(trace, pos)
+        next_use = int(next_uses[pos])
+        if next_use >= 0:
+            access += Traffic._traceAccess(trace, next_use)
+        else:
+            access += [None] * len(access)
 
         # Get the key that will be used to sort this trace
         # It is the iteration stamp padded with -1s and then the position of
         # the access type in the list of bindings
-        num_ranks = len(trace) - 2
+        num_ranks = len(access) - 2
         key = [-1] * len(order) + [i]
-        key[:num_ranks // 4] = trace[:num_ranks // 4]
+        key[:num_ranks // 4] = access[:num_ranks // 4]
         key = tuple(key)
 
-        return key, trace
+        # Finally, the time of the next use (see `_accessTimes()`)
+        access.append(int(times[next_use]) if next_use >= 0 else None)
+
+        return key, access
+
+    @staticmethod
+    def _traceAccess(trace, pos):
+        """Get an access of a (combined) trace as a list"""
+        access = trace[pos].tolist()
+        access[-1] = bool(access[-1])
+        return access
 
     @staticmethod
     def cacheTraffic(bindings, formats, trace_fns, capacity, line_sz,
-            loop_ranks=None):
-        """Compute the traffic loading data into this buffet
+            loop_ranks=None, policy="opt", ways=None, seed=None):
+        """Compute the traffic loading data into this cache
 
         Parameters
         ----------
@@ -621,7 +762,7 @@ class Traffic:
             "read" or "write"
 
         capacity: int
-            The number of bits that fit in the buffet
+            The number of bits that fit in the cache
 
         line_sz: int
             The number of bits across which spatial locality is exploited
@@ -631,29 +772,36 @@ class Traffic:
             A map from the original rank to the rank it corresponds to in
             the loop order
 
-        Note: assumes all fibers start at line boundaries and all elements
-        reside on exactly one line (if the footprint is not a multiple of the
-        line size, every line is padded)
-        """
-        @functools.total_ordering
-        class ListElem:
-            def __init__(self, bind_pos, next_access, obj):
-                self.next_access = next_access
-                self.obj = obj
-                self.pos = bind_pos
+        policy: Union[str, type], default="opt"
+            The replacement policy: one of "opt", "lru", "fifo", "lfu", or
+            "random" (see `fibertree.model.replacement`), or a subclass of
+            `ReplacementPolicy`
+
+        ways: Optional[int]
+            The number of lines in each set of a set-associative cache
+            (None for a fully associative cache)
 
-            def __eq__(self, other):
-                return self.next_access == other.next_access and self.pos == other.pos
+        seed: Optional[int]
+            The seed of the random choices of the replacement policy
 
-            def __lt__(self, other):
-                if self.next_access != other.next_access:
-                    return self.next_access < other.next_access
+        Note: with the "opt" policy, lines are evicted at their last use
+        and are not filled if they would be evicted before their next
+        use. Lines are mapped to sets by hashing their point. Assumes all
+        fibers start at line boundaries and all elements reside on exactly
+        one line (if the footprint is not a multiple of the line size,
+        every line is padded)
+        """
+        if isinstance(policy, str):
+            policy = policies[policy]
 
-                # Fall back on the position if the next access is at the same point
-                return self.pos < other.pos
+        num_lines = capacity // line_sz
+        if ways is None:
+            num_sets = 1
+        else:
+            assert ways > 0 and num_lines % ways == 0
+            num_sets = max(num_lines // ways, 1)
 
-            def __repr__(self):
-                return str((self.next_access, self.obj, self.pos))
+        set_sz = num_lines // num_sets
 
         def extract_binding(binding):
             return binding["tensor"], binding["rank"], binding["type"]
@@ -662,7 +810,9 @@ class Traffic:
             return info + ("write",) in trace_fns
 
         def pre_sim_hook(bind_info):
-            next_evict = SortedList()
+            # The replacement policy and number of lines of each set
+            sets = [policy(seed) for _ in range(num_sets)]
+            fill = [0] * num_sets
 
             pinned = {}
             for tensor, _, type_ in bind_info:
@@ -672,134 +822,446 @@ class Traffic:
                 if type_ not in pinned[tensor]:
                     pinned[tensor][type_] = set()
 
-            return next_evict, pinned, None
+            return sets, fill, pinned, None
 
         def to_be_buffered(bind_info, bind_pos, capacity, loop_ranks,
                 num_ranks, obj, objs, occupancy, order, shapes, sim_info, trace):
-            next_evict, pinned, _ = sim_info
-            next_access = trace[num_ranks * 2 + 2:num_ranks * 3 + 2]
+            sets, fill, pinned, _ = sim_info
             tensor, _, type_ = bind_info[bind_pos]
 
-            # Do not buffer if never used again
-            if trace[num_ranks * 2 + 2] is None:
-                if obj in objs[tensor][type_]:
-                    if next_evict and next_evict[0].obj == obj:
-                        list_elem = next_evict.pop(0)
-                    else:
-                        assert obj in pinned[tensor][type_]
-                        list_elem = objs[tensor][type_][obj][1]
+            line = bind_pos, obj
+            set_ = hash(line) % num_sets if num_sets > 1 else 0
+            lines = sets[set_]
+            next_use = trace[-1]
 
-                    list_elem.next_access = [float("inf")]
+            sim_info = sets, fill, pinned, (line, set_, next_use)
 
-                else:
-                    list_elem = None
+            # If this element is in the cache
+            if obj in objs[tensor][type_]:
+                is_pinned = obj in pinned[tensor][type_]
 
-                sim_info = next_evict, pinned, list_elem
-                return False, sim_info
+                # Evict a clairvoyant cache's line at its last use
+                if next_use is None and lines.clairvoyant:
+                    return False, sim_info
 
-            # If this element is in the cache, but not pinned
-            if next_evict and next_evict[0].obj == obj \
-                    and next_evict[0].pos == bind_pos:
-                list_elem = next_evict.pop(0)
-                list_elem.next_access = next_access
+                if not is_pinned:
+                    lines.touch(line, next_use)
 
-                next_evict.add(list_elem)
-                sim_info = next_evict, pinned, list_elem
+                # Otherwise, unpin the element at its last use
+                elif next_use is None:
+                    pinned[tensor][type_].remove(obj)
+                    lines.insert(line, next_use)
 
                 return True, sim_info
 
-            # If the element is pinned
-            elif obj in pinned[tensor][type_]:
-                list_elem = objs[tensor][type_][obj][1]
-                list_elem.next_access = next_access
+            # Do not buffer a clairvoyant cache's line if never used again
+            if next_use is None and lines.clairvoyant:
+                return False, sim_info
 
-                sim_info = next_evict, pinned, list_elem
+            # Definitely buffer if there is space in the set
+            if fill[set_] < set_sz:
                 return True, sim_info
 
-            assert obj not in objs[tensor][type_]
-
-            list_elem = ListElem(bind_pos, next_access, obj)
-            sim_info = next_evict, pinned, list_elem
-            # Definitely buffer if there is space in the buffer
-            if occupancy + line_sz <= capacity:
-                to_buffer = True
-
             # Definitely buffer if this is a pinned element
-            elif shapes[bind_pos] is not None and trace[num_ranks * 2] >= shapes[bind_pos]:
-                to_buffer = True
-
-            # Do not buffer if we are full of pinned elements
-            elif not next_evict:
-                to_buffer = False
+            if shapes[bind_pos] is not None and trace[num_ranks * 2] >= shapes[bind_pos]:
+                return True, sim_info
 
-            # Otherwise, make sure the next thing to evict is not the element
-            # we would have buffered
-            else:
-                to_buffer = list_elem <= next_evict[-1]
+            # Do not buffer if the set is full of pinned elements
+            if not lines:
+                return False, sim_info
 
-            return to_buffer, sim_info
+            # Otherwise, let the policy decide
+            return lines.admit(next_use), sim_info
 
         def add_elem(bind_info, bind_pos, capacity, line_sz, num_ranks, obj, objs,
                 occupancy, overflows, shapes, sim_info, trace, traffic):
+            sets, fill, pinned, (line, set_, next_use) = sim_info
+            lines = sets[set_]
 
-            next_evict, pinned, list_elem = sim_info
             # Evict if necessary to make space
-            while occupancy + line_sz > capacity:
-                if next_evict:
-                    evict_elem = next_evict.pop(-1)
+            while fill[set_] >= set_sz:
+                if lines:
+                    evict_pos, evict_obj = lines.evict()
 
                     # If the line has been mutated and it needs to be saved, write it first
-                    evict_tensor, _, evict_type = bind_info[evict_elem.pos]
-                    if objs[evict_tensor][evict_type][evict_elem.obj][0]:
+                    evict_tensor, _, evict_type = bind_info[evict_pos]
+                    if objs[evict_tensor][evict_type][evict_obj][0]:
                         traffic[evict_tensor]["write"] += line_sz
 
-                    # Evict and drain the element
-                    del objs[evict_tensor][evict_type][evict_elem.obj]
+                    del objs[evict_tensor][evict_type][evict_obj]
 
+                    fill[set_] -= 1
                     occupancy -= line_sz
 
-                # The pinned data has filled the cache
+                # The pinned data has filled the set
                 else:
                     overflows += 1
                     break
 
-            # If this element is not pinned, add it to the heap
+            # If this element is not pinned, hand it to the policy
             tensor, _, type_ = bind_info[bind_pos]
             if shapes[bind_pos] is None or trace[num_ranks * 2] < shapes[bind_pos]:
-                next_evict.add(list_elem)
+                lines.insert(line, next_use)
 
             # Otherwise pin the element
             else:
                 pinned[tensor][type_].add(obj)
 
-            objs[tensor][type_][obj] = [False, list_elem]
+            objs[tensor][type_][obj] = [False, set_]
+            fill[set_] += 1
             occupancy += line_sz
 
-            sim_info = next_evict, pinned, None
+            sim_info = sets, fill, pinned, None
             return objs, occupancy, overflows, sim_info, traffic
 
         def evict_elem(key, line_sz, obj, objs, occupancy, sim_info, traffic):
-            next_evict, pinned, list_elem = sim_info
+            sets, fill, pinned, (line, set_, _) = sim_info
             tensor, _, type_ = key
 
-            # Ensure that there has been no error
-            assert list_elem.next_access == [float("inf")]
-
             # If the line has been mutated and it needs to be saved, write it first
-            if objs[tensor][type_][list_elem.obj][0]:
+            if objs[tensor][type_][obj][0]:
                 traffic[tensor]["write"] += line_sz
 
-            # Remove the object from objs and pinned if it is there
+            # Remove the object from objs and either pinned or its set
             del objs[tensor][type_][obj]
             if obj in pinned[tensor][type_]:
                 pinned[tensor][type_].remove(obj)
+            else:
+                sets[set_].remove(line)
 
+            fill[set_] -= 1
             occupancy -= line_sz
 
-            sim_info = next_evict, pinned, None
-
+            sim_info = sets, fill, pinned, None
             return objs, occupancy, sim_info, traffic
 
         return Traffic._bufferTraffic(bindings, formats, trace_fns, capacity,
             line_sz, loop_ranks, extract_binding, pin_intermediate_writes,
             pre_sim_hook, to_be_buffered, add_elem, evict_elem)
+
+    @staticmethod
+    def trafficCurves(bindings, formats, trace_fns, capacities, line_sz,
+            policy="opt", loop_ranks=None):
+        """Compute the traffic of a cache for a list of capacities in a
+        single pass
+
+        The cache is modeled as a fully associative cache of lines
+        shared by all the bindings, with OPT (Belady's MIN) or LRU
+        replacement. A line is filled on a read miss (a write miss does
+        not read the line), and is written back if it is dirty when it
+        is evicted (or at the end of the trace).
+
+        With `policy="lru"`, the traffic at each capacity is the traffic
+        of `cacheTraffic(..., policy="lru")` at that capacity. With
+        `policy="opt"`, every missed line is filled (lines never bypass
+        the cache), so the curve only approximates `cacheTraffic(...,
+        policy="opt")`, which may bypass a line that would be evicted
+        before its next use. The two agree once the capacity fits the
+        footprint, and, if no binding is written, the curve is an upper
+        bound of `cacheTraffic(..., policy="opt")` at every capacity.
+
+        Intermediate writes (accesses past the shape of a written rank,
+        e.g., when populating inserts into a compressed fiber) are pinned
+        in the cache by `cacheTraffic()`, which changes the capacity left
+        for the other lines over time. They cannot be modeled with stack
+        distances and are rejected.
+
+        Since both policies are stack algorithms, the stack distance of
+        each access is computed once with Mattson's algorithm, and an
+        access hits in a cache of any capacity if and only if its stack
+        distance is at most the number of lines in the cache.
+
+        Parameters
+        ----------
+
+        bindings: List[dict]
+            A list of the binding information (see `cacheTraffic()`)
+
+        formats: Dict[str, Format]
+            A dictionary from tensor names to their corresponding format objects
+
+        trace_fns: Dict[Tuple[str, str, str, str], str]]]
+            A nested dictionary of traces of the form
+            {(tensor, rank, type, access): trace_fn}}}
+            where type is one of "elem", "coord", or "payload" and access is
+            "read" or "write"
+
+        capacities: List[int]
+            The numbers of bits that fit in the cache
+
+        line_sz: int
+            The number of bits across which spatial locality is exploited
+            (e.g., buffer line size)
+
+        policy: str, default="opt"
+            The replacement policy: "opt" or "lru"
+
+        loop_ranks: Optional[Dict[str, str]]
+            A map from the original rank to the rank it corresponds to in
+            the loop order
+
+        Returns
+        -------
+
+        curves: Dict[str, Dict[str, List[int]]]
+            The traffic (in bits) of each tensor and access ("read" or
+            "write") for each capacity
+
+        Note: there is no curve for buffets (see `buffetTraffic()`), whose
+        traffic depends on the shape of the tiles. Assumes all fibers start
+        at line boundaries and all elements reside on exactly one line (if
+        the footprint is not a multiple of the line size, every line is
+        padded)
+        """
+        assert policy in ["opt", "lru"]
+
+        if loop_ranks is None:
+            loop_ranks = {}
+
+        loop_rank_ids = {}
+        for tensor in formats:
+            loop_rank_ids[tensor] = [loop_ranks.get(rank, rank)
+                                     for rank in formats[tensor].tensor.getRankIds()]
+
+        curves = {}
+        for tensor, _, _, access in trace_fns:
+            if tensor not in curves:
+                curves[tensor] = {}
+            curves[tensor][access] = [0] * len(capacities)
+
+        tensors = list(curves)
+
+        # Get the line of each access, and the key used to order it
+        line_ids = {}
+        keys = []
+        all_lines = []
+        all_writes = []
+        all_tensors = []
+        for i, binding in enumerate(bindings):
+            tensor, rank, type_ = binding["tensor"], binding["rank"], binding["type"]
+            key = tensor, rank, type_
+
+            args = {}
+            for access in ["read", "write"]:
+                if key + (access,) in trace_fns:
+                    args[access] = readTrace(trace_fns[key + (access,)])
+
+            headings, trace = Traffic._combineTraceArrays(**args)
+            if len(trace) == 0:
+                continue
+
+            elems_per_line = line_sz // formats[tensor].getElem(rank, type_)
+            assert elems_per_line > 0
+
+            points = Traffic._linePoints(loop_rank_ids[tensor], elems_per_line,
+                                         headings, trace)
+            points, lines = np.unique(points, axis=0, return_inverse=True)
+
+            ids = np.array([line_ids.setdefault((tensor, type_) + tuple(point), len(line_ids))
+                            for point in points.tolist()], dtype=np.int64)
+
+            # Accesses past the shape of a written rank are intermediate
+            # writes, which `cacheTraffic()` pins in the cache
+            if "write" in args:
+                shape = formats[tensor].tensor.getShape(authoritative=True)
+                assert shape is not None
+                rank_shape = shape[formats[tensor].tensor.getRankIds().index(rank)]
+                assert (trace[:, -2] < rank_shape).all(), \
+                    "Intermediate writes to %s.%s cannot be modeled, use cacheTraffic()" \
+                    % (tensor, rank)
+
+            num_ranks = (len(headings) - 2) // 2
+            keys.append((trace[:, :num_ranks], i))
+            all_lines.append(ids[lines.reshape(-1)])
+            all_writes.append(trace[:, -1] == 1)
+            all_tensors.append(np.full(len(trace), tensors.index(tensor)))
+
+        if not keys:
+            return curves
+
+        # Order the accesses as `_bufferTraffic()` does: by the iteration
+        # stamp padded with -1s and then the position of the binding
+        depth = max(stamps.shape[1] for stamps, _ in keys)
+        order = []
+        for stamps, i in keys:
+            key = np.full((len(stamps), depth + 1), -1, dtype=np.int64)
+            key[:, :stamps.shape[1]] = stamps
+            key[:, -1] = i
+            order.append(key)
+
+        order = np.lexsort(np.concatenate(order).T[::-1])
+
+        lines = np.concatenate(all_lines)[order]
+        writes = np.concatenate(all_writes)[order]
+        tensor_ids = np.concatenate(all_tensors)[order]
+
+        max_depth = max(capacities) // line_sz
+        distances = Traffic._stackDistances(lines, policy, max_depth)
+
+        # A line is resident from a miss until the next miss on that line,
+        # and is written back if it was written while resident
+        by_line = np.argsort(lines, kind="stable")
+        line_writes = writes[by_line]
+        line_tensors = tensor_ids[by_line]
+
+        for c, capacity in enumerate(capacities):
+            misses = distances > capacity // line_sz
+
+            reads = np.bincount(tensor_ids[misses & ~writes], minlength=len(tensors))
+
+            line_misses = misses[by_line]
+            segments = np.cumsum(line_misses) - 1
+            dirty = np.zeros(segments[-1] + 1, dtype=bool)
+            dirty[segments[line_writes]] = True
+            evictions = np.bincount(line_tensors[line_misses][dirty],
+                                    minlength=len(tensors))
+
+            for t, tensor in enumerate(tensors):
+                if "read" in curves[tensor]:
+                    curves[tensor]["read"][c] = int(reads[t]) * line_sz
+                if "write" in curves[tensor]:
+                    curves[tensor]["write"][c] = int(evictions[t]) * line_sz
+
+        return curves
+
+    @staticmethod
+    def _stackDistances(lines, policy, max_depth):
+        """Compute the stack distance of each access to a sequence of lines
+
+        An access hits in a cache of `n` lines if and only if its stack
+        distance is at most `n`. The first access to a line and any
+        access with a stack distance greater than `max_depth` gets the
+        stack distance `max_depth + 1`.
+
+        Parameters
+        ----------
+
+        lines: np.ndarray
+            The line accessed by each access
+
+        policy: str
+            The replacement policy: "opt" or "lru"
+
+        max_depth: int
+            The largest stack distance of interest
+
+        Returns
+        -------
+
+        distances: np.ndarray
+            The stack distance of each access
+
+        """
+        distances = np.full(len(lines), max_depth + 1, dtype=np.int64)
+
+        if policy == "lru":
+            # The stack distance is the number of distinct lines accessed
+            # since the previous access to the line (plus one). Count them
+            # with a Fenwick tree marking the last access to each line
+            tree = [0] * (len(lines) + 1)
+
+            def update(pos, inc):
+                pos += 1
+                while pos < len(tree):
+                    tree[pos] += inc
+                    pos += pos & -pos
+
+            def prefix(pos):
+                total = 0
+                while pos > 0:
+                    total += tree[pos]
+                    pos -= pos & -pos
+                return total
+
+            last = {}
+            for t, line in enumerate(lines.tolist()):
+                prev = last.get(line)
+                if prev is not None:
+                    distance = prefix(t) - prefix(prev + 1) + 1
+                    if distance <= max_depth:
+                        distances[t] = distance
+
+                    update(prev, -1)
+
+                update(t, 1)
+                last[line] = t
+
+            return distances
+
+        # OPT: Mattson's stack algorithm with the time of the next access
+        # as the priority (a line that is never accessed again has the
+        # lowest priority). The stack is truncated at `max_depth`, which
+        # does not change the top `max_depth` entries
+        never = len(lines)
+        next_uses = Traffic._nextSame(lines)
+        next_uses[next_uses < 0] = never
+
+        stack = []
+        priority = []
+        where = {}
+
+        # A copy of the priorities searched with NumPy for long distances
+        deep_priority = np.empty(max_depth, dtype=np.int64)
+
+        for t, (line, next_use) in enumerate(zip(lines.tolist(), next_uses.tolist())):
+            pos = where.get(line)
+            if pos is None:
+                pos = len(stack)
+            else:
+                distances[t] = pos + 1
+
+            if pos == 0:
+                if stack:
+                    priority[0] = next_use
+                    deep_priority[0] = next_use
+                elif max_depth > 0:
+                    stack.append(line)
+                    priority.append(next_use)
+                    deep_priority[0] = next_use
+                    where[line] = 0
+                continue
+
+            # Moving the line to the top pushes the others down, keeping
+            # the higher priority line at each position. Only the lines at
+            # which the running maximum of the priorities above `pos`
+            # increases move (each to the position of the next one)
+            if pos <= _SHORT_DISTANCE:
+                moves = []
+                running = priority[0]
+                for i in range(1, pos):
+                    if priority[i] > running:
+                        moves.append(i)
+                        running = priority[i]
+            else:
+                above = deep_priority[:pos]
+                running = np.maximum.accumulate(above)
+                moves = (np.flatnonzero(above[1:] > running[:-1]) + 1).tolist()
+
+            carry, carry_priority = stack[0], priority[0]
+            for i in moves:
+                stack[i], carry = carry, stack[i]
+                priority[i], carry_priority = carry_priority, priority[i]
+                deep_priority[i] = priority[i]
+                where[stack[i]] = i
+
+            stack[0] = line
+            priority[0] = next_use
+            deep_priority[0] = next_use
+            where[line] = 0
+
+            # The last line pushed down takes the place of the accessed
+            # line, or falls off the truncated stack
+            if pos < len(stack):
+                stack[pos] = carry
+            elif len(stack) < max_depth:
+                stack.append(carry)
+                priority.append(carry_priority)
+            else:
+                del where[carry]
+                continue
+
+            priority[pos] = carry_priority
+            deep_priority[pos] = carry_priority
+            where[carry] = pos
+
+        return distances
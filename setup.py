@@ -1,15 +1,12 @@
 from setuptools import setup, find_packages
 from setuptools.extension import Extension
-#from Cython.Build import cythonize
 import os
 
 try:
     from Cython.Build import cythonize
+    have_cython = True
 except ImportError:
-    # create closure for deferred import
-    def cythonize (*args, ** kwargs ):
-        from Cython.Build import cythonize
-        return cythonize(*args, ** kwargs)
+    have_cython = False
 
 def readme():
       with open('README.md') as f:
@@ -18,51 +15,27 @@ def readme():
 with open("requirements.txt", "r") as fh:
    requirements = fh.readlines()
 
-fibertree_sources = ['fibertree/__init__.py']
-fibertree_core = []
-#fibertree_core_src = []
-fibertree_core_pkg = []
-fibertree_model = []
-fibertree_model_pkg = []
+#
+# The inner loops of the hot paths of `fibertree.core` (see
+# fibertree/core/kernels.py and fibertree/core/payload.py) are written
+# so they can optionally be compiled with Cython. If Cython is not
+# available, the build of an extension fails or FIBERTREE_CYTHON=0 is
+# set in the environment, the pure Python modules are used instead.
+#
+compiled_modules = ['fibertree.core.kernels',
+                    'fibertree.core.payload']
 
 extensions = []
 
-# False=Python, True=Cython
-if False:
-    for py_core_f in os.listdir("./fibertree/core"):
-          if py_core_f.endswith(".py"):
-                print("    Processing: ", py_core_f)
-                fibertree_core.append('fibertree/core/'+py_core_f)
+if have_cython and os.environ.get("FIBERTREE_CYTHON", "1") != "0":
+    for module in compiled_modules:
+        print("    Processing: ", module)
+        extensions.append(Extension(module,
+                                    sources=[module.replace('.', '/')+'.py'],
+                                    optional=True))
 
-                py_core = os.path.splitext(py_core_f)[0]
-                fibertree_core_pkg.append('fibertree.core.'+py_core)
-
-                extensions.append(Extension('fibertree.core.'+py_core,
-                                            sources=['fibertree/core/'+py_core_f]
-                                           )
-                                 )
-
-    for py_model_f in os.listdir("./fibertree/model"):
-          if py_model_f.endswith(".py"):
-                print("    Processing: ", py_model_f)
-                fibertree_model.append('fibertree/model/'+py_model_f)
-
-                py_model = os.path.splitext(py_model_f)[0]
-                fibertree_model_pkg.append('fibertree.model.'+py_model)
-
-                extensions.append(Extension('fibertree.model.'+py_model,
-                                            sources=['fibertree/model/'+py_model_f]
-                                           )
-                                 )
-
-#extensions=[#Extension('fibertree', sources=fibertree_sources),
-#            Extension('fibertree.core', sources=fibertree_core)
-#           ]
-#            Extension('fibertree.graphics',fibertree_graphics),
-#            Extension('fibertree.notebook',fibertree_notebook),
-#            Extension('fibertree.codec', fibertree_codec),
-#            Extension('fibertree.codec.formats', fibertree_formats)
-#           ]
+    extensions = cythonize(extensions,
+                           compiler_directives={'language_level' : "3"})
 
 setup(name='fibertree',
       version='0.2',
@@ -79,7 +52,7 @@ setup(name='fibertree',
       author='Joel S. Emer',
       author_email='jsemer@mit.edu',
       license='MIT',
-      ext_modules=cythonize(extensions, compiler_directives={'language_level' : "3"}),
+      ext_modules=extensions,
       packages=['fibertree',
                 'fibertree.core',
                 'fibertree.graphics',
@@ -103,6 +103,39 @@ class TestCompute(unittest.TestCase):
 
         self.assertEqual(Compute.numSwaps(tensor, 1, 2, 3), ops)
 
+    def test_num_swaps_array_fibers(self):
+        """Test Compute.numSwaps over array-backed fibers"""
+        coords = [0, 1, 2]
+        payloads = [Fiber.fromArrays([1, 3, 5], [1, 1, 1]),
+                    Fiber.fromArrays([0, 2, 3], [1, 1, 1]),
+                    Fiber.fromArrays([1, 4], [1, 1])]
+
+        tensor = Tensor.fromFiber(rank_ids=["M", "K"], fiber=Fiber(coords, payloads))
+        ops = (1 + 1 + 2) + (3 + 3 + 2 + 1 + 0 + 2 + 0 + 0)
+
+        self.assertEqual(Compute.numSwaps(tensor, 0, float("inf"), "N"), ops)
+        self.assertEqual(Compute.numSwaps(tensor, 0, 2, 3), 3 * (3 + 8) + 3 * (2 + 8))
+
+    def test_num_inversions(self):
+        """Test Compute._numInversions"""
+        values = [3, 0, 4, 1, 5, 9, 2, 6, 8, 7]
+        inversions = sum(1 for i in range(len(values))
+                         for j in range(i + 1, len(values))
+                         if values[i] > values[j])
+
+        self.assertEqual(Compute._numInversions(values), inversions)
+        self.assertEqual(Compute._numInversions(values, len(values)), inversions)
+        self.assertEqual(Compute._numInversions([]), 0)
+
+        # Equal values are not out of order
+        values = [2, 2, 0, 0, 7, 2, 7, 1]
+        inversions = sum(1 for i in range(len(values))
+                         for j in range(i + 1, len(values))
+                         if values[i] > values[j])
+
+        self.assertEqual(Compute._numInversions(values), inversions)
+        self.assertEqual(Compute._numInversions([0, 0, 0]), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
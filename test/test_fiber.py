@@ -1,4 +1,6 @@
+import copy
 import os
+import random
 import unittest
 
 from fibertree import *
@@ -936,6 +938,95 @@ class TestFiber(unittest.TestCase):
         with open("tmp/test_iterRange_uses-K-iter.csv", "r") as f:
             self.assertEqual(f.readlines(), corr)
 
+    def test_iterRange_uses_created_before(self):
+        """Test that iterRange checks for metrics collection when the
+        iteration starts"""
+        c0 = [1, 4, 5, 8, 9]
+        p0 = [2, 3, 6, 7, 10]
+        a_k = Fiber(c0, p0)
+        a_k.getRankAttrs().setId("K")
+
+        iter_ = a_k.iterRange(2, 9)
+
+        Metrics.beginCollect("tmp/test_iterRange_uses_created_before")
+        Metrics.trace("K")
+        for _ in iter_:
+            pass
+
+        # Created while collecting, but iterated after
+        iter_ = a_k.iterRange(2, 9)
+        Metrics.endCollect()
+
+        for _ in iter_:
+            pass
+
+        corr = [
+            "K_pos,K,fiber_pos\n",
+            "0,4,1\n",
+            "1,5,2\n",
+            "2,8,3\n"
+        ]
+
+        with open("tmp/test_iterRange_uses_created_before-K-iter.csv", "r") as f:
+            self.assertEqual(f.readlines(), corr)
+
+    def test_iterRange_style(self):
+        """Test iterRange yielding tuples and a reused element"""
+
+        c0 = [1, 4, 5, 8, 9]
+        p0 = [2, 3, 0, 7, 10]
+        a = Fiber(c0, p0)
+
+        ans = [(4, 3), (8, 7)]
+
+        test = list(a.iterRange(2, 9, style="tuple"))
+        self.assertEqual(test, ans)
+        self.assertTrue(all(type(e) is tuple for e in test))
+
+        elements = []
+        for e in a.iterRange(2, 9, style="reuse"):
+            self.assertIsInstance(e, CoordPayload)
+            elements.append(e)
+            self.assertEqual((e.coord, e.payload), ans[len(elements) - 1])
+
+        self.assertIs(elements[0], elements[1])
+
+        with self.assertRaises(AssertionError):
+            list(a.iterRange(2, 9, style="bad"))
+
+    def test_iterRange_unordered(self):
+        """Test iterRange on an unordered fiber stops at the end"""
+
+        c0 = [4, 1, 9, 8, 5]
+        p0 = [3, 2, 10, 7, 6]
+        a = Fiber(c0, p0, ordered=False)
+
+        self.assertEqual(list(a.iterRange(2, 9, style="tuple")), [(4, 3)])
+        self.assertEqual(list(a.iterRange(2, None, style="tuple")),
+                         [(4, 3), (9, 10), (8, 7), (5, 6)])
+
+    def test_iter_metrics(self):
+        """Test the iterators yield the same elements with metrics on"""
+
+        a = Fiber([1, 4, 5, 8, 9], [2, 3, 0, 7, 10])
+        b = Fiber([0, 2, 3], [Fiber([1], [2]), Fiber(), Fiber([4], [5])])
+
+        for fiber in [a, b]:
+            fiber.getRankAttrs().setId("K")
+
+            for name, args in [("__iter__", ()),
+                               ("iterRange", (2, 9)),
+                               ("iterShape", ()),
+                               ("iterShapeRef", ())]:
+                test = [(c, p) for c, p in getattr(fiber, name)(*args)]
+
+                Metrics.beginCollect("tmp/test_iter_metrics")
+                corr = [(c, p) for c, p in getattr(fiber, name)(*args)]
+                Metrics.endCollect()
+
+                with self.subTest(fiber=fiber, name=name):
+                    self.assertEqual(test, corr)
+
 
     def test_iterRangeShape(self):
         """Test iteration over the coordinates within the given range"""
@@ -1717,6 +1808,28 @@ class TestFiber(unittest.TestCase):
         self.assertEqual(b.getSavedPosStats(), (1, 0))
         self.assertEqual(b.getSavedPos(), 0)
 
+    def test_getPayload_start_pos_long(self):
+        """Get payloads with shortcuts in a long fiber"""
+        coords = list(range(0, 3000, 3))
+        payloads = [c + 1 for c in coords]
+        a = Fiber(coords, payloads)
+
+        start_pos = 0
+        dist = 0
+        for c in [0, 3, 100, 102, 2500, 2998, 2999]:
+            # Position of the first coordinate at or after c
+            index = (c + 2) // 3
+            existing = c % 3 == 0
+
+            self.assertEqual(a.getPayload(c, start_pos=start_pos),
+                             c + 1 if existing else 0)
+            self.assertEqual(a.getSavedPos(), index if existing else index - 1)
+
+            dist += index - start_pos
+            start_pos = a.getSavedPos()
+
+        self.assertEqual(a.getSavedPosStats(), (7, dist))
+
 
     def test_getPayload_start_pos_only_one_coord(self):
         """Ensure that getPayload only works if one coordinate is passed"""
@@ -2043,6 +2156,92 @@ class TestFiber(unittest.TestCase):
             self.assertEqual(a.getPayload(test[i]), answer[i])
 
 
+    def test_getPayloadRef_unordered(self):
+        """Scatter into an unordered fiber (using the coordinate index)"""
+
+        a = Fiber(ordered=False)
+
+        coords = random.Random(0).sample(range(1000), 200)
+        for i, c in enumerate(coords):
+            x = a.getPayloadRef(c)
+            x <<= i + 1
+
+        self.assertGreater(a.getCoordIndexSize(), 0)
+        self.assertEqual(a.getCoords(), coords)
+
+        for i, c in enumerate(coords):
+            self.assertEqual(a.getPayload(c), i + 1)
+
+        self.assertEqual(a.getPayload(1000), 0)
+
+    def test_coord_index(self):
+        """The coordinate index is consistent with the coordinates"""
+
+        def check(f):
+            for pos, c in enumerate(f.coords):
+                self.assertEqual(f._coord2pos(c), pos)
+
+            self.assertEqual(f._coord2pos(-1), 0 if f.isOrdered() else len(f.coords))
+
+        a = Fiber(list(range(99, -1, -1)), list(range(1, 101)), ordered=False)
+        check(a)
+        self.assertGreater(a.getCoordIndexSize(), 0)
+
+        a.append(100, 1)
+        a._create_payload(101)
+        check(a)
+
+        a._deletePayload(50)
+        a._deletePayload(101)
+        a._deletePayload(1000)
+        check(a)
+        self.assertEqual(len(a.coords), 100)
+
+        a[3] = CoordPayload(200, 3)
+        a.extend(Fiber([300, 301], [1, 2]))
+        check(a)
+
+        a.updateCoords(lambda i, c, p: c + 1000, new_shape=2000)
+        check(a)
+
+        a.clear()
+        self.assertEqual(a._coord2pos(5), 0)
+        self.assertEqual(a.getCoordIndexSize(), 0)
+
+        # Disable the index
+        b = Fiber(list(range(99, -1, -1)), list(range(1, 101)), ordered=False)
+        b.setCoordIndex(False)
+        check(b)
+        self.assertEqual(b.getCoordIndexSize(), 0)
+
+        # Enable the index for an ordered fiber
+        c = Fiber(list(range(0, 200, 2)), list(range(1, 101)))
+        self.assertEqual(c.getPayload(10), 6)
+        self.assertEqual(c.getCoordIndexSize(), 0)
+
+        c.setCoordIndex(True)
+        self.assertEqual(c.getPayload(10), 6)
+        self.assertEqual(c.getPayload(11), 0)
+        self.assertGreater(c.getCoordIndexSize(), 0)
+
+        x = c.getPayloadRef(11)
+        x <<= 7
+        check(c)
+        self.assertEqual(c.getPayload(11), 7)
+
+    def test_coord_index_getCoords(self):
+        """The coordinate index follows in-place changes of getCoords()"""
+
+        a = Fiber(list(range(99, -1, -1)), list(range(1, 101)), ordered=False)
+        self.assertEqual(a.getPayload(0), 100)
+        self.assertGreater(a.getCoordIndexSize(), 0)
+
+        coords = a.getCoords()
+        coords[99] = 1000
+
+        self.assertEqual(a.getPayload(0), 0)
+        self.assertEqual(a.getPayload(1000), 100)
+
     def test_getPayloadRef2(self):
         """Get payload references 2-D"""
 
@@ -3344,6 +3543,40 @@ class TestFiber(unittest.TestCase):
         self.assertEqual(mf.getShape(), [10])
         self.assertEqual(mf.getActive(), (0, 10))
 
+    def test_merge_order(self):
+        """Test mergeRanks passes the payloads at a coordinate in order"""
+        f = Fiber([0, 1, 4],
+                  [Fiber([3, 5], [1, 2], shape=10),
+                   Fiber([1, 3], [3, 4], shape=10),
+                   Fiber([3, 9], [5, 6], shape=10)],
+                  shape=10)
+        mf = f.mergeRanks(style="relative",
+                          merge_fn=lambda ps: int("".join(str(Payload.get(p)) for p in ps)))
+
+        corr = Fiber([2, 3, 4, 5, 7, 13], [3, 1, 4, 2, 5, 6])
+        self.assertEqual(mf, corr)
+
+        mf = f.mergeRanks(style="absolute",
+                          merge_fn=lambda ps: int("".join(str(Payload.get(p)) for p in ps)))
+
+        corr = Fiber([1, 3, 5, 9], [3, 145, 2, 6])
+        self.assertEqual(mf, corr)
+
+    def test_group_by_coord(self):
+        """Test _groupByCoord with each kind of coordinate"""
+        for coords in [[3, 1, 3, 0],
+                       [(1, 2), (0, 5), (1, 2), (0, 1)],
+                       [(1, (2, 0)), (0, (5, 0)), (1, (2, 0)), (0, (1, 0))],
+                       [(1, 2), (0,), (1, 2), (0, 1, 1)]]:
+            payloads = ["a", "b", "c", "d"]
+            unique, grouped = Fiber._groupByCoord(coords, payloads)
+
+            self.assertEqual(unique, sorted(set(coords)))
+            self.assertEqual(grouped, [[p for c, p in zip(coords, payloads) if c == u]
+                                       for u in unique])
+
+        self.assertEqual(Fiber._groupByCoord([], []), ([], []))
+
     def test_merge_two_levels(self):
         """Test merging more than one level"""
         f = Fiber([0, 4],
@@ -3524,6 +3757,108 @@ class TestFiber(unittest.TestCase):
         with open("tmp/test_trace_iteration_num-M-A.csv", "r") as f:
             self.assertEqual(f.readlines(), corr_M)
 
+    def test_copy_independent(self):
+        """Test a copy and its original are updated independently"""
+
+        for copier in [lambda f: f.copy(preserve_owner=False), copy.deepcopy]:
+            f = Fiber.fromUncompressed([[1, 2, 0], [0, 3, 4]])
+            ref = Fiber([0, 1], [Fiber([0, 1], [1, 2]), Fiber([1, 2], [3, 4])])
+
+            # Take a reference before the copy
+            before = f.getPayloadRef(1, 2)
+
+            g = copier(f)
+            self.assertEqual(g, ref)
+
+            before <<= 5
+            payload = g.getPayloadRef(0, 1)
+            payload <<= 10
+            g.getPayload(1).append(5, 6)
+
+            self.assertEqual(g, Fiber([0, 1], [Fiber([0, 1], [1, 10]),
+                                               Fiber([1, 2, 5], [3, 4, 6])]))
+            self.assertEqual(f, Fiber([0, 1], [Fiber([0, 1], [1, 2]),
+                                               Fiber([1, 2], [3, 5])]))
+
+    def test_copy_update_in_place(self):
+        """Test in-place updates through iteration and getPayload() on
+        a copy and its original"""
+
+        for copier in [lambda f: f.copy(preserve_owner=False), copy.deepcopy]:
+            f = Fiber.fromUncompressed([[1, 2, 0], [0, 3, 4]])
+            g = copier(f)
+
+            for _, p in f.getPayload(0):
+                p += 100
+
+            for _, p in g.getPayload(1):
+                p += 200
+
+            p = f.getPayload(1, 1)
+            p += 10
+
+            p = g.getPayload(0, 0)
+            p += 20
+
+            self.assertEqual(f, Fiber([0, 1], [Fiber([0, 1], [101, 102]),
+                                               Fiber([1, 2], [13, 4])]))
+            self.assertEqual(g, Fiber([0, 1], [Fiber([0, 1], [21, 2]),
+                                               Fiber([1, 2], [203, 204])]))
+
+    def test_copy_storage_own(self):
+        """Test a copy has coordinates and payloads of its own"""
+
+        f = Fiber.fromUncompressed([[1, 2, 0], [0, 3, 4]])
+        g = copy.deepcopy(f)
+
+        g.getPayload(0).getCoords()[0] = 9
+        ps = g.getPayload(0).getPayloads()
+        ps[1] <<= 7
+
+        self.assertEqual(f.getPayload(0).getCoords(), [0, 1])
+        self.assertEqual(f.getPayload(0).getPayloads(), [1, 2])
+        self.assertEqual(g.getPayload(0).getCoords(), [9, 1])
+        self.assertEqual(g.getPayload(0).getPayloads(), [1, 7])
+
+    def test_copy_shares_storage(self):
+        """Test copies share the arrays of the leaf fibers"""
+
+        f = Fiber.fromUncompressed([[1, 2, 0], [0, 3, 4]])
+        g = copy.deepcopy(f)
+        h = f.copy(preserve_owner=False)
+
+        for c in range(2):
+            self.assertTrue(g.getPayload(c).isArrayBacked())
+            self.assertIs(g.getPayload(c).payloads.array,
+                          h.getPayload(c).payloads.array)
+            self.assertIs(g.getPayload(c).coords.array,
+                          h.getPayload(c).coords.array)
+
+        # An updated payload is seen by a copy of the copy
+        p = g.getPayload(1, 2)
+        p += 10
+        gg = copy.deepcopy(g)
+        self.assertEqual(gg, Fiber([0, 1], [Fiber([0, 1], [1, 2]),
+                                            Fiber([1, 2], [3, 14])]))
+        self.assertIs(gg.getPayload(0).payloads.array,
+                      h.getPayload(0).payloads.array)
+
+        # An updated original is copied again
+        p = f.getPayload(0, 0)
+        p += 5
+        ff = copy.deepcopy(f)
+        self.assertEqual(ff.getPayload(0), Fiber([0, 1], [6, 2]))
+        self.assertEqual(h.getPayload(0), Fiber([0, 1], [1, 2]))
+        self.assertIsNot(ff.getPayload(0).payloads.array,
+                         h.getPayload(0).payloads.array)
+        self.assertIs(ff.getPayload(1).payloads.array,
+                      h.getPayload(1).payloads.array)
+
+        # Mixed values are copied to lists
+        m = copy.deepcopy(Fiber([0, 1, 2], [1, 2.5, "a"]))
+        self.assertFalse(m.isArrayBacked())
+        self.assertEqual(m, Fiber([0, 1, 2], [1, 2.5, "a"]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,160 @@
+"""Tests of array-backed fibers"""
+
+import unittest
+
+import numpy as np
+
+from fibertree import CoordPayload
+from fibertree import Payload
+from fibertree import Fiber
+from fibertree import Metrics
+
+
+class TestFiberArrays(unittest.TestCase):
+    """Tests of array-backed fibers"""
+
+    def setUp(self):
+        # Make sure that no metrics are being collected, unless explicitly
+        # desired by the test
+        Metrics.endCollect()
+
+        self.coords = [2, 4, 6, 9]
+        self.payloads = [3, 5, 7, 1]
+
+    def test_from_arrays(self):
+        """Create an array-backed fiber"""
+
+        a = Fiber.fromArrays(np.array(self.coords), np.array(self.payloads))
+        ans = Fiber(self.coords, self.payloads)
+
+        self.assertTrue(a.isArrayBacked())
+        self.assertFalse(ans.isArrayBacked())
+        self.assertEqual(a, ans)
+        self.assertEqual(len(a), 4)
+        self.assertEqual(a.getCoords(), self.coords)
+        self.assertEqual(a.getPayloads(), self.payloads)
+
+    def test_from_arrays_checks(self):
+        """Check the ordered and unique attributes of an array-backed fiber"""
+
+        with self.assertRaises(AssertionError):
+            Fiber.fromArrays([4, 2], [1, 1])
+
+        with self.assertRaises(AssertionError):
+            Fiber.fromArrays([4, 2, 4], [1, 1, 1], ordered=False)
+
+        a = Fiber.fromArrays([4, 2], [1, 3], ordered=False)
+        self.assertEqual(a.getPayload(2), 3)
+
+    def test_coords_lookup(self):
+        """Look up coordinates in the coordinates of an array-backed fiber"""
+
+        for ordered in [True, False]:
+            with self.subTest(ordered=ordered):
+                coords = self.coords if ordered else [6, 2, 9, 4]
+                a = Fiber.fromArrays(coords, self.payloads, ordered=ordered)
+
+                for c in range(11):
+                    self.assertEqual(c in a.coords, c in coords)
+                    if c in coords:
+                        self.assertEqual(a.coords.index(c), coords.index(c))
+                    else:
+                        with self.assertRaises(ValueError):
+                            a.coords.index(c)
+
+                self.assertIn(4.0, a.coords)
+                self.assertNotIn((4,), a.coords)
+                self.assertNotIn(None, a.coords)
+
+    def test_iter(self):
+        """Iterate over an array-backed fiber"""
+
+        a = Fiber.fromArrays(self.coords, self.payloads)
+
+        for n, (c, p) in enumerate(a):
+            self.assertIsInstance(c, int)
+            self.assertIsInstance(p, Payload)
+            self.assertEqual(c, self.coords[n])
+            self.assertEqual(p, self.payloads[n])
+
+        self.assertEqual(list(a.iterRange(4, 9)),
+                         [CoordPayload(4, 5), CoordPayload(6, 7)])
+
+    def test_get_payload(self):
+        """getPayload of an array-backed fiber"""
+
+        a = Fiber.fromArrays(self.coords, self.payloads)
+
+        self.assertEqual(a.getPayload(6), 7)
+        self.assertEqual(a.getPayload(5), 0)
+        self.assertEqual(a.getPayload(5, default=-1, allocate=False), -1)
+        self.assertTrue(a.isArrayBacked())
+
+    def test_intersect(self):
+        """Intersect array-backed fibers"""
+
+        a = Fiber.fromArrays(self.coords, self.payloads)
+        b = Fiber([1, 4, 9], [2, 2, 2])
+
+        ans = Fiber([4, 9], [(5, 2), (1, 2)])
+
+        self.assertEqual(Fiber.fromLazy(a & b), ans)
+
+    def test_populate_source(self):
+        """Populate a fiber from an array-backed fiber"""
+
+        a = Fiber.fromArrays(self.coords, self.payloads)
+        z = Fiber()
+
+        for c, (z_ref, a_val) in z << a:
+            z_ref += a_val
+
+        self.assertEqual(z, Fiber(self.coords, self.payloads))
+        self.assertTrue(a.isArrayBacked())
+
+    def test_populate_target(self):
+        """Populate an array-backed fiber"""
+
+        z = Fiber.fromArrays(self.coords, self.payloads)
+        a = Fiber([1, 4], [10, 10])
+
+        for c, (z_ref, a_val) in z << a:
+            z_ref += a_val
+
+        self.assertFalse(z.isArrayBacked())
+        self.assertEqual(z, Fiber([1, 2, 4, 6, 9], [10, 3, 15, 7, 1]))
+
+    def test_get_payload_ref(self):
+        """getPayloadRef converts to list-based storage"""
+
+        a = Fiber.fromArrays(self.coords, self.payloads)
+
+        ref = a.getPayloadRef(4)
+        ref += 1
+
+        self.assertFalse(a.isArrayBacked())
+        self.assertEqual(a.getPayload(4), 6)
+
+        a.append(12, 2)
+        self.assertEqual(a.getCoords(), self.coords + [12])
+
+    def test_float_payloads(self):
+        """Array-backed fiber with float payloads"""
+
+        a = Fiber.fromArrays(np.arange(4, dtype=np.int32),
+                             np.array([0.5, 1.5, 2.5, 3.5]))
+
+        self.assertEqual(a.getPayload(2), 2.5)
+        self.assertEqual(a.getPayload(2).v(), 2.5)
+
+    def test_fiber2dict(self):
+        """Dump an array-backed fiber"""
+
+        a = Fiber.fromArrays(self.coords, self.payloads)
+        b = Fiber(self.coords, self.payloads)
+
+        self.assertEqual(a.fiber2dict(), b.fiber2dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,6 +32,26 @@ class TestFiberMutator(unittest.TestCase):
         b = a.swapRanks()
         self.assertEqual(b[0].payload.getDefault(), float("inf"))
 
+    def test_swapRanks_transpose(self):
+        """Test that swapRanks transposes and copies the payloads"""
+        a = Fiber([0, 2, 3],
+                  [Fiber([1, 4], [Fiber([0], [1]), Fiber([2], [2])]),
+                   Fiber([0, 1], [Fiber([1], [3]), Fiber([0, 1], [4, 5])]),
+                   Fiber([4], [Fiber([3], [6])])])
+        a_orig = deepcopy(a)
+
+        b = a.swapRanks()
+
+        b_ref = Fiber([0, 1, 4],
+                      [Fiber([2], [Fiber([1], [3])]),
+                       Fiber([0, 2], [Fiber([0], [1]), Fiber([0, 1], [4, 5])]),
+                       Fiber([0, 3], [Fiber([2], [2]), Fiber([3], [6])])])
+        self.assertEqual(b, b_ref)
+
+        payload = b.getPayloadRef(1, 2, 0)
+        payload <<= 10
+        self.assertEqual(a, a_orig)
+
     def test_split_uniform_below(self):
         """Test splitUniformBelow"""
 
@@ -374,6 +374,34 @@ class TestFiberOperators(unittest.TestCase):
             inds.append(k)
         self.assertEqual(inds, [0, 1, 2, 3, 4])
 
+    def test_and_vectorized(self):
+        """Test Fiber.__and__ on fibers long enough to be vectorized"""
+        a_k = Fiber.fromRandom([500], [0.3], seed=0)
+        b_k = Fiber.fromRandom([500], [0.6], seed=1)
+
+        # Explicit zeros are not part of the intersection
+        a_ref = a_k.getPayloadRef(a_k.getCoords()[3])
+        a_ref <<= 0
+
+        # The scalar two-finger merge (used when collecting metrics)
+        Metrics.beginCollect()
+        corr = [(c, (a.v(), b.v())) for c, (a, b) in a_k & b_k]
+        Metrics.endCollect()
+
+        test = [(c, (a.v(), b.v())) for c, (a, b) in a_k & b_k]
+        self.assertEqual(test, corr)
+
+        test = [(c, (a.v(), b.v())) for c, (b, a) in b_k & a_k]
+        self.assertEqual(test, corr)
+
+        # Payloads are references to the original payloads
+        for c, (a_val, b_val) in a_k & b_k:
+            self.assertIs(a_val, a_k.getPayloadRef(c))
+
+        a_arr = Fiber.fromArrays(a_k.getCoords(), [p.v() for p in a_k.getPayloads()])
+        test = [(c, (a.v(), b.v())) for c, (a, b) in a_arr & b_k]
+        self.assertEqual(test, corr)
+
     def test_lshift(self):
         """Test Fiber.__lshift__"""
         a_m = Fiber.fromUncompressed([1, 0, 3, 4, 0])
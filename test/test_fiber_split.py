@@ -526,6 +526,24 @@ class TestFiberSplit(unittest.TestCase):
 
         Metrics.endCollect()
 
+    def test_split_uniform_skips_empty(self):
+        """Test that splitUniform drops empty elements and partitions"""
+        c = [0, 1, 9, 10, 12, 31, 41]
+        p = [1, 0, 20, 0, 0, 310, 410]
+
+        split_ref = Fiber([0, 30],
+                          [Fiber([9], [20], active_range=(1, 10)),
+                           Fiber([31], [310], active_range=(30, 35))])
+
+        for f in [Fiber(c, p, active_range=(1, 35)),
+                  Fiber.fromArrays(c, p, active_range=(1, 35))]:
+            split = f.splitUniform(10)
+
+            self.assertEqual(split, split_ref)
+            self.assertEqual(split.getActive(), (1, 35))
+            for (_, sp), (_, rp) in zip(split, split_ref):
+                self.assertEqual(sp.getActive(), rp.getActive())
+
 
     def test_split_nonuniform_empty(self):
         """Test splitNonUniform on empty fiber"""
@@ -1730,6 +1748,23 @@ class TestFiberSplit(unittest.TestCase):
 
         Metrics.endCollect()
 
+    def test_split_equal_skips_empty(self):
+        """Test that splitEqual only counts non-empty elements"""
+        c = [0, 1, 9, 10, 12, 31, 41]
+        p = [1, 0, 20, 0, 0, 310, 410]
+
+        split_ref = Fiber([1, 31],
+                          [Fiber([9], [20], active_range=(1, 31)),
+                           Fiber([31], [310], active_range=(31, 35))])
+
+        for f in [Fiber(c, p, active_range=(1, 35)),
+                  Fiber.fromArrays(c, p, active_range=(1, 35))]:
+            split = f.splitEqual(1)
+
+            self.assertEqual(split, split_ref)
+            for (_, sp), (_, rp) in zip(split, split_ref):
+                self.assertEqual(sp.getActive(), rp.getActive())
+
 
     def test_split_unequal_empty(self):
         """Test splitUnEqual on empty fiber"""
@@ -221,6 +221,66 @@ class TestFormat(unittest.TestCase):
         f = Format(tensor, yaml.safe_load(spec))
         self.assertEqual(f.getSubTree(), 5 * 7 * 32)
 
+    def test_cached_footprints(self):
+        """Test the footprints cached on an immutable tensor match those of
+        a mutable one"""
+        mutable = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+        mutable.setMutable(True)
+
+        for formats in [("C", "C"), ("U", "C"), ("C", "U"), ("U", "U")]:
+            spec = yaml.safe_load("""
+            M:
+                fhbits: 16
+                cbits: 8
+                pbits: 32
+            K:
+                fhbits: 4
+                cbits: 2
+                pbits: 64
+            """)
+            spec["M"]["format"], spec["K"]["format"] = formats
+
+            f = Format(self.t, spec)
+            g = Format(mutable, spec)
+
+            for coords in [(), (1,), (3,), (6,), (1, 2)]:
+                self.assertEqual(f.getSubTree(*coords), g.getSubTree(*coords))
+
+            for coords in [(), (1,), (6,)]:
+                self.assertEqual(f.getFiber(*coords), g.getFiber(*coords))
+
+            self.assertEqual(f.getTensor(), g.getTensor())
+
+    def test_cached_footprints_new_root(self):
+        """Test the cached footprints are recomputed for a new root"""
+        f = Format(self.t, self.spec)
+        self.assertEqual(f.getRank("K"), 128 + (3 + 2 + 2 + 2) * (32 + 64))
+        self.assertEqual(f.getSubTree(1), 3 * 32 + 3 * 64)
+
+        self.t.setRoot(Tensor.fromUncompressed(["M", "K"], [[0, 1], [2, 3]]).getRoot())
+        self.assertEqual(f.getRank("K"), 128 + 3 * (32 + 64))
+        self.assertEqual(f.getSubTree(1), 2 * 32 + 2 * 64)
+
+    def test_cached_footprints_mutated(self):
+        """Test the cached footprints are recomputed after a mutation"""
+        t = Tensor.fromUncompressed(["M", "K"], [[1, 0, 2], [0, 3, 0]])
+        ref = Tensor.fromUncompressed(["M", "K"], [[1, 7, 2], [0, 3, 7]])
+
+        f = Format(t, self.spec)
+        self.assertEqual(f.getRank("K"), 128 + 3 * (32 + 64))
+        self.assertEqual(f.getSubTree(1), 32 + 64)
+
+        for coords in [(0, 1), (1, 2)]:
+            payload = t.getPayloadRef(*coords)
+            payload <<= 7
+
+        g = Format(ref, self.spec)
+        for f in [f, Format(t, self.spec)]:
+            self.assertEqual(f.getRank("K"), g.getRank("K"))
+            self.assertEqual(f.getSubTree(1), g.getSubTree(1))
+            self.assertEqual(f.getFiber(0), g.getFiber(0))
+            self.assertEqual(f.getTensor(), g.getTensor())
+
     def test_tensor_footprint(self):
         """Test the tensor footprint"""
         f = Format(self.t, self.spec)
@@ -0,0 +1,122 @@
+"""Tests of importing the fibertree package"""
+
+import importlib
+import json
+import pkgutil
+import subprocess
+import sys
+import unittest
+
+import fibertree
+
+#
+# The public names of the package when it imported the graphics and
+# notebook modules eagerly
+#
+_BASELINE_NAMES = [
+    "AAHR", "Any", "Bitvector", "Button", "CanvasLayout", "Codec",
+    "CoordPayload", "CoordinateError", "CoordinateList", "CycleManager",
+    "Fiber", "HBox", "HTML", "HashTable", "HighlightManager", "Image",
+    "ImageDraw", "ImageFont", "ImageUtils", "Javascript", "Metrics",
+    "MovieCanvas", "MoviePlayer", "NoneCanvas", "NotebookUtils", "Path",
+    "Payload", "PayloadError", "RBTree", "Rank", "RankAttrs",
+    "RunLengthEncoding", "SlideshowPlayer", "SpacetimeCanvas", "Tensor",
+    "TensorCanvas", "TensorDisplay", "TensorImage", "TensorMaker", "TreeImage",
+    "Uncompressed", "UncompressedImage", "VBox", "Video", "addActivity",
+    "addFrame", "asyncio", "b64encode", "bisect", "codec", "coiterActiveShape",
+    "coiterActiveShapeRef", "coiterRangeShape", "coiterRangeShapeRef",
+    "coiterShape", "coiterShapeRef", "copy", "core", "createEnableControl",
+    "cv2", "data_dir", "datafileName", "datetime", "descriptor_to_fmt",
+    "display", "enable", "exit", "fixed", "graphics", "have_ipywidgets",
+    "have_networkx", "imshow", "interact", "interact_manual", "interactive",
+    "intersection", "io", "logging", "lru_cache", "module_logger",
+    "namedtuple", "nest_asyncio", "notebook", "numbers", "numpy", "nx", "os",
+    "partialmethod", "pickle", "plt", "product", "random", "rc", "re",
+    "string", "sys", "tempfile", "tqdm", "union", "webcolors", "widgets",
+    "yaml"
+]
+
+
+class TestImport(unittest.TestCase):
+    """Tests of importing the fibertree package"""
+
+    def test_lazy_graphics(self):
+        """Importing fibertree does not import the graphics packages"""
+
+        code = "import sys, fibertree; " \
+               "print(any(m in sys.modules for m in ('cv2', 'matplotlib', 'ipywidgets')))"
+
+        result = subprocess.run([sys.executable, "-c", code],
+                                capture_output=True,
+                                text=True,
+                                check=True)
+
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_lazy_names(self):
+        """The graphics and notebook names are available"""
+
+        from fibertree.graphics.tensor_image import TensorImage
+        from fibertree.notebook.tensor_maker import TensorMaker
+
+        self.assertIs(fibertree.TensorImage, TensorImage)
+        self.assertIs(fibertree.TensorMaker, TensorMaker)
+
+        for name in fibertree.__all__:
+            with self.subTest(name=name):
+                self.assertTrue(hasattr(fibertree, name))
+
+        with self.assertRaises(AttributeError):
+            fibertree.NotAName
+
+    def test_dir(self):
+        """The package has (at least) the names it had with eager imports"""
+
+        names = dir(fibertree)
+
+        for name in _BASELINE_NAMES:
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+                self.assertTrue(hasattr(fibertree, name))
+
+        self.assertFalse(any(name.startswith("_lazy") for name in names))
+
+    def test_lazy_table(self):
+        """The lazy names are the names the graphics and notebook modules export"""
+
+        code = "import json, fibertree; " \
+               "print(json.dumps(sorted(set(fibertree.__all__) - set(vars(fibertree)))))"
+
+        result = subprocess.run([sys.executable, "-c", code],
+                                capture_output=True,
+                                text=True,
+                                check=True)
+
+        lazy = json.loads(result.stdout)
+
+        # The objects exported under each name (by any of the modules)
+        exported = {"graphics": [fibertree.graphics],
+                    "notebook": [fibertree.notebook]}
+
+        for package in [fibertree.graphics, fibertree.notebook]:
+            for info in pkgutil.iter_modules(package.__path__):
+                module = importlib.import_module(package.__name__ + "." + info.name)
+
+                # The names imported by `from module import *`
+                names = getattr(module, "__all__",
+                                [name for name in dir(module) if not name.startswith("_")])
+
+                for name in names:
+                    exported.setdefault(name, []).append(getattr(module, name))
+
+        eager = set(fibertree.__all__) - set(lazy)
+        self.assertEqual(lazy, sorted(set(exported) - eager))
+
+        for name in lazy:
+            with self.subTest(name=name):
+                value = getattr(fibertree, name)
+                self.assertTrue(any(value is other for other in exported[name]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,9 @@
 import os
 import unittest
 
-from fibertree import Fiber
+import numpy as np
+
+from fibertree import Fiber, Tensor
 from fibertree import Metrics
 from fibertree.model import *
 
@@ -216,3 +218,61 @@ class TestIntersector(unittest.TestCase):
         Metrics.endCollect()
 
         self.assertEqual(intersector.getNumIntersects(), 4 * 3)
+
+    def test_num_isect_trace_files(self):
+        """Test counting intersections of whole trace files"""
+        if not os.path.exists("tmp"):
+            os.makedirs("tmp")
+
+        a_jk = Tensor.fromRandom(rank_ids=["J", "K"], shape=[6, 20],
+                                 density=[0.8, 0.4], seed=0).getRoot()
+        b_jk = Tensor.fromRandom(rank_ids=["J", "K"], shape=[6, 20],
+                                 density=[0.8, 0.4], seed=1).getRoot()
+
+        intersectors = [LeaderFollowerIntersector, SkipAheadIntersector,
+                        TwoFingerIntersector]
+        per_fiber = [cls() for cls in intersectors]
+
+        Metrics.beginCollect("tmp/test_num_isect_trace_files")
+        Metrics.trace("K", "intersect_0", consumable=True)
+        Metrics.trace("K", "intersect_1", consumable=True)
+        Metrics.trace("K", "intersect_0")
+        Metrics.trace("K", "intersect_1")
+
+        for _, (a_k, b_k) in a_jk & b_jk:
+            for _ in a_k & b_k:
+                pass
+
+            trace0 = Metrics.consumeTrace("K", "intersect_0")
+            trace1 = Metrics.consumeTrace("K", "intersect_1")
+
+            per_fiber[0].addTraces(trace0)
+            for intersector in per_fiber[1:]:
+                intersector.addTraces(trace0, trace1)
+
+        Metrics.endCollect()
+
+        fns = ["tmp/test_num_isect_trace_files-K-intersect_0.csv",
+               "tmp/test_num_isect_trace_files-K-intersect_1.csv"]
+
+        for cls, corr in zip(intersectors, per_fiber):
+            with self.subTest(intersector=cls.__name__):
+                intersector = cls()
+                if cls is LeaderFollowerIntersector:
+                    intersector.addTraceFiles(fns[0])
+                else:
+                    intersector.addTraceFiles(*fns)
+
+                self.assertGreater(corr.getNumIntersects(), 0)
+                self.assertEqual(intersector.getNumIntersects(), corr.getNumIntersects())
+
+    def test_num_isect_trace_arrays_empty(self):
+        """Test counting intersections of empty trace arrays"""
+        empty = np.empty((0, 3), dtype=np.int64)
+        trace = np.array([[0, 1, 0], [1, 3, 1]])
+
+        for cls in [SkipAheadIntersector, TwoFingerIntersector]:
+            intersector = cls()
+            intersector.addTraceArrays(empty, trace)
+            intersector.addTraceArrays(empty, empty)
+            self.assertEqual(intersector.getNumIntersects(), 0)
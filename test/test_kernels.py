@@ -0,0 +1,150 @@
+"""Tests of the (optionally compiled) inner loops of the core"""
+
+import bisect
+import importlib.util
+import os
+import random
+import unittest
+
+from unittest import mock
+
+import fibertree.core.kernels as kernels
+
+from fibertree import Fiber
+from fibertree import Metrics
+from fibertree import Tensor
+
+
+def _load_pure_kernels():
+    """Load the pure Python version of the kernels module"""
+
+    spec = importlib.util.spec_from_file_location(
+        "fibertree_pure_kernels",
+        os.path.join(os.path.dirname(kernels.__file__), "kernels.py"))
+
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+class TestKernels(unittest.TestCase):
+    """Tests of the (optionally compiled) inner loops of the core"""
+
+    def setUp(self):
+        # Make sure that no metrics are being collected, unless explicitly
+        # desired by the test
+        Metrics.endCollect()
+
+        self.pure = _load_pure_kernels()
+        self.modules = [kernels, self.pure]
+
+        rng = random.Random(0)
+
+        self.lists = [[], [3], sorted(rng.sample(range(100), 30))]
+        self.lists += [sorted(rng.sample(range(50), k)) for k in (5, 20, 50)]
+        self.lists += [sorted(rng.sample([(i, j) for i in range(5) for j in range(5)], 10))]
+
+    def test_pure(self):
+        """The pure Python version is not compiled"""
+
+        self.assertFalse(self.pure.COMPILED)
+
+    def test_without_cython(self):
+        """The pure Python version can be loaded without Cython"""
+
+        with mock.patch.dict("sys.modules", {"cython": None}):
+            pure = _load_pure_kernels()
+
+        self.assertFalse(pure.COMPILED)
+
+        coords = [1, 3, 5, 7]
+        for coord in range(9):
+            self.assertEqual(pure.find_ge(coords, coord),
+                             bisect.bisect_left(coords, coord))
+
+    def test_find(self):
+        """Find coordinates in lists"""
+
+        for coords in self.lists:
+            values = set(coords) | {(0, 0), (4, 5), -1, 1, 49, 200}
+            values = [v for v in values if type(v) is type((coords or [0])[0])]
+
+            for module in self.modules:
+                for coord in values:
+                    for start in range(len(coords) + 2):
+                        with self.subTest(module=module.__name__, coord=coord, start=start):
+                            corr = min(start + bisect.bisect_left(coords[start:], coord),
+                                       len(coords))
+                            self.assertEqual(module.find_ge(coords, coord, start), corr)
+
+                    corr = coords.index(coord) if coord in coords else len(coords)
+                    self.assertEqual(module.find_eq(coords, coord), corr)
+
+    def test_intersect_union(self):
+        """Merge pairs of lists"""
+
+        for a_coords in self.lists:
+            for b_coords in self.lists:
+                if a_coords and b_coords and type(a_coords[0]) is not type(b_coords[0]):
+                    continue
+
+                common = sorted(set(a_coords) & set(b_coords))
+                merged = sorted(set(a_coords) | set(b_coords))
+
+                corr_and = ([a_coords.index(c) for c in common],
+                            [b_coords.index(c) for c in common])
+
+                corr_or = (merged,
+                           [a_coords.index(c) if c in a_coords else -1 for c in merged],
+                           [b_coords.index(c) if c in b_coords else -1 for c in merged])
+
+                for module in self.modules:
+                    with self.subTest(module=module.__name__, a=a_coords, b=b_coords):
+                        self.assertEqual(module.intersect_positions(a_coords, b_coords),
+                                         corr_and)
+                        self.assertEqual(module.union_positions(a_coords, b_coords),
+                                         corr_or)
+
+    def test_fiber_merges(self):
+        """Merges with the kernels match the instrumented merges"""
+
+        a = Fiber([1, 3, 4, 6, 8, 9], [1, 0, 2, 3, 0, 4])
+        b = Fiber([0, 3, 4, 5, 8, 10], [5, 6, 0, 7, 0, 8])
+        c = Tensor.fromUncompressed(["K", "J"], [[1, 0, 2], [0, 0, 0], [3, 4, 0]]).getRoot()
+        d = Tensor.fromUncompressed(["K", "J"], [[0, 5, 6], [7, 0, 0], [0, 0, 0]]).getRoot()
+        e = Fiber()
+
+        for fiber in [a, b, e]:
+            fiber.getRankAttrs().setId("K")
+
+        for x, y in [(a, b), (b, a), (a, e), (e, b), (c, d)]:
+            for op in ["__and__", "__or__"]:
+                # Metrics collection selects the instrumented merges
+                Metrics.beginCollect("tmp/test_fiber_merges")
+                corr = [(coord, payload) for coord, payload in getattr(x, op)(y)]
+                Metrics.endCollect()
+
+                test = [(coord, payload) for coord, payload in getattr(x, op)(y)]
+
+                with self.subTest(op=op, x=x, y=y):
+                    self.assertEqual(test, corr)
+
+    def test_fiber_merges_tuples(self):
+        """Merges with the kernels of fibers with tuple coordinates"""
+
+        a = Fiber([(0, 1), (1, 2), (2, 0)], [1, 2, 3])
+        b = Fiber([(0, 1), (2, 0), (2, 2)], [4, 5, 6])
+
+        and_ans = [((0, 1), (1, 4)), ((2, 0), (3, 5))]
+        or_ans = [((0, 1), ("AB", 1, 4)),
+                  ((1, 2), ("A", 2, 0)),
+                  ((2, 0), ("AB", 3, 5)),
+                  ((2, 2), ("B", 0, 6))]
+
+        self.assertEqual([(c, p) for c, p in a & b], and_ans)
+        self.assertEqual([(c, p) for c, p in a | b], or_ans)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,16 @@
 import os
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 from fibertree import *
+from fibertree.core.trace_sink import CsvTraceSink, NpyTraceSink, loadTrace, traceToCsv
 
 class TestMetrics(unittest.TestCase):
     def setUp(self):
         # Make sure that no metrics are being collected, unless explicitly
         # desired by the test
         Metrics.endCollect()
+        Metrics.setTraceSink("csv")
 
         # Make sure we have a tmp directory to write to
         if not os.path.exists("tmp"):
@@ -87,6 +90,76 @@ class TestMetrics(unittest.TestCase):
         with open("tmp/test_add_use_one_traced-K-iter.csv", "r") as f:
             self.assertEqual(f.readlines(), corr)
 
+    def test_add_use_npy_trace(self):
+        """Test that addUse correctly writes a binary (.npy) trace"""
+        Metrics.setTraceSink("npy")
+        Metrics.setNumCachedUses(2)
+        Metrics.beginCollect("tmp/test_add_use_npy_trace")
+        Metrics.trace("K")
+
+        ks = [[3, 7], [8]]
+
+        Metrics.registerRank("M")
+        for i, m in enumerate([2, 5]):
+            Metrics.addUse("M", m, i)
+            Metrics.registerRank("K")
+            for j, k in enumerate(ks[i]):
+                Metrics.addUse("K", k, 2 * j + 1)
+                Metrics.incIter("K")
+            Metrics.endIter("K")
+            Metrics.incIter("M")
+        Metrics.endIter("M")
+
+        Metrics.endCollect()
+
+        trace = loadTrace("tmp/test_add_use_npy_trace-K-iter.npy")
+
+        self.assertEqual(trace.dtype.names, ("M_pos", "K_pos", "M", "K", "fiber_pos"))
+        self.assertEqual(trace.tolist(), [(0, 0, 2, 3, 1), (0, 1, 2, 7, 3), (1, 0, 5, 8, 1)])
+
+        corr = [
+            "M_pos,K_pos,M,K,fiber_pos\n",
+            "0,0,2,3,1\n",
+            "0,1,2,7,3\n",
+            "1,0,5,8,1\n"
+        ]
+
+        traceToCsv("tmp/test_add_use_npy_trace-K-iter.npy",
+                   "tmp/test_add_use_npy_trace-K-iter.csv")
+
+        with open("tmp/test_add_use_npy_trace-K-iter.csv", "r") as f:
+            self.assertEqual(f.readlines(), corr)
+
+    def test_restart_trace(self):
+        """Test that restarting a trace drops the entries already in it"""
+        for sink in [CsvTraceSink, NpyTraceSink]:
+            with self.subTest(sink=sink.__name__):
+                trace_sink = sink("tmp/test_restart_trace", 2)
+
+                trace_sink.start(["M", "fiber_pos"])
+                for m in range(5):
+                    trace_sink.append([m, m])
+                trace_sink.flush()
+
+                trace_sink.start(["M", "K", "fiber_pos"])
+                trace_sink.append([7, 3, 1])
+                trace_sink.close()
+
+                if sink is NpyTraceSink:
+                    traceToCsv("tmp/test_restart_trace.npy",
+                               "tmp/test_restart_trace.csv")
+
+                with open("tmp/test_restart_trace.csv", "r") as f:
+                    self.assertEqual(f.readlines(), ["M,K,fiber_pos\n", "7,3,1\n"])
+
+    def test_set_trace_sink(self):
+        """Test that only known trace formats can be selected"""
+        with self.assertRaises(AssertionError):
+            Metrics.setTraceSink("txt")
+
+        with self.assertRaises(AssertionError):
+            Metrics.setTraceSink(int)
+
     def test_add_use_num_cached_uses(self):
         """Test that num_cached_uses is followed"""
         Metrics.beginCollect("tmp/test_add_use_num_cached_uses")
@@ -615,3 +688,52 @@ class TestMetrics(unittest.TestCase):
             Metrics.trace("M")
 
         Metrics.endCollect()
+
+    def test_session(self):
+        """Test that a MetricsSession is independent of the default session"""
+        Metrics.beginCollect()
+        default = Metrics.getSession()
+
+        with MetricsSession() as session:
+            self.assertIs(Metrics.getSession(), session)
+            self.assertFalse(Metrics.isCollecting())
+
+            Metrics.beginCollect()
+            Metrics.incCount("Line 1", "Metric 1", 5)
+
+            with MetricsSession():
+                self.assertFalse(Metrics.isCollecting())
+
+            self.assertIs(Metrics.getSession(), session)
+            Metrics.endCollect()
+
+        self.assertIs(Metrics.getSession(), default)
+        self.assertTrue(Metrics.isCollecting())
+        self.assertEqual(Metrics.dump(), {})
+        self.assertEqual(session.dump(), {"Line 1": {"Metric 1": 5}})
+
+        Metrics.endCollect()
+
+    def test_session_threads(self):
+        """Test that simulations in concurrent sessions do not interfere"""
+        a = Fiber([0, 2, 3, 5, 7, 8], [1, 2, 3, 4, 5, 6])
+        b = Fiber([1, 2, 3, 6, 7, 9], [2, 3, 4, 5, 6, 7])
+
+        def run(num_reps):
+            with MetricsSession():
+                Metrics.beginCollect()
+                for _ in range(num_reps):
+                    z = Fiber()
+                    for c, (z_ref, (a_val, b_val)) in z << (a & b):
+                        z_ref += a_val * b_val
+                Metrics.endCollect()
+
+                return Metrics.dump()
+
+        corr = [run(num_reps) for num_reps in range(1, 9)]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            test = list(pool.map(run, range(1, 9)))
+
+        self.assertEqual(test, corr)
+        self.assertNotEqual(corr[0], corr[1])
@@ -0,0 +1,72 @@
+"""Tests of the replacement policies"""
+
+import unittest
+
+from fibertree.model.replacement import FifoPolicy, LfuPolicy, LruPolicy, \
+    OptPolicy, RandomPolicy
+
+class TestReplacement(unittest.TestCase):
+    """Tests of the replacement policies"""
+
+    def fill(self, policy):
+        """Insert the lines "a", "b", and "c" (next used at 5, 3, 4) and
+        touch "a" (next used at 6)"""
+        policy.insert("a", 5)
+        policy.insert("b", 3)
+        policy.insert("c", 4)
+        policy.touch("a", 6)
+
+        return policy
+
+    def evictAll(self, policy):
+        """Evict all the lines of the policy"""
+        lines = []
+        while policy:
+            lines.append(policy.evict())
+
+        return lines
+
+    def test_opt(self):
+        """Test OPT evicts the line used furthest in the future"""
+        policy = self.fill(OptPolicy())
+        self.assertTrue(policy.admit(5))
+        self.assertFalse(policy.admit(7))
+        self.assertEqual(self.evictAll(policy), ["a", "c", "b"])
+
+    def test_opt_remove(self):
+        """Test OPT skips removed lines"""
+        policy = self.fill(OptPolicy())
+        policy.remove("a")
+        self.assertNotIn("a", policy)
+        self.assertFalse(policy.admit(5))
+        self.assertEqual(self.evictAll(policy), ["c", "b"])
+
+    def test_lru(self):
+        """Test LRU evicts the least recently used line"""
+        policy = self.fill(LruPolicy())
+        self.assertEqual(self.evictAll(policy), ["b", "c", "a"])
+
+    def test_fifo(self):
+        """Test FIFO evicts the first line filled"""
+        policy = self.fill(FifoPolicy())
+        self.assertEqual(self.evictAll(policy), ["a", "b", "c"])
+
+    def test_lfu(self):
+        """Test LFU evicts the least frequently used line"""
+        policy = self.fill(LfuPolicy())
+        policy.touch("c", None)
+        policy.touch("c", None)
+        self.assertEqual(self.evictAll(policy), ["b", "a", "c"])
+
+    def test_random(self):
+        """Test random replacement evicts every line once"""
+        policy = self.fill(RandomPolicy(seed=0))
+        policy.remove("b")
+        self.assertEqual(sorted(self.evictAll(policy)), ["a", "c"])
+
+        again = self.fill(RandomPolicy(seed=0))
+        again.remove("b")
+        policy = self.fill(RandomPolicy(seed=0))
+        policy.remove("b")
+        self.assertEqual(self.evictAll(policy), self.evictAll(again))
+
@@ -1,5 +1,7 @@
 import unittest
 
+from copy import deepcopy
+
 from fibertree import Payload
 from fibertree import Fiber
 from fibertree import Metrics
@@ -374,6 +376,80 @@ class TestTensor(unittest.TestCase):
 
         self.assertEqual(tensor, tensor_ref)
 
+    def test_deepcopy(self):
+        """Test deepcopy keeps the ranks and copies the fibertree"""
+
+        tensor = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+        tensor_ref = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+
+        copied = deepcopy(tensor)
+
+        self.assertEqual(copied, tensor_ref)
+        self.assertIs(copied.getRoot(), copied.ranks[0].getFibers()[0])
+        self.assertIs(copied.getRoot().getOwner(), copied.ranks[0])
+        self.assertEqual(copied.getRoot().getRankAttrs().getId(), "M")
+        self.assertIs(copied.getPayload(0).getOwner(), copied.ranks[1])
+
+        payload = copied.getPayloadRef(0, 2)
+        payload <<= 10
+
+        self.assertEqual(tensor, tensor_ref)
+        self.assertEqual(copied.getPayload(0, 2), 10)
+
+        payload = tensor.getPayloadRef(2, 3)
+        payload <<= 20
+
+        self.assertEqual(copied.getPayload(2, 3), tensor_ref.getPayload(2, 3))
+
+    def test_deepcopy_update_in_place(self):
+        """Test in-place updates of a tensor and its deepcopy"""
+
+        tensor = Tensor.fromUncompressed(["K"], [1, 2])
+        copied = deepcopy(tensor)
+
+        for _, p in tensor.getRoot():
+            p += 100
+
+        for _, p in copied.getRoot():
+            p += 200
+
+        self.assertEqual(tensor.getRoot(), Fiber([0, 1], [101, 102]))
+        self.assertEqual(copied.getRoot(), Fiber([0, 1], [201, 202]))
+
+    def test_deepcopy_shares_storage(self):
+        """Test deepcopies of a tensor share the arrays of its leaf fibers"""
+
+        tensor = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+        copies = [deepcopy(tensor) for _ in range(3)]
+
+        for copied in copies:
+            self.assertEqual(copied, tensor)
+
+        for _, *copied in zip(*[t.ranks[1].getFibers()
+                               for t in [tensor] + copies]):
+            self.assertTrue(all(c.isArrayBacked() for c in copied))
+            self.assertTrue(all(c.payloads.array is copied[0].payloads.array
+                                for c in copied))
+
+        payload = copies[0].getPayloadRef(0, 2)
+        payload <<= 10
+
+        self.assertEqual(copies[0].getPayload(0, 2), 10)
+        self.assertEqual(copies[1], tensor)
+
+    def test_setRoot_update_in_place(self):
+        """Test in-place updates of a root after setRoot()"""
+
+        tensor = Tensor.fromUncompressed(["K"], [1, 2])
+        other = Tensor(rank_ids=["K"])
+        other.setRoot(tensor.getRoot())
+
+        for _, p in tensor.getRoot():
+            p += 100
+
+        self.assertEqual(tensor.getRoot(), Fiber([0, 1], [101, 102]))
+        self.assertEqual(other.getRoot(), Fiber([0, 1], [1, 2]))
+
 
     def test_getPayload_0d(self):
         """Test getPayload of a 0-D tensor"""
@@ -617,6 +693,70 @@ class TestTensor(unittest.TestCase):
 
         self.assertTrue(tensor == tensor_tmp)
 
+    def test_toFile(self):
+        """Test writing and opening a binary tensor file"""
+
+        tensor = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+        tensor.setName("A")
+        tensor.toFile("/tmp/test_tensor-1.ftt")
+
+        tensor_tmp = Tensor.fromFile("/tmp/test_tensor-1.ftt")
+
+        self.assertTrue(tensor == tensor_tmp)
+        self.assertEqual(tensor_tmp.getShape(), tensor.getShape())
+        self.assertEqual(tensor_tmp.getName(), "A")
+        self.assertFalse(tensor_tmp.isMutable())
+
+        # Fibers have the correct owners
+        for r, rank_id in enumerate(tensor.getRankIds()):
+            for fiber in tensor_tmp.ranks[r].getFibers():
+                self.assertEqual(fiber.getRankAttrs().getId(), rank_id)
+
+    def test_fromFile_lazy(self):
+        """Test that fibers of a binary tensor file are created lazily"""
+
+        tensor = Tensor.fromRandom(rank_ids=["M", "K", "N"],
+                                   shape=[10, 20, 30],
+                                   density=[0.8, 0.5, 0.3],
+                                   interval=10,
+                                   seed=0)
+        tensor.toFile("/tmp/test_fromFile_lazy.ftt")
+
+        tensor_tmp = Tensor.fromFile("/tmp/test_fromFile_lazy.ftt")
+
+        m, k_fiber = next(iter(tensor_tmp.getRoot()))
+        k, n_fiber = next(iter(k_fiber))
+
+        leaf_fibers = tensor_tmp.ranks[2].getFibers().csf_rank._fibers
+        self.assertEqual(len(leaf_fibers), 1)
+        self.assertTrue(n_fiber.isArrayBacked())
+
+        self.assertEqual(n_fiber, tensor.getPayload(m, k))
+        self.assertEqual(tensor_tmp.getPayload(m, k, n_fiber.getCoords()[0]),
+                         tensor.getPayload(m, k, n_fiber.getCoords()[0]))
+        self.assertTrue(tensor == tensor_tmp)
+
+    def test_fromFile_0D(self):
+        """Test writing and opening a 0-D binary tensor file"""
+
+        tensor = Tensor.fromYAMLfile("./data/tensor_0d.yaml")
+        tensor.toFile("/tmp/test_tensor_0d.ftt")
+
+        tensor_tmp = Tensor.fromFile("/tmp/test_tensor_0d.ftt")
+
+        self.assertEqual(tensor_tmp.getRoot(), tensor.getRoot())
+
+    def test_fromFile_float(self):
+        """Test a binary tensor file with floating point payloads"""
+
+        tensor = Tensor.fromUncompressed(["M", "K"], [[0, 1.5, 0], [0, 0, 0], [2.5, 0, 3.5]])
+        tensor.toFile("/tmp/test_fromFile_float.ftt")
+
+        tensor_tmp = Tensor.fromFile("/tmp/test_fromFile_float.ftt")
+
+        self.assertTrue(tensor == tensor_tmp)
+        self.assertEqual(tensor_tmp.getPayload(2, 2), 3.5)
+
     def test_init_mutable(self):
         t = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
         self.assertFalse(t.isMutable())
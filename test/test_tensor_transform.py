@@ -1,3 +1,4 @@
+import copy
 import unittest
 
 from fibertree import Payload
@@ -401,6 +402,29 @@ class TestTensorTransform(unittest.TestCase):
         a_MMKK_2 = a_MKMK.swizzleRanks(["M.1", "M.0", "K.1", "K.0"])
         self.assertEqual(a_MMKK_2, a_MMKK)
 
+    def test_swizzleRanks_copies(self):
+        """Test swizzleRanks copies the payloads and lower ranks"""
+        a_MNK = Tensor.fromUncompressed(["M", "N", "K"],
+                                        [[[1, 0], [0, 2]],
+                                         [[3, 4], [0, 0]],
+                                         [[0, 5], [6, 0]]])
+        a_MNK_orig = copy.deepcopy(a_MNK)
+
+        a_NMK = a_MNK.swizzleRanks(["N", "M", "K"])
+        self.assertEqual(a_NMK, a_MNK.swapRanks())
+
+        a_KNM = a_MNK.swizzleRanks(["K", "N", "M"])
+        self.assertEqual(a_KNM.getPayload(1, 0, 1), 4)
+
+        payload = a_NMK.getPayloadRef(0, 1, 0)
+        payload <<= 10
+        payload = a_KNM.getPayloadRef(1, 0, 1)
+        payload <<= 10
+        self.assertEqual(a_MNK, a_MNK_orig)
+
+        for fiber in a_MNK.getRoot().getPayloads():
+            self.assertIs(fiber.getOwner(), a_MNK.ranks[1])
+
     def test_swizzleRanks_empty(self):
         """ Test swizzleRanks() on an empty tensor """
         Z_MNOP = Tensor(rank_ids=["M", "N", "O", "P"])
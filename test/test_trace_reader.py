@@ -0,0 +1,79 @@
+"""Tests of the trace reader"""
+
+import os
+import unittest
+
+import numpy as np
+
+from fibertree.model import TraceReader, Traffic, readTrace, writeTrace
+
+class TestTraceReader(unittest.TestCase):
+    """Tests of the trace reader"""
+
+    def setUp(self):
+        # Make sure we have a tmp directory to write to
+        if not os.path.exists("tmp"):
+            os.makedirs("tmp")
+
+        self.headings = ["K_pos", "K", "fiber_pos", "is_write"]
+        self.trace = np.array([[i, 2 * i, i % 3, i % 2] for i in range(10)])
+
+    def test_write_read(self):
+        """Write and read back a trace"""
+        for ext in ["csv", "npy"]:
+            with self.subTest(ext=ext):
+                fn = "tmp/test_trace_reader_write_read." + ext
+                writeTrace(fn, self.headings, self.trace)
+
+                headings, trace = readTrace(fn)
+                self.assertEqual(headings, self.headings)
+                self.assertEqual(trace.tolist(), self.trace.tolist())
+
+    def test_csv_format(self):
+        """Write the is_write column as booleans"""
+        fn = "tmp/test_trace_reader_csv_format.csv"
+        writeTrace(fn, self.headings, self.trace[:2])
+
+        with open(fn) as f:
+            self.assertEqual(f.read(), "K_pos,K,fiber_pos,is_write\n"
+                             "0,0,0,False\n1,2,1,True\n")
+
+    def test_batches(self):
+        """Iterate over batches of a trace"""
+        for ext in ["csv", "npy"]:
+            with self.subTest(ext=ext):
+                fn = "tmp/test_trace_reader_batches." + ext
+                writeTrace(fn, self.headings, self.trace)
+
+                reader = TraceReader(fn, batch_size=4)
+                batches = list(reader)
+
+                self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+                self.assertEqual(np.concatenate(batches).tolist(), self.trace.tolist())
+                self.assertEqual(len(reader), 10)
+                self.assertEqual(reader.column("fiber_pos"), 2)
+
+    def test_empty(self):
+        """Read a trace with no entries"""
+        fn = "tmp/test_trace_reader_empty.csv"
+        writeTrace(fn, self.headings, [])
+
+        reader = TraceReader(fn)
+        self.assertEqual(len(reader), 0)
+        self.assertEqual(list(reader), [])
+        self.assertEqual(reader.read().shape, (0, 4))
+
+    def test_filterTrace_unordered(self):
+        """Filter a trace whose coordinates are not ordered"""
+        headings = ["K_pos", "K", "fiber_pos"]
+        writeTrace("tmp/test_trace_reader_filter_in.csv", headings,
+                   [[0, 3, 0], [1, 1, 1], [2, 2, 2], [3, 4, 3]])
+        writeTrace("tmp/test_trace_reader_filter_fil.csv", headings,
+                   [[0, 1, 0], [1, 4, 1]])
+
+        Traffic.filterTrace("tmp/test_trace_reader_filter_in.csv",
+                            "tmp/test_trace_reader_filter_fil.csv",
+                            "tmp/test_trace_reader_filter_out.csv")
+
+        _, trace = readTrace("tmp/test_trace_reader_filter_out.csv")
+        self.assertEqual(trace.tolist(), [[3, 4, 3]])
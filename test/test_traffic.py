@@ -4,8 +4,10 @@ import os
 import unittest
 import yaml
 
+import numpy as np
+
 from fibertree import Fiber, Metrics, Tensor
-from fibertree.model import Format, Traffic
+from fibertree.model import Format, Traffic, readTrace
 
 class TestTraffic(unittest.TestCase):
     """Tests of the Traffic class"""
@@ -254,6 +256,57 @@ class TestTraffic(unittest.TestCase):
              open("test_traffic-test_buildNextUseTrace-corr.csv", "r") as f_corr:
             self.assertEqual(f_test.readlines(), f_corr.readlines())
 
+    def test_combineTraceArrays(self):
+        """Combine read and write traces in memory"""
+        read_fn = "tmp/test_traffic_single_stage-N-populate_read_0.csv"
+        write_fn = "tmp/test_traffic_single_stage-N-populate_write_0.csv"
+
+        headings, trace = Traffic._combineTraceArrays(
+            read=readTrace(read_fn),
+            write=readTrace(write_fn))
+
+        corr_headings, corr = readTrace("test_traffic-test_combineTraces_both-corr.csv")
+
+        self.assertEqual(headings, corr_headings)
+        self.assertEqual(trace.tolist(), corr.tolist())
+
+    def test_mergeOrder_unordered(self):
+        """Merge traces whose iteration stamps are not ordered"""
+        reads = np.array([[1, 0], [5, 0], [2, 0]])
+        writes = np.array([[3, 0], [0, 0], [5, 0]])
+
+        order = Traffic._mergeOrder(reads, writes)
+        self.assertEqual(order.tolist(), [0, 3, 4, 1, 2, 5])
+
+        order = Traffic._mergeOrder(reads[[0, 2, 1]], writes[[1, 0, 2]])
+        self.assertEqual(order.tolist(), [3, 0, 1, 4, 2, 5])
+
+    def test_loadTrace_npy(self):
+        """Load a binary trace"""
+        for sink in ["csv", "npy"]:
+            Metrics.setTraceSink(sink)
+            Metrics.beginCollect("tmp/test_loadTrace_npy")
+            Metrics.trace("N", type_="populate_1")
+
+            b_k = self.B_KN.getRoot()
+            a_m = self.A_MK.getRoot()
+            z_m = Tensor(rank_ids=["M", "N"], shape=[6, 7]).getRoot()
+            for m, (z_n, a_k) in z_m << a_m:
+                for k, (a_val, b_n) in a_k & b_k:
+                    for n, (z_ref, b_val) in z_n << b_n:
+                        z_ref += a_val * b_val
+
+            Metrics.endCollect()
+
+        Metrics.setTraceSink("csv")
+
+        headings, trace = readTrace("tmp/test_loadTrace_npy-N-populate_1.npy")
+        corr_headings, corr = readTrace("tmp/test_loadTrace_npy-N-populate_1.csv")
+
+        self.assertEqual(headings, corr_headings)
+        self.assertEqual(trace.tolist(), corr.tolist())
+        self.assertGreater(len(trace), 0)
+
     def test_buffetTraffic_basic(self):
         """Test buffetTraffic"""
         bindings = yaml.safe_load("""
@@ -519,7 +572,7 @@ class TestTraffic(unittest.TestCase):
         }
 
         bits, overflows = Traffic.cacheTraffic(bindings, self.formats, traces, 12 * 32, 4 * 32)
-        self.assertEqual(bits, {"Z": {"read": 1024, "write": 3200}})
+        self.assertEqual(bits, {"Z": {"read": 768, "write": 3200}})
         self.assertEqual(overflows, 0)
 
     def test_cacheTraffic_overflows(self):
@@ -539,4 +592,236 @@ class TestTraffic(unittest.TestCase):
         self.assertEqual(bits, {"Z": {"read": 4224, "write": 7040}})
         self.assertEqual(overflows, 4)
 
+    def test_cacheTraffic_policies(self):
+        """Test the cache traffic with different replacement policies"""
+        bindings = yaml.safe_load("""
+        - tensor: Z
+          rank: N
+          type: payload
+        """)
+
+        traces = {
+            ("Z", "N", "payload", "read"): "tmp/test_traffic_single_stage-N-populate_read_0.csv",
+            ("Z", "N", "payload", "write"): "tmp/test_traffic_single_stage-N-populate_write_0.csv"
+        }
+
+        opt, _ = Traffic.cacheTraffic(bindings, self.formats, traces, 12 * 32, 4 * 32)
+        large, _ = Traffic.cacheTraffic(bindings, self.formats, traces, 2 ** 20, 4 * 32)
+
+        for policy in ["lru", "fifo", "lfu", "random"]:
+            with self.subTest(policy=policy):
+                bits, overflows = Traffic.cacheTraffic(bindings, self.formats,
+                    traces, 12 * 32, 4 * 32, policy=policy, seed=0)
+                self.assertGreaterEqual(bits["Z"]["read"], opt["Z"]["read"])
+                self.assertGreaterEqual(bits["Z"]["write"], opt["Z"]["write"])
+                self.assertEqual(overflows, 0)
+
+                bits, _ = Traffic.cacheTraffic(bindings, self.formats,
+                    traces, 2 ** 20, 4 * 32, policy=policy, seed=0)
+                self.assertEqual(bits, large)
+
+    def test_cacheTraffic_set_associative(self):
+        """Test the cache traffic of a set-associative cache"""
+        bindings = yaml.safe_load("""
+        - tensor: B
+          rank: K
+          type: payload
+
+        - tensor: B
+          rank: N
+          type: coord
+
+        - tensor: B
+          rank: N
+          type: payload
+        """)
+
+        traces = {
+            ("B", "K", "payload", "read"): "tmp/test_traffic_single_stage-K-intersect_1.csv",
+            ("B", "N", "coord", "read"): "tmp/test_traffic_single_stage-N-populate_1.csv",
+            ("B", "N", "payload", "read"): "tmp/test_traffic_single_stage-N-populate_1.csv"
+        }
+
+        capacity = 16 * 4 * 32
+        for policy in ["opt", "lru"]:
+            with self.subTest(policy=policy):
+                full, _ = Traffic.cacheTraffic(bindings, self.formats, traces,
+                    capacity, 4 * 32, policy=policy)
+                one_set, _ = Traffic.cacheTraffic(bindings, self.formats, traces,
+                    capacity, 4 * 32, policy=policy, ways=16)
+                sets, _ = Traffic.cacheTraffic(bindings, self.formats, traces,
+                    capacity, 4 * 32, policy=policy, ways=2)
+
+                self.assertEqual(one_set, full)
+                self.assertEqual(sets["B"].keys(), full["B"].keys())
+
+        # No placement of the lines beats a fully associative OPT cache
+        opt, _ = Traffic.cacheTraffic(bindings, self.formats, traces,
+            capacity, 4 * 32)
+        sets, _ = Traffic.cacheTraffic(bindings, self.formats, traces,
+            capacity, 4 * 32, ways=2)
+        self.assertGreater(sets["B"]["read"], opt["B"]["read"])
+
+    def test_stackDistances(self):
+        """Test the stack distances match simulated caches"""
+        def simulate(lines, policy, num_lines):
+            cache = []
+            hits = 0
+            for t, line in enumerate(lines):
+                if num_lines == 0:
+                    continue
+
+                if line in cache:
+                    hits += 1
+                    cache.remove(line)
+                elif len(cache) == num_lines:
+                    if policy == "lru":
+                        cache.pop(0)
+                    else:
+                        def next_use(other):
+                            later = lines[t + 1:]
+                            return later.index(other) if other in later else len(lines)
+                        cache.remove(max(cache, key=next_use))
+
+                cache.append(line)
+
+            return hits
+
+        rng = np.random.default_rng(0)
+        for policy in ["lru", "opt"]:
+            for num_values in [3, 8, 20]:
+                lines = rng.integers(num_values, size=200)
+                distances = Traffic._stackDistances(lines, policy, 10)
+
+                for num_lines in range(11):
+                    with self.subTest(policy=policy, num_values=num_values, num_lines=num_lines):
+                        hits = int(np.sum(distances <= num_lines))
+                        self.assertEqual(hits, simulate(lines.tolist(), policy, num_lines))
+
+    def test_trafficCurves(self):
+        """Test the traffic curves"""
+        bindings = yaml.safe_load("""
+        - tensor: B
+          rank: K
+          type: payload
+
+        - tensor: B
+          rank: N
+          type: coord
+
+        - tensor: B
+          rank: N
+          type: payload
+        """)
+
+        traces = {
+            ("B", "K", "payload", "read"): "tmp/test_traffic_single_stage-K-intersect_1.csv",
+            ("B", "N", "coord", "read"): "tmp/test_traffic_single_stage-N-populate_1.csv",
+            ("B", "N", "payload", "read"): "tmp/test_traffic_single_stage-N-populate_1.csv"
+        }
+
+        capacities = [0, 4 * 32, 8 * 32, 16 * 32, 32 * 32, 2 ** 20]
+        opt = Traffic.trafficCurves(bindings, self.formats, traces, capacities, 4 * 32)
+        lru = Traffic.trafficCurves(bindings, self.formats, traces, capacities, 4 * 32, policy="lru")
+
+        # The LRU curve is exact at every capacity
+        for capacity, traffic in zip(capacities, lru["B"]["read"]):
+            with self.subTest(capacity=capacity):
+                bits, _ = Traffic.cacheTraffic(bindings, self.formats, traces,
+                    capacity, 4 * 32, policy="lru")
+                self.assertEqual(traffic, bits["B"]["read"])
+
+        # The OPT curve never bypasses the cache, so it is an upper bound
+        for capacity, traffic in zip(capacities, opt["B"]["read"]):
+            with self.subTest(capacity=capacity):
+                bits, _ = Traffic.cacheTraffic(bindings, self.formats, traces,
+                    capacity, 4 * 32)
+                self.assertGreaterEqual(traffic, bits["B"]["read"])
+
+        self.assertEqual(opt["B"]["read"][-1], bits["B"]["read"])
+
+        for curve in [opt["B"]["read"], lru["B"]["read"]]:
+            self.assertEqual(curve, sorted(curve, reverse=True))
+
+        for o, l in zip(opt["B"]["read"], lru["B"]["read"]):
+            self.assertLessEqual(o, l)
+
+    def test_trafficCurves_writes(self):
+        """Test the traffic curves of writes"""
+        # Populating an uncompressed output does not insert coordinates,
+        # so there are no intermediate writes
+        b_k = self.B_KN.getRoot()
+        a_m = self.A_MK.getRoot()
+        Z_MN = Tensor(rank_ids=["M", "N"], shape=[6, 7])
+        Z_MN.setFormat("N", "U")
+        z_m = Z_MN.getRoot()
+
+        Metrics.beginCollect("tmp/test_trafficCurves_writes")
+        Metrics.trace("K", type_="intersect_0")
+        Metrics.trace("K", type_="intersect_1")
+        Metrics.trace("N", type_="populate_read_0")
+        Metrics.trace("N", type_="populate_write_0")
+        Metrics.trace("N", type_="populate_1")
+        for m, (z_n, a_k) in z_m << a_m:
+            for k, (a_val, b_n) in a_k & b_k:
+                for n, (z_ref, b_val) in z_n << b_n:
+                    z_ref += a_val * b_val
+        Metrics.endCollect()
+
+        bindings = yaml.safe_load("""
+        - tensor: B
+          rank: K
+          type: payload
+
+        - tensor: B
+          rank: N
+          type: payload
+
+        - tensor: Z
+          rank: N
+          type: payload
+        """)
+
+        traces = {
+            ("B", "K", "payload", "read"): "tmp/test_trafficCurves_writes-K-intersect_1.csv",
+            ("B", "N", "payload", "read"): "tmp/test_trafficCurves_writes-N-populate_1.csv",
+            ("Z", "N", "payload", "read"): "tmp/test_trafficCurves_writes-N-populate_read_0.csv",
+            ("Z", "N", "payload", "write"): "tmp/test_trafficCurves_writes-N-populate_write_0.csv"
+        }
+
+        capacities = [0, 4 * 32, 8 * 32, 16 * 32, 32 * 32, 2 ** 20]
+        for policy in ["lru", "opt"]:
+            curves = Traffic.trafficCurves(bindings, self.formats, traces,
+                capacities, 4 * 32, policy=policy)
+
+            for c, capacity in enumerate(capacities):
+                # Without bypassing, OPT is only exact for the full footprint
+                if policy == "opt" and capacity < 2 ** 20:
+                    continue
+
+                with self.subTest(policy=policy, capacity=capacity):
+                    bits, _ = Traffic.cacheTraffic(bindings, self.formats,
+                        traces, capacity, 4 * 32, policy=policy)
+
+                    for tensor in bits:
+                        for access in bits[tensor]:
+                            self.assertEqual(curves[tensor][access][c],
+                                             bits[tensor][access])
+
+            self.assertGreater(curves["Z"]["write"][1], curves["Z"]["write"][-1])
+
+    def test_trafficCurves_intermediate_writes(self):
+        """Test that the traffic curves reject intermediate writes"""
+        bindings = yaml.safe_load("""
+        - tensor: Z
+          rank: N
+          type: payload
+        """)
+
+        traces = {
+            ("Z", "N", "payload", "read"): "tmp/test_traffic_single_stage-N-populate_read_0.csv",
+            ("Z", "N", "payload", "write"): "tmp/test_traffic_single_stage-N-populate_write_0.csv"
+        }
 
+        with self.assertRaises(AssertionError):
+            Traffic.trafficCurves(bindings, self.formats, traces, [8 * 32, 2 ** 20], 4 * 32)
@@ -391,6 +391,28 @@ class TestUnionIntersect(unittest.TestCase):
                 id_ = z_m.getRankAttrs().getId()
                 self.assertEqual(id_, "M")
 
+    def test_union_many(self):
+        """Test union of many fibers matches a chain of two-operand unions"""
+
+        fibers = [Fiber.fromRandom([40], [0.2], seed=i) for i in range(8)]
+        fibers += [Fiber.fromRandom([40, 4], [0.2, 0.5], seed=i) for i in range(2)]
+
+        # Metrics collection selects the sequence of two-operand unions
+        Metrics.beginCollect()
+        corr = list(Fiber.union(*fibers))
+        Metrics.endCollect()
+
+        test = list(Fiber.union(*fibers))
+
+        self.assertEqual(len(test), len(corr))
+
+        for (test_c, test_p), (corr_c, corr_p) in zip(test, corr):
+            self.assertEqual(test_c, corr_c)
+            self.assertEqual(test_p, corr_p)
+
+            for test_val, corr_val in zip(test_p.v()[1:], corr_p.v()[1:]):
+                self.assertIs(type(test_val), type(corr_val))
+
 
 if __name__ == '__main__':
     unittest.main()